@@ -0,0 +1,71 @@
+"""Wall-clock time and Newton iterations of the monolithic heat transfer
+and H transport solve (Settings(coupled_heat_transfer=True)) compared with
+the staggered scheme (heat transfer solved first at each step), on a 1D
+model with Soret effect and a temperature dependent thermal conductivity.
+
+Usage: python benchmarks/coupled_heat_transfer.py
+"""
+import time
+import numpy as np
+import festim as F
+
+
+def model(coupled, dt):
+    my_model = F.Simulation(log_level=40)
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1e-3, 1001))
+    my_model.materials = F.Material(
+        id=1,
+        D_0=1e-7,
+        E_D=0.2,
+        Q=lambda T: 0.1 * T,
+        thermal_cond=lambda T: 100 + 0.1 * T,
+        heat_capacity=200,
+        rho=1e4,
+    )
+    my_model.traps = F.Trap(
+        k_0=1e-16, E_k=0.2, p_0=1e13, E_p=1.0, materials=1, density=1e25
+    )
+    my_model.T = F.HeatTransferProblem(transient=True, initial_condition=300)
+    my_model.boundary_conditions = [
+        F.FluxBC(surfaces=[1], value=1e7, field="T"),
+        F.DirichletBC(surfaces=[2], value=300, field="T"),
+        F.DirichletBC(surfaces=[1], value=1e20, field=0),
+    ]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e10,
+        relative_tolerance=1e-9,
+        final_time=1,
+        soret=True,
+        coupled_heat_transfer=coupled,
+    )
+    my_model.dt = F.Stepsize(dt)
+    return my_model
+
+
+def run(coupled, dt):
+    """Returns the wall-clock time (s), the number of H transport Newton
+    iterations and the temperature at the exposed surface"""
+    my_model = model(coupled, dt)
+    my_model.initialise()
+    start = time.perf_counter()
+    my_model.run()
+    elapsed_time = time.perf_counter() - start
+    statistics = my_model.h_transport_problem.solver_statistics
+    iterations = sum(s["iterations"] for s in statistics)
+    return elapsed_time, iterations, my_model.T.T(0)
+
+
+if __name__ == "__main__":
+    for dt in [0.1, 0.01]:
+        for coupled in [False, True]:
+            elapsed_time, iterations, T_surface = run(coupled, dt)
+            print(
+                "dt={} {:>10}: {:.2f} s, {} H transport iterations, "
+                "T(0)={:.2f} K".format(
+                    dt,
+                    "monolithic" if coupled else "staggered",
+                    elapsed_time,
+                    iterations,
+                    T_surface,
+                )
+            )
@@ -0,0 +1,91 @@
+"""Memory, iterations and wall-clock time of the Jacobian-free
+Newton-Krylov solver (Settings(jacobian_free=True)) compared with the
+assembled Newton solver on a 3D problem with two traps.
+Each solver runs in its own process so that peak memories are comparable.
+
+Usage: python benchmarks/jacobian_free.py [nb_cells_per_side]
+"""
+import json
+import resource
+import subprocess
+import sys
+import time
+import fenics as f
+import festim as F
+
+
+def model(nb_cells, jacobian_free):
+    my_model = F.Simulation(log_level=40)
+    mesh = f.UnitCubeMesh(nb_cells, nb_cells, nb_cells)
+    volume_markers = f.MeshFunction("size_t", mesh, 3, 1)
+    surface_markers = f.MeshFunction("size_t", mesh, 2, 0)
+    f.CompiledSubDomain("on_boundary && near(x[0], 0)").mark(surface_markers, 1)
+    my_model.mesh = F.Mesh(
+        mesh, volume_markers=volume_markers, surface_markers=surface_markers
+    )
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0.2)
+    my_model.traps = [
+        F.Trap(k_0=1, E_k=0.2, p_0=1e13, E_p=0.9, materials=1, density=1),
+        F.Trap(k_0=1, E_k=0.2, p_0=1e13, E_p=1.2, materials=1, density=0.5),
+    ]
+    my_model.T = F.Temperature(400)
+    my_model.boundary_conditions = [F.DirichletBC(surfaces=1, value=1, field=0)]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-8,
+        relative_tolerance=1e-8,
+        final_time=0.5,
+        jacobian_free=jacobian_free,
+    )
+    my_model.dt = F.Stepsize(0.05)
+    return my_model
+
+
+def matrix_memory(matrix):
+    return matrix.mat().getInfo()["memory"]
+
+
+def run(nb_cells, jacobian_free):
+    """Runs the model and returns the statistics of the H transport solver"""
+    my_model = model(nb_cells, jacobian_free)
+    my_model.initialise()
+    start = time.perf_counter()
+    my_model.run()
+    elapsed_time = time.perf_counter() - start
+
+    problem = my_model.h_transport_problem
+    if jacobian_free:
+        preconditioner = problem.jacobian_free_preconditioner
+        matrices = [
+            tensor
+            for tensor in preconditioner._tensors.values()
+            if isinstance(tensor, f.PETScMatrix)
+        ]
+        krylov_iterations = problem.newton_solver.nb_krylov_iterations
+    else:
+        matrices = [problem.problem.A]
+        krylov_iterations = None
+    return {
+        "newton_iterations": sum(s["iterations"] for s in problem.solver_statistics),
+        "krylov_iterations": krylov_iterations,
+        "matrices_memory_MB": sum(matrix_memory(A) for A in matrices) / 1e6,
+        "peak_memory_MB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3,
+        "elapsed_time_s": elapsed_time,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        # worker process
+        print(json.dumps(run(int(sys.argv[1]), sys.argv[2] == "jfnk")))
+        sys.exit()
+
+    nb_cells = sys.argv[1] if len(sys.argv) > 1 else "20"
+    for mode in ["assembled", "jfnk"]:
+        output = subprocess.run(
+            [sys.executable, __file__, nb_cells, mode],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        statistics = json.loads(output.strip().splitlines()[-1])
+        print(mode, statistics)
@@ -0,0 +1,68 @@
+"""Cost of evaluating the materials properties as compiled expressions
+(festim.materials.materials.arrhenius_property and thermal_property)
+compared with the Python UserExpressions ArheniusCoeff and ThermalProp,
+on a 3D mesh with two materials. The properties are interpolated on a DG1
+space, as done when they are exported or projected.
+
+Usage: python benchmarks/materials_properties.py [nb_cells_per_side]
+"""
+import sys
+import time
+import fenics as f
+import festim as F
+from festim.materials.materials import (
+    ArheniusCoeff,
+    ThermalProp,
+    arrhenius_property,
+    thermal_property,
+)
+
+
+def elapsed_time(function, nb_repeats=3):
+    """Returns the best wall-clock time (s) of function()"""
+    times = []
+    for _ in range(nb_repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    nb_cells = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    mesh = f.UnitCubeMesh(nb_cells, nb_cells, nb_cells)
+    vm = f.MeshFunction("size_t", mesh, 3, 1)
+    f.CompiledSubDomain("x[0] > 0.5").mark(vm, 2)
+    T = f.interpolate(
+        f.Expression("300 + 200*x[0]*x[1]*x[2]", degree=2),
+        f.FunctionSpace(mesh, "CG", 1),
+    )
+    DG_1 = f.FunctionSpace(mesh, "DG", 1)
+    materials = F.Materials(
+        [
+            F.Material(1, D_0=1e-7, E_D=0.2, thermal_cond=lambda T: 100 + 0.1 * T),
+            F.Material(2, D_0=2e-7, E_D=0.3, thermal_cond=lambda T: 50 + 0.2 * T),
+        ]
+    )
+
+    cases = [
+        (
+            "D",
+            arrhenius_property(materials, vm, T, "D_0", "E_D"),
+            ArheniusCoeff(materials, vm, T, "D_0", "E_D", degree=2),
+        ),
+        (
+            "thermal_cond",
+            thermal_property(materials, vm, T, "thermal_cond"),
+            ThermalProp(materials, vm, T, "thermal_cond", degree=2),
+        ),
+    ]
+    print("{} cells".format(mesh.num_cells()))
+    for name, compiled, python in cases:
+        compiled_time = elapsed_time(lambda: f.interpolate(compiled, DG_1))
+        python_time = elapsed_time(lambda: f.interpolate(python, DG_1))
+        print(
+            "{}: compiled {:.3f} s, Python {:.3f} s, speedup {:.1f}".format(
+                name, compiled_time, python_time, python_time / compiled_time
+            )
+        )
@@ -0,0 +1,59 @@
+"""Per-step cost of the H transport solve when the nonlinear problem
+(compiled forms, SystemAssembler and matrix) is built once and reused,
+compared with rebuilding it at every step as FESTIM used to do.
+
+Usage: python benchmarks/problem_reuse.py
+"""
+import time
+import fenics as f
+import numpy as np
+import festim as F
+
+
+def tds_model(nb_cells=2000):
+    my_model = F.Simulation(log_level=40)
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1e-5, nb_cells + 1))
+    my_model.materials = F.Material(id=1, D_0=1e-7, E_D=0.2)
+    my_model.traps = [
+        F.Trap(k_0=1e-16, E_k=0.2, p_0=1e13, E_p=1.0, materials=1, density=1e25),
+        F.Trap(k_0=1e-16, E_k=0.2, p_0=1e13, E_p=1.4, materials=1, density=5e24),
+    ]
+    my_model.T = F.Temperature(300 + 8 * F.t)
+    my_model.boundary_conditions = [F.DirichletBC(surfaces=[1, 2], value=0, field=0)]
+    my_model.initial_conditions = [F.InitialCondition(field=1, value=1e24)]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e10, relative_tolerance=1e-10, final_time=100
+    )
+    my_model.dt = F.Stepsize(0.5)
+    return my_model
+
+
+def time_steps(rebuild, nb_steps):
+    """Returns the mean wall-clock time (s) of a time step
+
+    Args:
+        rebuild (bool): if True, the nonlinear problem (and the Jacobian
+            form) are rebuilt at every step
+        nb_steps (int): the number of steps timed
+    """
+    my_model = tds_model()
+    my_model.initialise()
+    my_model.timer = f.Timer()
+    # first step: JIT compilation, not timed
+    my_model.iterate()
+    start = time.perf_counter()
+    for _ in range(nb_steps):
+        if rebuild:
+            my_model.h_transport_problem.J = None
+            my_model.h_transport_problem.problem = None
+        my_model.iterate()
+    return (time.perf_counter() - start) / nb_steps
+
+
+if __name__ == "__main__":
+    nb_steps = 100
+    rebuilt = time_steps(rebuild=True, nb_steps=nb_steps)
+    reused = time_steps(rebuild=False, nb_steps=nb_steps)
+    print("problem rebuilt at every step: {:.2f} ms/step".format(rebuilt * 1e3))
+    print("problem built once:            {:.2f} ms/step".format(reused * 1e3))
+    print("speedup: {:.2f}".format(rebuilt / reused))
@@ -27,7 +27,12 @@ from .helpers import (
     as_constant,
     as_expression,
     as_constant_or_expression,
+    expression_from_sympy,
+    lumped_measure,
+    quadrature_measure,
+    quadrature_degrees,
 )
+from .expressions_registry import ExpressionsRegistry, is_time_dependent
 
 from .meshing.mesh import Mesh
 from .meshing.mesh_1d import Mesh1D
@@ -44,6 +49,8 @@ from .boundary_conditions.dirichlets.dirichlet_bc import (
     DirichletBC,
     BoundaryConditionTheta,
     BoundaryConditionExpression,
+    compiled_boundary_expression,
+    boundary_condition_theta,
 )
 from .boundary_conditions.dirichlets.dc_imp import ImplantationDirichlet
 from .boundary_conditions.dirichlets.sieverts_bc import SievertsBC
@@ -104,7 +111,15 @@ from .materials.materials import Materials
 from .concentration.concentration import Concentration
 from .initial_condition import InitialCondition
 from .concentration.mobile import Mobile
-from .nonlinear_problem import Problem
+from .nonlinear_problem import (
+    Problem,
+    NewtonSolver,
+    direct_solver,
+    snes_solver,
+    fieldsplit_solver,
+    JacobianFreeNewtonSolver,
+    BlockDiagonalPreconditioner,
+)
 from .concentration.theta import Theta
 
 from .concentration.traps.trap import Trap
@@ -116,3 +131,10 @@ from .concentration.traps.neutron_induced_trap import NeutronInducedTrap
 from .h_transport_problem import HTransportProblem
 
 from .generic_simulation import Simulation
+from .jit_cache import (
+    set_jit_cache,
+    jit_cache_dir,
+    cached_libraries,
+    loaded_libraries,
+    precompile,
+)
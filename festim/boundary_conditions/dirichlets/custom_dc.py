@@ -1,4 +1,9 @@
-from festim import DirichletBC, BoundaryConditionExpression
+from festim import (
+    DirichletBC,
+    BoundaryConditionExpression,
+    compiled_boundary_expression,
+    expression_from_sympy,
+)
 import fenics as f
 import sympy as sp
 
@@ -13,6 +18,10 @@ class CustomDirichlet(DirichletBC):
         field (int, optional): the field the boundary condition is
             applied to. Defaults to 0.
 
+    If the function can be evaluated with sympy symbols (arithmetic
+    operations, sympy.exp...), the boundary condition is compiled to C++.
+    Otherwise, it is evaluated in Python.
+
     Example::
 
         def fun(T, solute, param1):
@@ -33,11 +42,18 @@ class CustomDirichlet(DirichletBC):
         self.convert_prms()
 
     def create_expression(self, T):
-        value_BC = BoundaryConditionExpression(
+        value_BC = compiled_boundary_expression(
             T,
             self.function,
             **self.prms,
         )
+        # the function cannot be converted to C++ (eg. it uses fenics.exp)
+        if value_BC is None:
+            value_BC = BoundaryConditionExpression(
+                T,
+                self.function,
+                **self.prms,
+            )
         self.expression = value_BC
         self.sub_expressions = self.prms.values()
 
@@ -47,4 +63,4 @@ class CustomDirichlet(DirichletBC):
             if isinstance(value, (int, float)):
                 self.prms[key] = f.Constant(value)
             else:
-                self.prms[key] = f.Expression(sp.printing.ccode(value), t=0, degree=1)
+                self.prms[key] = expression_from_sympy(value, degree=1)
@@ -1,4 +1,9 @@
-from festim import DirichletBC, BoundaryConditionExpression, k_B
+from festim import (
+    DirichletBC,
+    compiled_boundary_expression,
+    expression_from_sympy,
+    k_B,
+)
 import fenics as f
 import sympy as sp
 
@@ -69,16 +74,16 @@ class ImplantationDirichlet(DirichletBC):
         self.P = P
 
     def create_expression(self, T):
-        phi = f.Expression(sp.printing.ccode(self.phi), t=0, degree=1)
-        R_p = f.Expression(sp.printing.ccode(self.R_p), t=0, degree=1)
+        phi = expression_from_sympy(self.phi, degree=1)
+        R_p = expression_from_sympy(self.R_p, degree=1)
         sub_expressions = [phi, R_p]
         if self.P is not None:
-            P = f.Expression(sp.printing.ccode(self.P), t=0, degree=1)
+            P = expression_from_sympy(self.P, degree=1)
             sub_expressions.append(P)
         else:
             P = self.P
 
-        value_BC = BoundaryConditionExpression(
+        value_BC = compiled_boundary_expression(
             T,
             dc_imp,
             phi=phi,
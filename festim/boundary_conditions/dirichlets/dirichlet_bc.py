@@ -1,6 +1,7 @@
-from festim import BoundaryCondition, k_B
+from festim import BoundaryCondition, expression_from_sympy, k_B
 import fenics as f
 import sympy as sp
+import ufl
 
 
 class DirichletBC(BoundaryCondition):
@@ -26,8 +27,7 @@ class DirichletBC(BoundaryCondition):
         Args:
             T (fenics.Function): temperature
         """
-        value_BC = sp.printing.ccode(self.value)
-        value_BC = f.Expression(value_BC, t=0, degree=4)
+        value_BC = expression_from_sympy(self.value, degree=4)
         # TODO : why degree 4?
 
         self.expression = value_BC
@@ -46,7 +46,7 @@ class DirichletBC(BoundaryCondition):
         # Store the non modified BC to be updated
         self.sub_expressions.append(self.expression)
         # create modified BC based on solubility
-        expression_BC = BoundaryConditionTheta(
+        expression_BC = boundary_condition_theta(
             self.expression, materials, volume_markers, T
         )
         self.expression = expression_BC
@@ -104,6 +104,9 @@ class BoundaryConditionTheta(f.UserExpression):
         T (fenics.Function): Temperature
     """
 
+    # the time dependence is in bci and T
+    _time_dependent = False
+
     def __init__(self, bci, materials, vm, T, **kwargs):
         super().__init__(kwargs)
         self._bci = bci
@@ -111,15 +114,23 @@ class BoundaryConditionTheta(f.UserExpression):
         self._mesh = vm.mesh()
         self._T = T
         self._materials = materials
+        self._material_indices = materials.cell_material_indices(vm)
 
     def eval_cell(self, value, x, ufc_cell):
-        cell = f.Cell(self._mesh, ufc_cell.index)
-        subdomain_id = self._vm[cell]
-        material = self._materials.find_material_from_id(subdomain_id)
+        index = self._material_indices[ufc_cell.index]
+        if index < 0:  # unknown subdomain id, raises an error
+            subdomain_id = self._vm.array()[ufc_cell.index]
+            material = self._materials.find_material_from_id(subdomain_id)
+        else:
+            material = self._materials[index]
         S_0 = material.S_0
         E_S = material.E_S
         c = self._bci(x)
-        S = S_0 * f.exp(-E_S / k_B / self._T(x))
+        if isinstance(self._T, f.Constant):
+            T = float(self._T)
+        else:
+            T = self._T(x)
+        S = S_0 * f.exp(-E_S / k_B / T)
         if material.solubility_law == "sievert":
             value[0] = c / S
         elif material.solubility_law == "henry":
@@ -137,6 +148,9 @@ class BoundaryConditionExpression(f.UserExpression):
         eval_function ([type]): [description]
     """
 
+    # the time dependence is in the parameters and T
+    _time_dependent = False
+
     def __init__(self, T, eval_function, **kwargs):
         super().__init__()
 
@@ -157,7 +171,302 @@ class BoundaryConditionExpression(f.UserExpression):
                 new_prms[key] = prm_val
 
         # evaluate at local point
-        value[0] = self.eval_function(self._T(x), **new_prms)
+        if isinstance(self._T, f.Constant):
+            T = float(self._T)
+        else:
+            T = self._T(x)
+        value[0] = self.eval_function(T, **new_prms)
 
     def value_shape(self):
         return ()
+
+
+BOUNDARY_EXPRESSION_CODE = """
+#include <pybind11/pybind11.h>
+#include <pybind11/eigen.h>
+#include <pybind11/stl.h>
+namespace py = pybind11;
+
+#include <cmath>
+#include <vector>
+#include <dolfin/function/Expression.h>
+#include <dolfin/function/GenericFunction.h>
+
+class BoundaryExpression : public dolfin::Expression
+{
+public:
+  BoundaryExpression() : dolfin::Expression() {}
+
+  void eval(Eigen::Ref<Eigen::VectorXd> values,
+            Eigen::Ref<const Eigen::VectorXd> x,
+            const ufc::cell& cell) const override
+  {
+    double prm[NB_PARAMETERS];
+    for (std::size_t i = 0; i < parameters.size(); ++i)
+    {
+      parameters[i]->eval(values, x, cell);
+      prm[i] = values[0];
+    }
+    T->eval(values, x, cell);
+    const double temperature = values[0];
+    values[0] = VALUE;
+  }
+
+  void eval(Eigen::Ref<Eigen::VectorXd> values,
+            Eigen::Ref<const Eigen::VectorXd> x) const override
+  {
+    double prm[NB_PARAMETERS];
+    for (std::size_t i = 0; i < parameters.size(); ++i)
+    {
+      parameters[i]->eval(values, x);
+      prm[i] = values[0];
+    }
+    T->eval(values, x);
+    const double temperature = values[0];
+    values[0] = VALUE;
+  }
+
+  std::shared_ptr<dolfin::GenericFunction> T;
+  std::vector<std::shared_ptr<dolfin::GenericFunction>> parameters;
+  // not used, the time dependence is in the parameters
+  double t = 0;
+};
+
+PYBIND11_MODULE(SIGNATURE, m)
+{
+  py::class_<BoundaryExpression, std::shared_ptr<BoundaryExpression>, dolfin::Expression>
+    (m, "BoundaryExpression")
+    .def(py::init<>())
+    .def_readwrite("T", &BoundaryExpression::T)
+    .def_readwrite("parameters", &BoundaryExpression::parameters)
+    .def_readwrite("t", &BoundaryExpression::t);
+}
+"""
+
+
+_UFL_FUNCTIONS = {
+    ufl.mathfunctions.Exp: sp.exp,
+    ufl.mathfunctions.Ln: sp.log,
+    ufl.mathfunctions.Sqrt: sp.sqrt,
+    ufl.mathfunctions.Sin: sp.sin,
+    ufl.mathfunctions.Cos: sp.cos,
+    ufl.mathfunctions.Tan: sp.tan,
+    ufl.mathfunctions.Sinh: sp.sinh,
+    ufl.mathfunctions.Cosh: sp.cosh,
+    ufl.mathfunctions.Tanh: sp.tanh,
+    ufl.mathfunctions.Atan: sp.atan,
+    ufl.algebra.Abs: sp.Abs,
+}
+
+
+def _ufl_to_sympy(expression, symbols):
+    """Converts a scalar UFL expression (eg. built with fenics.exp) to sympy
+
+    Args:
+        expression (ufl.core.expr.Expr, float): the expression
+        symbols (dict): the sympy symbols of the UFL terminals
+
+    Raises:
+        ValueError: if the expression contains an unsupported operator
+
+    Returns:
+        sp.Expr: the sympy expression
+    """
+    if not isinstance(expression, ufl.core.expr.Expr):
+        return sp.sympify(expression)
+    if expression in symbols:
+        return symbols[expression]
+    if isinstance(expression, ufl.constantvalue.Zero):
+        return sp.Integer(0)
+    if isinstance(expression, ufl.constantvalue.ScalarValue):
+        return sp.sympify(expression.value())
+    operands = [_ufl_to_sympy(operand, symbols) for operand in expression.ufl_operands]
+    if isinstance(expression, ufl.algebra.Sum):
+        return operands[0] + operands[1]
+    if isinstance(expression, ufl.algebra.Product):
+        return operands[0] * operands[1]
+    if isinstance(expression, ufl.algebra.Division):
+        return operands[0] / operands[1]
+    if isinstance(expression, ufl.algebra.Power):
+        return operands[0] ** operands[1]
+    for ufl_function, sympy_function in _UFL_FUNCTIONS.items():
+        if isinstance(expression, ufl_function):
+            return sympy_function(*operands)
+    raise ValueError("Cannot convert {} to sympy".format(type(expression).__name__))
+
+
+def compiled_boundary_expression(T, eval_function, **kwargs):
+    """Creates a compiled equivalent of BoundaryConditionExpression: the
+    function of T and the parameters is converted to C++ with sympy and T
+    and the parameters (fenics.Expression, fenics.Constant) are evaluated
+    in C++ (on the cell of the point when it is known). The function can
+    be written with sympy or with UFL (eg. fenics.exp, converted to sympy).
+
+    Args:
+        T (fenics.Function, fenics.Constant or fenics.Expression): the
+            temperature
+        eval_function (callable): the function of T and the parameters
+        kwargs: the parameters (fenics.Expression, fenics.Constant, float
+            or None)
+
+    Returns:
+        fenics.CompiledExpression: the expression, None if the function
+            cannot be converted with sympy
+    """
+    parameters = []
+    symbolic_prms = {}
+    for key, value in kwargs.items():
+        if isinstance(value, (f.Expression, f.UserExpression, f.Constant, f.Function)):
+            symbolic_prms[key] = sp.Symbol("prm[{}]".format(len(parameters)))
+            parameters.append(value)
+        else:
+            symbolic_prms[key] = value
+    symbolic_T = sp.Symbol("temperature")
+    try:
+        value = eval_function(symbolic_T, **symbolic_prms)
+    except Exception:
+        # the function uses UFL, it is evaluated with UFL placeholders
+        # (without __float__, unlike fenics.Constant)
+        element = ufl.FiniteElement("Real", ufl.interval, 0)
+        symbols = {}
+        ufl_prms = {}
+        for key, symbol in symbolic_prms.items():
+            if isinstance(symbol, sp.Symbol):
+                placeholder = ufl.Coefficient(element)
+                symbols[placeholder] = symbol
+                ufl_prms[key] = placeholder
+            else:
+                ufl_prms[key] = symbol
+        ufl_T = ufl.Coefficient(element)
+        symbols[ufl_T] = symbolic_T
+        try:
+            value = _ufl_to_sympy(eval_function(ufl_T, **ufl_prms), symbols)
+        except Exception:
+            return None
+    try:
+        code = sp.printing.ccode(sp.sympify(value))
+    except Exception:
+        return None
+
+    source = BOUNDARY_EXPRESSION_CODE.replace("VALUE", code).replace(
+        "NB_PARAMETERS", str(max(len(parameters), 1))
+    )
+    cpp_object = f.compile_cpp_code(source).BoundaryExpression()
+    if isinstance(T, (int, float)):
+        T = f.Constant(T)
+    cpp_object.T = T._cpp_object
+    cpp_object.parameters = [parameter._cpp_object for parameter in parameters]
+    expression = f.CompiledExpression(cpp_object, degree=2)
+    # keeps T and the parameters alive
+    expression._T = T
+    expression._parameters = parameters
+    expression._time_dependent = False
+    return expression
+
+
+BOUNDARY_CONDITION_THETA_CODE = """
+#include <pybind11/pybind11.h>
+#include <pybind11/eigen.h>
+#include <pybind11/stl.h>
+namespace py = pybind11;
+
+#include <cmath>
+#include <map>
+#include <dolfin/function/Expression.h>
+#include <dolfin/function/GenericFunction.h>
+#include <dolfin/mesh/MeshFunction.h>
+
+// c/S (Sievert) or (c/S)**0.5 (Henry) with the solubility of the subdomain
+class BoundaryConditionTheta : public dolfin::Expression
+{
+public:
+  BoundaryConditionTheta() : dolfin::Expression() {}
+
+  void eval(Eigen::Ref<Eigen::VectorXd> values,
+            Eigen::Ref<const Eigen::VectorXd> x,
+            const ufc::cell& cell) const override
+  {
+    const std::size_t subdomain = (*markers)[cell.index];
+    bci->eval(values, x, cell);
+    const double c = values[0];
+    T->eval(values, x, cell);
+    const double S = S_0.at(subdomain) * std::exp(-E_S.at(subdomain) / k_B / values[0]);
+    if (henry.at(subdomain))
+      values[0] = std::sqrt(c / S + DOLFIN_EPS);
+    else
+      values[0] = c / S;
+  }
+
+  std::shared_ptr<dolfin::MeshFunction<std::size_t>> markers;
+  std::shared_ptr<dolfin::GenericFunction> bci;
+  std::shared_ptr<dolfin::GenericFunction> T;
+  std::map<std::size_t, double> S_0;
+  std::map<std::size_t, double> E_S;
+  std::map<std::size_t, bool> henry;
+  double k_B;
+  // not used, the time dependence is in bci and T
+  double t = 0;
+};
+
+PYBIND11_MODULE(SIGNATURE, m)
+{
+  py::class_<BoundaryConditionTheta, std::shared_ptr<BoundaryConditionTheta>, dolfin::Expression>
+    (m, "BoundaryConditionTheta")
+    .def(py::init<>())
+    .def_readwrite("markers", &BoundaryConditionTheta::markers)
+    .def_readwrite("bci", &BoundaryConditionTheta::bci)
+    .def_readwrite("T", &BoundaryConditionTheta::T)
+    .def_readwrite("S_0", &BoundaryConditionTheta::S_0)
+    .def_readwrite("E_S", &BoundaryConditionTheta::E_S)
+    .def_readwrite("henry", &BoundaryConditionTheta::henry)
+    .def_readwrite("k_B", &BoundaryConditionTheta::k_B)
+    .def_readwrite("t", &BoundaryConditionTheta::t);
+}
+"""
+
+_theta_module = None
+
+
+def boundary_condition_theta(bci, materials, vm, T):
+    """Creates the compiled equivalent of BoundaryConditionTheta: the value
+    of the BC is divided by the solubility of the material of each cell
+    (c/S for Sievert's law, (c/S)**0.5 for Henry's law)
+
+    Args:
+        bci (fenics.Expression, fenics.CompiledExpression...): value of BC
+        materials (festim.Materials): contains materials objects
+        vm (fenics.MeshFunction): volume markers
+        T (fenics.Function, fenics.Constant or fenics.Expression): the
+            temperature
+
+    Raises:
+        ValueError: if a subdomain id of vm isn't in the materials
+
+    Returns:
+        fenics.CompiledExpression: the normalised BC
+    """
+    global _theta_module
+    # the C++ maps would throw a bare std::out_of_range
+    materials.check_subdomain_ids(vm)
+    if _theta_module is None:
+        _theta_module = f.compile_cpp_code(BOUNDARY_CONDITION_THETA_CODE)
+    if isinstance(T, (int, float)):
+        T = f.Constant(T)
+    solubility_laws = materials.values_by_id("solubility_law")
+
+    cpp_object = _theta_module.BoundaryConditionTheta()
+    cpp_object.markers = vm
+    cpp_object.bci = bci._cpp_object
+    cpp_object.T = T._cpp_object
+    cpp_object.S_0 = materials.values_by_id("S_0")
+    cpp_object.E_S = materials.values_by_id("E_S")
+    cpp_object.henry = {
+        mat_id: law == "henry" for mat_id, law in solubility_laws.items()
+    }
+    cpp_object.k_B = k_B
+    expression = f.CompiledExpression(cpp_object, degree=2)
+    # keeps the BC value and the temperature alive
+    expression._bci = bci
+    expression._T = T
+    expression._time_dependent = False
+    return expression
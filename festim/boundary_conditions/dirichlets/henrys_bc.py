@@ -1,4 +1,9 @@
-from festim import DirichletBC, BoundaryConditionExpression, k_B
+from festim import (
+    DirichletBC,
+    compiled_boundary_expression,
+    expression_from_sympy,
+    k_B,
+)
 import fenics as f
 import sympy as sp
 
@@ -25,8 +30,8 @@ class HenrysBC(DirichletBC):
         self.pressure = pressure
 
     def create_expression(self, T):
-        pressure = f.Expression(sp.printing.ccode(self.pressure), t=0, degree=1)
-        value_BC = BoundaryConditionExpression(
+        pressure = expression_from_sympy(self.pressure, degree=1)
+        value_BC = compiled_boundary_expression(
             T,
             henrys_law,
             H_0=self.H_0,
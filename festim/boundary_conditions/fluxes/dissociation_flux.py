@@ -1,4 +1,4 @@
-from festim import FluxBC, k_B
+from festim import FluxBC, k_B, expression_from_sympy
 import fenics as f
 import sympy as sp
 
@@ -23,11 +23,24 @@ class DissociationFlux(FluxBC):
         self.P = P
         super().__init__(surfaces=surfaces, field=0)
 
-    def create_form(self, T, solute):
-        Kd_0_expr = f.Expression(sp.printing.ccode(self.Kd_0), t=0, degree=1)
-        E_Kd_expr = f.Expression(sp.printing.ccode(self.E_Kd), t=0, degree=1)
-        P_expr = f.Expression(sp.printing.ccode(self.P), t=0, degree=1)
+    def create_form(self, T, solute, arrhenius=None):
+        """Creates the form of the flux
 
-        Kd = Kd_0_expr * f.exp(-E_Kd_expr / k_B / T)
+        Args:
+            T (ufl.Expr): the temperature
+            solute (ufl.Expr): the mobile concentration
+            arrhenius (callable, optional): function returning the
+                Arrhenius factor of an activation energy (see
+                festim.Temperature.arrhenius), used if E_Kd is a number.
+                Defaults to None.
+        """
+        Kd_0_expr = expression_from_sympy(self.Kd_0, degree=1)
+        E_Kd_expr = expression_from_sympy(self.E_Kd, degree=1)
+        P_expr = expression_from_sympy(self.P, degree=1)
+
+        if arrhenius is not None and isinstance(self.E_Kd, (int, float)):
+            Kd = Kd_0_expr * arrhenius(self.E_Kd)
+        else:
+            Kd = Kd_0_expr * f.exp(-E_Kd_expr / k_B / T)
         self.form = Kd * P_expr
         self.sub_expressions = [Kd_0_expr, E_Kd_expr, P_expr]
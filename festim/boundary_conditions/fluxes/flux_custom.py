@@ -1,4 +1,4 @@
-from festim import FluxBC
+from festim import FluxBC, expression_from_sympy
 import sympy as sp
 import fenics as f
 
@@ -39,4 +39,4 @@ class CustomFlux(FluxBC):
             if isinstance(value, (int, float)):
                 self.prms[key] = f.Constant(value)
             else:
-                self.prms[key] = f.Expression(sp.printing.ccode(value), t=0, degree=1)
+                self.prms[key] = expression_from_sympy(value, degree=1)
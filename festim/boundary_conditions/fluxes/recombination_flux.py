@@ -1,4 +1,4 @@
-from festim import FluxBC, k_B
+from festim import FluxBC, k_B, expression_from_sympy
 import fenics as f
 import sympy as sp
 
@@ -23,10 +23,23 @@ class RecombinationFlux(FluxBC):
         self.order = order
         super().__init__(surfaces=surfaces, field=0)
 
-    def create_form(self, T, solute):
-        Kr_0_expr = f.Expression(sp.printing.ccode(self.Kr_0), t=0, degree=1)
-        E_Kr_expr = f.Expression(sp.printing.ccode(self.E_Kr), t=0, degree=1)
+    def create_form(self, T, solute, arrhenius=None):
+        """Creates the form of the flux
 
-        Kr = Kr_0_expr * f.exp(-E_Kr_expr / k_B / T)
+        Args:
+            T (ufl.Expr): the temperature
+            solute (ufl.Expr): the mobile concentration
+            arrhenius (callable, optional): function returning the
+                Arrhenius factor of an activation energy (see
+                festim.Temperature.arrhenius), used if E_Kr is a number.
+                Defaults to None.
+        """
+        Kr_0_expr = expression_from_sympy(self.Kr_0, degree=1)
+        E_Kr_expr = expression_from_sympy(self.E_Kr, degree=1)
+
+        if arrhenius is not None and isinstance(self.E_Kr, (int, float)):
+            Kr = Kr_0_expr * arrhenius(self.E_Kr)
+        else:
+            Kr = Kr_0_expr * f.exp(-E_Kr_expr / k_B / T)
         self.form = -Kr * solute**self.order
         self.sub_expressions = [Kr_0_expr, E_Kr_expr]
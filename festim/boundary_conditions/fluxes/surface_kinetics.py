@@ -1,4 +1,4 @@
-from festim import FluxBC
+from festim import FluxBC, expression_from_sympy
 from fenics import *
 import sympy as sp
 
@@ -56,6 +56,8 @@ class SurfaceKinetics(FluxBC):
     Attributes:
         previous_solutions (list): list containing solutions (fenics.Function or ufl.Indexed)
             on each surface for "previous" timestep
+        second_previous_solutions (list): list containing solutions on each
+            surface before the "previous" timestep (used by BDF2)
         test_functions (list): list containing test functions (fenics.TestFunction or ufl.Indexed)
             for each surface
         post_processing_solutions (list): list containing solutions (fenics.Function or ufl.Indexed)
@@ -112,10 +114,20 @@ class SurfaceKinetics(FluxBC):
 
         self.solutions = [None] * len(self.surfaces)
         self.previous_solutions = [None] * len(self.surfaces)
+        self.second_previous_solutions = [None] * len(self.surfaces)
         self.test_functions = [None] * len(self.surfaces)
         self.post_processing_solutions = [None] * len(self.surfaces)
 
-    def create_form(self, solute, solute_prev, solute_test_function, T, ds, dt):
+    def create_form(
+        self,
+        solute,
+        solute_prev,
+        solute_test_function,
+        T,
+        ds,
+        dt,
+        solute_second_prev=None,
+    ):
         """
         Creates the general form associated with the surface species
 
@@ -128,6 +140,9 @@ class SurfaceKinetics(FluxBC):
             T (festim.Temperature): the temperature of the simulation
             ds (fenics.Measure): the ds measure of the sim
             dt (festim.Stepsize): the step-size
+            solute_second_prev (fenics.Function or ufl.Indexed, optional):
+                mobile solution before the "previous" timestep, only needed
+                with BDF2. Defaults to None.
         """
 
         lambda_IS = self.lambda_IS
@@ -156,7 +171,11 @@ class SurfaceKinetics(FluxBC):
             if dt is not None:
                 # Surface concentration form
                 self.form += (
-                    (self.solutions[i] - self.previous_solutions[i])
+                    dt.backward_difference(
+                        self.solutions[i],
+                        self.previous_solutions[i],
+                        self.second_previous_solutions[i],
+                    )
                     / dt.value
                     * self.test_functions[i]
                     * ds(surf)
@@ -164,7 +183,7 @@ class SurfaceKinetics(FluxBC):
                 # Flux to solute species
                 self.form += (
                     lambda_IS
-                    * (solute - solute_prev)
+                    * dt.backward_difference(solute, solute_prev, solute_second_prev)
                     / dt.value
                     * solute_test_function
                     * ds(surf)
@@ -181,4 +200,4 @@ class SurfaceKinetics(FluxBC):
             if isinstance(value, (int, float)):
                 self.prms[key] = Constant(value)
             else:
-                self.prms[key] = Expression(sp.printing.ccode(value), t=0, degree=1)
+                self.prms[key] = expression_from_sympy(value, degree=1)
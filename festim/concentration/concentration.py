@@ -13,12 +13,17 @@ class Concentration:
         previous_solution (fenics.Function or ufl.Indexed): Solution for
             "previous" timestep
         test_function (fenics.TestFunction or ufl.Indexed): test function
+
+    Attributes:
+        second_previous_solution (fenics.Function or ufl.Indexed): Solution
+            before the "previous" timestep (used by BDF2)
     """
 
     def __init__(self, solution=None, previous_solution=None, test_function=None):
         self.solution = solution
         self.previous_solution = previous_solution
         self.test_function = test_function
+        self.second_previous_solution = None
         self.sub_expressions = []
         self.F = None
         self.post_processing_solution = None  # used for post treatment
@@ -1,4 +1,14 @@
-from festim import Concentration, FluxBC, k_B, RadioactiveDecay, SurfaceKinetics
+from festim import (
+    Concentration,
+    FluxBC,
+    k_B,
+    RadioactiveDecay,
+    SurfaceKinetics,
+    RecombinationFlux,
+    DissociationFlux,
+    lumped_measure,
+    quadrature_measure,
+)
 from fenics import *
 
 
@@ -21,7 +31,17 @@ class Mobile(Concentration):
         self.sources = []
         self.boundary_conditions = []
 
-    def create_form(self, materials, mesh, T, dt=None, traps=None, soret=False):
+    def create_form(
+        self,
+        materials,
+        mesh,
+        T,
+        dt=None,
+        traps=None,
+        soret=False,
+        lumped_mass=False,
+        quadrature_degrees=None,
+    ):
         """Creates the variational formulation.
 
         Args:
@@ -34,14 +54,39 @@ class Mobile(Concentration):
                 potential is assumed. Defaults to False.
             soret (bool, optional): If True, Soret effect is assumed. Defaults
                 to False.
+            lumped_mass (bool, optional): If True, the transient and trapping
+                terms are lumped (vertex quadrature). Defaults to False.
+            quadrature_degrees (dict, optional): the quadrature degree of
+                the "diffusion", "trapping", "fluxes" and "sources" terms
+                (estimated by UFL if None). Defaults to None.
         """
         self.F = 0
-        self.create_diffusion_form(materials, mesh, T, dt=dt, traps=traps, soret=soret)
-        self.create_source_form(mesh.dx)
-        self.create_fluxes_form(T, mesh.ds, dt)
+        self.create_diffusion_form(
+            materials,
+            mesh,
+            T,
+            dt=dt,
+            traps=traps,
+            soret=soret,
+            lumped_mass=lumped_mass,
+            quadrature_degrees=quadrature_degrees,
+        )
+        degrees = quadrature_degrees or {}
+        self.create_source_form(quadrature_measure(mesh.dx, degrees.get("sources")))
+        self.create_fluxes_form(
+            T, quadrature_measure(mesh.ds, degrees.get("fluxes")), dt
+        )
 
     def create_diffusion_form(
-        self, materials, mesh, T, dt=None, traps=None, soret=False
+        self,
+        materials,
+        mesh,
+        T,
+        dt=None,
+        traps=None,
+        soret=False,
+        lumped_mass=False,
+        quadrature_degrees=None,
     ):
         """Creates the variational formulation for the diffusive part.
 
@@ -55,7 +100,15 @@ class Mobile(Concentration):
                 potential is assumed. Defaults to False.
             soret (bool, optional): If True, Soret effect is assumed. Defaults
                 to False.
+            lumped_mass (bool, optional): If True, the transient and trapping
+                terms are lumped (vertex quadrature). Defaults to False.
+            quadrature_degrees (dict, optional): the quadrature degree of
+                the "diffusion", "trapping", "fluxes" and "sources" terms
+                (estimated by UFL if None). Defaults to None.
         """
+        degrees = quadrature_degrees or {}
+        dx_lumped = lumped_measure(mesh.dx)
+        dx_diffusion = quadrature_measure(mesh.dx, degrees.get("diffusion"))
 
         F = 0
         for material in materials:
@@ -69,11 +122,15 @@ class Mobile(Concentration):
 
             # add to the formulation F for every subdomain
             for subdomain in subdomains:
-                dx = mesh.dx(subdomain)
+                dx = dx_diffusion(subdomain)
                 # transient form
                 if dt is not None:
-                    F += ((c_0 - c_0_n) / dt.value) * self.test_function * dx
-                D = D_0 * exp(-E_D / k_B / T.T)
+                    dx_transient = dx_lumped(subdomain) if lumped_mass else dx
+                    difference = dt.backward_difference(
+                        c_0, c_0_n, self.second_previous_solution
+                    )
+                    F += (difference / dt.value) * self.test_function * dx_transient
+                D = D_0 * T.arrhenius(E_D)
                 if mesh.type == "cartesian":
                     F += dot(D * grad(c_0), grad(self.test_function)) * dx
                     if soret:
@@ -133,9 +190,27 @@ class Mobile(Concentration):
 
         # add the trapping terms
         F_trapping = 0
+        if lumped_mass:
+            dx_trapping = dx_lumped
+        else:
+            dx_trapping = quadrature_measure(mesh.dx, degrees.get("trapping"))
         if traps is not None:
             for trap in traps:
                 for i, mat in enumerate(trap.materials):
+                    if trap.eliminated:
+                        # c_t is a nodal function of c_m: lumped integration
+                        c_m, _ = self.get_concentration_for_a_given_material(mat, T)
+                        c_t = trap.eliminated_concentration(i, c_m, T, dt)
+                        k_0, E_k, p_0, E_p, density = trap.get_properties(i)
+                        F_trapping += (
+                            (
+                                -k_0 * T.arrhenius(E_k) * c_m * (density - c_t)
+                                + p_0 * T.arrhenius(E_p) * c_t
+                            )
+                            * self.test_function
+                            * dx_lumped(mat.id)
+                        )
+                        continue
                     if type(trap.k_0) is list:
                         k_0 = trap.k_0[i]
                         E_k = trap.E_k[i]
@@ -151,18 +226,18 @@ class Mobile(Concentration):
                     c_m, _ = self.get_concentration_for_a_given_material(mat, T)
                     F_trapping += (
                         -k_0
-                        * exp(-E_k / k_B / T.T)
+                        * T.arrhenius(E_k)
                         * c_m
                         * (density - trap.solution)
                         * self.test_function
-                        * dx(mat.id)
+                        * dx_trapping(mat.id)
                     )
                     F_trapping += (
                         p_0
-                        * exp(-E_p / k_B / T.T)
+                        * T.arrhenius(E_p)
                         * trap.solution
                         * self.test_function
-                        * dx(mat.id)
+                        * dx_trapping(mat.id)
                     )
         F += -F_trapping
 
@@ -217,10 +292,15 @@ class Mobile(Concentration):
                             T,
                             ds,
                             dt,
+                            solute_second_prev=self.second_previous_solution,
                         )
                         F += bc.form
                     else:
-                        bc.create_form(T.T, solute)
+                        cached = isinstance(bc, (RecombinationFlux, DissociationFlux))
+                        if cached and T.arrhenius_cache:
+                            bc.create_form(T.T, solute, arrhenius=T.arrhenius)
+                        else:
+                            bc.create_form(T.T, solute)
                         for surf in bc.surfaces:
                             F += -self.test_function * bc.form * ds(surf)
                     # TODO : one day we will get rid of this huge expressions list
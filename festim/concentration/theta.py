@@ -31,7 +31,7 @@ class Theta(Mobile):
         dx = f.Measure("dx", subdomain_data=self.volume_markers)
         F = 0
         for mat in self.materials:
-            S = mat.S_0 * f.exp(-mat.E_S / k_B / self.T.T)
+            S = mat.S_0 * self.T.arrhenius(mat.E_S)
             F += -prev_sol * v * dx(mat.id)
             if mat.solubility_law == "sievert":
                 F += comp / S * v * dx(mat.id)
@@ -56,7 +56,7 @@ class Theta(Mobile):
         """
         E_S = material.E_S
         S_0 = material.S_0
-        S = S_0 * f.exp(-E_S / k_B / T.T)
+        S = S_0 * T.arrhenius(E_S)
         S_n = S_0 * f.exp(-E_S / k_B / T.T_n)
         if material.solubility_law == "sievert":
             c_0 = self.solution * S
@@ -1,5 +1,5 @@
-from festim import Trap, as_constant_or_expression
-from fenics import NewtonSolver, MPI
+from festim import Trap, as_constant_or_expression, snes_solver
+from fenics import NewtonSolver, PETScSNESSolver, MPI
 import warnings
 
 
@@ -17,6 +17,10 @@ class ExtrinsicTrapBase(Trap):
         maximum_iterations=30,
         linear_solver=None,
         preconditioner=None,
+        nonlinear_solver="newton",
+        snes_type="newtonls",
+        line_search="bt",
+        inexact_newton=False,
         **kwargs,
     ):
         """Inits ExtrinsicTrap
@@ -42,6 +46,15 @@ class ExtrinsicTrapBase(Trap):
             preconditioner (str, optional): preconditioning method for the newton solver,
                 options can be viewed by print(list_krylov_solver_preconditioners()).
                 Defaults to "default".
+            nonlinear_solver (str, optional): the nonlinear solver, "newton"
+                (fenics.NewtonSolver) or "snes" (fenics.PETScSNESSolver).
+                Defaults to "newton".
+            snes_type (str, optional): the SNES method, "newtonls" or
+                "newtontr". Defaults to "newtonls".
+            line_search (str, optional): the line search of the "newtonls"
+                SNES method ("basic", "bt", "l2" or "cp"). Defaults to "bt".
+            inexact_newton (bool, optional): If True, Eisenstat-Walker
+                inexact Newton is used by the SNES solver. Defaults to False.
         """
         super().__init__(k_0, E_k, p_0, E_p, materials, density=None, id=id)
         self.absolute_tolerance = absolute_tolerance
@@ -49,11 +62,16 @@ class ExtrinsicTrapBase(Trap):
         self.maximum_iterations = maximum_iterations
         self.linear_solver = linear_solver
         self.preconditioner = preconditioner
+        self.nonlinear_solver = nonlinear_solver
+        self.snes_type = snes_type
+        self.line_search = line_search
+        self.inexact_newton = inexact_newton
 
         self.newton_solver = None
         for name, val in kwargs.items():
             setattr(self, name, as_constant_or_expression(val))
         self.density_previous_solution = None
+        self.density_second_previous_solution = None
         self.density_test_function = None
 
     @property
@@ -64,15 +82,30 @@ class ExtrinsicTrapBase(Trap):
     def newton_solver(self, value):
         if value is None:
             self._newton_solver = value
-        elif isinstance(value, NewtonSolver):
+        elif isinstance(value, (NewtonSolver, PETScSNESSolver)):
             if self._newton_solver:
                 print("Settings for the Newton solver will be overwritten")
             self._newton_solver = value
         else:
-            raise TypeError("accepted type for newton_solver is fenics.NewtonSolver")
+            raise TypeError(
+                "accepted type for newton_solver is fenics.NewtonSolver or fenics.PETScSNESSolver"
+            )
 
     def define_newton_solver(self):
         """Creates the Newton solver and sets its parameters"""
+        if self.nonlinear_solver == "snes":
+            self.newton_solver = snes_solver(
+                absolute_tolerance=self.absolute_tolerance,
+                relative_tolerance=self.relative_tolerance,
+                maximum_iterations=self.maximum_iterations,
+                linear_solver=self.linear_solver,
+                preconditioner=self.preconditioner,
+                snes_type=self.snes_type,
+                line_search=self.line_search,
+                inexact_newton=self.inexact_newton,
+                prefix="festim_extrinsic_trap_{}_".format(self.id),
+            )
+            return
         self.newton_solver = NewtonSolver(MPI.comm_world)
         self.newton_solver.parameters["error_on_nonconvergence"] = False
         self.newton_solver.parameters["absolute_tolerance"] = self.absolute_tolerance
@@ -145,8 +178,13 @@ class ExtrinsicTrap(ExtrinsicTrapBase):
             extrinsic traps, but potential for subclasses of extrinsic traps
         """
         density = self.density[0]
+        difference = dt.backward_difference(
+            density,
+            self.density_previous_solution,
+            self.density_second_previous_solution,
+        )
         F = (
-            ((density - self.density_previous_solution) / dt.value)
+            (difference / dt.value)
             * self.density_test_function
             * dx
         )
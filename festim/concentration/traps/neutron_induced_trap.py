@@ -71,8 +71,13 @@ class NeutronInducedTrap(ExtrinsicTrapBase):
         density = self.density[0]
         T = T.T
 
+        difference = dt.backward_difference(
+            density,
+            self.density_previous_solution,
+            self.density_second_previous_solution,
+        )
         F = (
-            ((density - self.density_previous_solution) / dt.value)
+            (difference / dt.value)
             * self.density_test_function
             * dx
         )
@@ -1,4 +1,12 @@
-from festim import Concentration, k_B, Material, Theta, RadioactiveDecay
+from festim import (
+    Concentration,
+    Material,
+    Theta,
+    RadioactiveDecay,
+    lumped_measure,
+    quadrature_measure,
+    expression_from_sympy,
+)
 from fenics import *
 import sympy as sp
 import numpy as np
@@ -17,6 +25,15 @@ class Trap(Concentration):
             the trap density (m-3)
         id (int, optional): The trap id. Defaults to None.
 
+    Attributes:
+        eliminated (bool): if True, the trap is not part of the H transport
+            system and its concentration is recovered from the mobile
+            concentration (see festim.Settings.eliminate_traps)
+        recovery_form (fenics.Form): the lumped form giving the trapped
+            concentration when the trap is eliminated
+        nodal_forms (list): the lumped forms giving the nodal trapping rate,
+            detrapping rate and density (operator splitting)
+
     Raises:
         ValueError: if duplicates are found in materials
 
@@ -51,6 +68,11 @@ class Trap(Concentration):
         self.make_density(density)
         self.sources = []
 
+        self.eliminated = False
+        self.recovery_form = None
+        self.nodal_forms = None
+        self.lumped_mass = None
+
     @property
     def materials(self):
         return self._materials
@@ -96,17 +118,24 @@ class Trap(Concentration):
                     self.density.append(density)
                 # else assume it's a sympy expression
                 else:
-                    density_expr = sp.printing.ccode(density)
                     self.density.append(
-                        Expression(
-                            density_expr,
+                        expression_from_sympy(
+                            density,
                             degree=2,
-                            t=0,
                             name="density_{}_{}".format(self.id, i),
                         )
                     )
 
-    def create_form(self, mobile, materials, T, dx, dt=None):
+    def create_form(
+        self,
+        mobile,
+        materials,
+        T,
+        dx,
+        dt=None,
+        lumped_mass=False,
+        quadrature_degrees=None,
+    ):
         """Creates the general form associated with the trap
         d ct/ dt = k c_m (n - c_t) - p c_t + S
 
@@ -117,13 +146,35 @@ class Trap(Concentration):
             dx (fenics.Measure): the dx measure of the sim
             dt (festim.Stepsize, optional): If None assuming steady state.
                 Defaults to None.
+            lumped_mass (bool, optional): If True, the time derivative and
+                trapping terms are lumped. Defaults to False.
+            quadrature_degrees (dict, optional): the quadrature degree of
+                the "trapping" and "sources" terms (estimated by UFL if
+                None). Defaults to None.
         """
+        degrees = quadrature_degrees or {}
         self.F = 0
-        self.create_trapping_form(mobile, materials, T, dx, dt)
+        if self.eliminated:
+            if self.sources:
+                raise NotImplementedError(
+                    "Sources in traps are not implemented with eliminate_traps"
+                )
+            self.create_recovery_form(mobile, materials, T, dx, dt)
+            return
+        self.create_trapping_form(
+            mobile,
+            materials,
+            T,
+            quadrature_measure(dx, degrees.get("trapping")),
+            dt,
+            lumped_mass,
+        )
         if self.sources is not None:
-            self.create_source_form(dx)
+            self.create_source_form(quadrature_measure(dx, degrees.get("sources")))
 
-    def create_trapping_form(self, mobile, materials, T, dx, dt=None):
+    def create_trapping_form(
+        self, mobile, materials, T, dx, dt=None, lumped_mass=False
+    ):
         """d ct/ dt = k c_m (n - c_t) - p c_t
 
         Args:
@@ -133,7 +184,11 @@ class Trap(Concentration):
             dx (fenics.Measure): the dx measure of the sim
             dt (festim.Stepsize, optional): If None assuming steady state.
                 Defaults to None.
+            lumped_mass (bool, optional): If True, the terms are integrated
+                with a vertex quadrature (lumped mass). Defaults to False.
         """
+        if lumped_mass:
+            dx = lumped_measure(dx)
         solution = self.solution
         prev_solution = self.previous_solution
         test_function = self.test_function
@@ -146,7 +201,10 @@ class Trap(Concentration):
 
         if dt is not None:
             # d(c_t)/dt in trapping equation
-            F_trapping += ((solution - prev_solution) / dt.value) * test_function * dx
+            difference = dt.backward_difference(
+                solution, prev_solution, self.second_previous_solution
+            )
+            F_trapping += (difference / dt.value) * test_function * dx
         else:
             # if the sim is steady state and
             # if a trap is not defined in one subdomain
@@ -183,20 +241,150 @@ class Trap(Concentration):
             # k(T)*c_m*(n - c_t) - p(T)*c_t
             F_trapping += (
                 -k_0
-                * exp(-E_k / k_B / T.T)
+                * T.arrhenius(E_k)
                 * c_0
                 * (density - solution)
                 * test_function
                 * dx(mat.id)
             )
             F_trapping += (
-                p_0 * exp(-E_p / k_B / T.T) * solution * test_function * dx(mat.id)
+                p_0 * T.arrhenius(E_p) * solution * test_function * dx(mat.id)
             )
 
         self.F_trapping = F_trapping
         self.F += self.F_trapping
         self.sub_expressions += expressions_trap
 
+    def get_properties(self, i):
+        """Returns the trap properties in the i-th material of the trap
+
+        Args:
+            i (int): the index of the material in self.materials
+
+        Returns:
+            tuple: k_0, E_k, p_0, E_p, density
+        """
+        if type(self.k_0) is list:
+            return (
+                self.k_0[i],
+                self.E_k[i],
+                self.p_0[i],
+                self.E_p[i],
+                self.density[i],
+            )
+        return self.k_0, self.E_k, self.p_0, self.E_p, self.density[0]
+
+    def eliminated_concentration(self, i, c_m, T, dt=None):
+        """Expresses the trapped concentration as a function of the mobile
+        concentration in the i-th material of the trap, from the (nodal)
+        implicit discretisation of d ct/ dt = k c_m (n - c_t) - p c_t with
+        the backward differentiation formula of dt (see
+        festim.Stepsize.bdf_coefficients):
+
+        c_t = (a_1 c_t_n - a_2 c_t_nm1 + dt k c_m n) / (a_0 + dt (k c_m + p))
+
+        or, in steady state, c_t = k c_m n / (k c_m + p)
+
+        Args:
+            i (int): the index of the material in self.materials
+            c_m (ufl.Expr): the mobile concentration
+            T (festim.Temperature): the temperature of the simulation
+            dt (festim.Stepsize, optional): If None assuming steady state.
+                Defaults to None.
+
+        Returns:
+            ufl.Expr: the trapped concentration
+        """
+        k_0, E_k, p_0, E_p, density = self.get_properties(i)
+        k = k_0 * T.arrhenius(E_k)
+        p = p_0 * T.arrhenius(E_p)
+        if dt is None:
+            return k * c_m * density / (k * c_m + p)
+        a_0, a_1, a_2 = dt.bdf_coefficients()
+        history = a_1 * self.previous_solution
+        if dt.time_scheme != "backward_euler":
+            history -= a_2 * self.second_previous_solution
+        return (history + dt.value * k * c_m * density) / (
+            a_0 + dt.value * (k * c_m + p)
+        )
+
+    def create_recovery_form(self, mobile, materials, T, dx, dt=None):
+        """Creates the lumped (vertex quadrature) form giving the nodal values
+        of the eliminated trap concentration: c_t = b / m with b the
+        assembled recovery form and m the lumped mass
+
+        Args:
+            mobile (festim.Mobile): the mobile concentration of the simulation
+            materials (festim.Materials): the materials of the simulation
+            T (festim.Temperature): the temperature of the simulation
+            dx (fenics.Measure): the dx measure of the sim
+            dt (festim.Stepsize, optional): If None assuming steady state.
+                Defaults to None.
+        """
+        if not all(isinstance(mat, Material) for mat in self.materials):
+            self.make_materials(materials)
+
+        dx_lumped = lumped_measure(dx)
+        test_function = self.test_function
+        form = 0
+        for i, mat in enumerate(self.materials):
+            c_m, _ = mobile.get_concentration_for_a_given_material(mat, T)
+            c_t = self.eliminated_concentration(i, c_m, T, dt)
+            form += c_t * test_function * dx_lumped(mat.id)
+            self.sub_expressions.append(self.get_properties(i)[-1])
+        if dt is not None:
+            # the trap is unchanged where it is not defined
+            for mat in materials:
+                if mat not in self.materials:
+                    form += self.previous_solution * test_function * dx_lumped(mat.id)
+
+        self.recovery_form = Form(form)
+        self.lumped_mass = assemble(test_function * dx_lumped)
+
+    def create_nodal_forms(self, T, dx):
+        """Creates the lumped (vertex quadrature) forms giving the nodal
+        values of the trapping rate k, the detrapping rate p and the density
+        n of the trap (weighted averages at materials interfaces)
+
+        Args:
+            T (festim.Temperature): the temperature of the simulation
+            dx (fenics.Measure): the dx measure of the sim
+        """
+        if self.sources:
+            raise NotImplementedError(
+                "Sources in traps are not implemented with splitting"
+            )
+        dx_lumped = lumped_measure(dx)
+        test_function = self.test_function
+        k_form, p_form, n_form = 0, 0, 0
+        for i, mat in enumerate(self.materials):
+            k_0, E_k, p_0, E_p, density = self.get_properties(i)
+            k_form += k_0 * T.arrhenius(E_k) * test_function * dx_lumped(mat.id)
+            p_form += p_0 * T.arrhenius(E_p) * test_function * dx_lumped(mat.id)
+            n_form += density * test_function * dx_lumped(mat.id)
+            self.sub_expressions.append(density)
+
+        self.nodal_forms = [Form(k_form), Form(p_form), Form(n_form)]
+        self.lumped_mass = assemble(test_function * dx_lumped)
+
+    def nodal_values(self):
+        """Returns the nodal values of the trapping rate k, the detrapping
+        rate p and the density n of the trap
+
+        Returns:
+            list: the numpy.ndarray of k, p and n
+        """
+        mass = self.lumped_mass.get_local()
+        return [assemble(form).get_local() / mass for form in self.nodal_forms]
+
+    def recover(self):
+        """Computes the nodal values of the eliminated trap concentration
+        from the current mobile concentration"""
+        b = assemble(self.recovery_form)
+        values = b.get_local() / self.lumped_mass.get_local()
+        self.solution.vector().set_local(values)
+        self.solution.vector().apply("insert")
+
     def create_source_form(self, dx):
         """Create the source form for the trap
 
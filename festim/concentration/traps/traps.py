@@ -1,5 +1,6 @@
 import festim
 import fenics as f
+import numpy as np
 import warnings
 
 
@@ -71,13 +72,95 @@ class Traps(list):
             if trap.id is None:
                 trap.id = i
 
-    def create_forms(self, mobile, materials, T, dx, dt=None):
+    def create_forms(
+        self,
+        mobile,
+        materials,
+        T,
+        dx,
+        dt=None,
+        lumped_mass=False,
+        quadrature_degrees=None,
+    ):
         self.F = 0
         for trap in self:
-            trap.create_form(mobile, materials, T, dx, dt=dt)
+            trap.create_form(
+                mobile,
+                materials,
+                T,
+                dx,
+                dt=dt,
+                lumped_mass=lumped_mass,
+                quadrature_degrees=quadrature_degrees,
+            )
             self.F += trap.F
             self.sub_expressions += trap.sub_expressions
 
+    def create_nodal_forms(self, T, dx):
+        """Creates the nodal forms of the traps for the operator splitting
+        of the trapping kinetics
+
+        Args:
+            T (festim.Temperature): the temperature of the simulation
+            dx (fenics.Measure): the dx measure of the sim
+        """
+        for trap in self:
+            trap.create_nodal_forms(T, dx)
+            self.sub_expressions += trap.sub_expressions
+
+    def integrate_trapping(self, c_m, h, tolerance=1e-12, maximum_iterations=50):
+        """Integrates the trapping kinetics over h at every node with
+        backward Euler:
+
+        d c_t/dt = k c_m (n - c_t) - p c_t
+        d c_m/dt = - sum(d c_t/dt)
+
+        Each c_t is expressed in closed form as a function of c_m and the
+        remaining scalar equation on c_m is solved with a vectorised Newton
+        method (analytic derivative). The traps solutions are updated.
+
+        Args:
+            c_m (numpy.ndarray): the nodal mobile concentration
+            h (float): the time step (s)
+            tolerance (float, optional): relative tolerance on the Newton
+                increment. Defaults to 1e-12.
+            maximum_iterations (int, optional): maximum number of Newton
+                iterations. Defaults to 50.
+
+        Returns:
+            numpy.ndarray: the nodal mobile concentration after trapping
+        """
+        rates = [
+            (*trap.nodal_values(), trap.solution.vector().get_local())
+            for trap in self
+        ]
+
+        def trapped(c, k, p, n, c_t0):
+            return (c_t0 + h * k * c * n) / (1 + h * (k * c + p))
+
+        c_m0 = c_m.copy()
+        c = c_m.copy()
+        scale = np.max(np.abs(c_m0), initial=0) + np.sum(
+            [np.max(c_t0, initial=0) for *_, c_t0 in rates]
+        )
+        for i in range(maximum_iterations):
+            residual = c - c_m0
+            derivative = np.ones_like(c)
+            for k, p, n, c_t0 in rates:
+                residual += trapped(c, k, p, n, c_t0) - c_t0
+                derivative += (
+                    h * k * (n * (1 + h * p) - c_t0) / (1 + h * (k * c + p)) ** 2
+                )
+            increment = residual / derivative
+            c = np.maximum(c - increment, 0)
+            if np.max(np.abs(increment), initial=0) <= tolerance * scale:
+                break
+
+        for trap, (k, p, n, c_t0) in zip(self, rates):
+            trap.solution.vector().set_local(trapped(c, k, p, n, c_t0))
+            trap.solution.vector().apply("insert")
+        return c
+
     def get_trap(self, id):
         for trap in self:
             if trap.id == id:
@@ -91,6 +174,7 @@ class Traps(list):
                 trap.density = [f.Function(V)]
                 trap.density_test_function = f.TestFunction(V)
                 trap.density_previous_solution = f.project(f.Constant(0), V)
+                trap.density_second_previous_solution = f.Function(V)
 
     def define_variational_problem_extrinsic_traps(self, dx, dt, T):
         """
@@ -130,4 +214,7 @@ class Traps(list):
     def update_extrinsic_traps_density(self):
         for trap in self:
             if isinstance(trap, festim.ExtrinsicTrapBase):
+                trap.density_second_previous_solution.assign(
+                    trap.density_previous_solution
+                )
                 trap.density_previous_solution.assign(trap.density[0])
@@ -0,0 +1,71 @@
+from fenics import Constant, Function
+
+
+def is_time_dependent(expression):
+    """Checks if an expression has to be updated with the time. Expressions
+    created from sympy (see festim.expression_from_sympy) and the festim
+    expressions carry a _time_dependent flag, other expressions (eg. user
+    defined fenics.Expression) are assumed to be time dependent.
+
+    Args:
+        expression: the expression (fenics.Expression, fenics.Constant...)
+
+    Returns:
+        bool: True if the expression depends on t
+    """
+    if isinstance(expression, (Constant, Function, int, float)):
+        return False
+    return getattr(expression, "_time_dependent", True)
+
+
+class ExpressionsRegistry:
+    """Collection of expressions updated with the time. The expressions are
+    stored once each (an expression shared by several terms is only
+    updated once) and only the time dependent ones are updated.
+
+    Args:
+        expressions (list, optional): the expressions. Defaults to [].
+
+    Attributes:
+        expressions (list): the unique expressions
+        time_dependent (list): the unique time dependent expressions
+        nb_updated (int): the number of expressions updated at the last
+            call of update()
+    """
+
+    def __init__(self, expressions=[]) -> None:
+        self.expressions = []
+        self.time_dependent = []
+        self.nb_updated = 0
+        self._ids = set()
+        self.add(expressions)
+
+    def add(self, expressions):
+        """Adds expressions to the registry, the expressions already
+        registered are ignored
+
+        Args:
+            expressions (list): the expressions
+        """
+        for expression in expressions:
+            # fenics objects overload __eq__, ids are used instead
+            if id(expression) in self._ids:
+                continue
+            self._ids.add(id(expression))
+            self.expressions.append(expression)
+            if is_time_dependent(expression):
+                self.time_dependent.append(expression)
+
+    def update(self, t):
+        """Updates the time dependent expressions
+
+        Args:
+            t (float): the time
+
+        Returns:
+            int: the number of expressions updated
+        """
+        for expression in self.time_dependent:
+            expression.t = t
+        self.nb_updated = len(self.time_dependent)
+        return self.nb_updated
@@ -336,7 +336,11 @@ class Simulation:
         self.exports.V_DG1 = self.V_DG1
 
         # Define temperature
+        self.T.arrhenius_cache = self.settings.arrhenius_cache
+        self.T.arrhenius_functions = {}
         if isinstance(self.T, festim.HeatTransferProblem):
+            self.T.quadrature_degrees = self.settings.quadrature_degrees
+            self.T.coupled = self.settings.coupled_heat_transfer
             self.T.create_functions(self.materials, self.mesh, self.dt)
         elif isinstance(self.T, festim.Temperature):
             self.T.create_functions(self.mesh)
@@ -433,10 +437,6 @@ class Simulation:
         # add final_time to Exports
         self.exports.final_time = self.settings.final_time
 
-        # compute Jacobian before iterating if required
-        if not self.settings.update_jacobian:
-            self.h_transport_problem.compute_jacobian()
-
         #  Time-stepping
         print("Time stepping...")
         while self.t < self.settings.final_time and not np.isclose(
@@ -448,7 +448,12 @@ class Simulation:
         # Solve steady state
         print("Solving steady state problem...")
 
-        nb_iterations, converged = self.h_transport_problem.solve_once()
+        if self.settings.pseudo_transient:
+            nb_iterations, converged = (
+                self.h_transport_problem.solve_pseudo_transient()
+            )
+        else:
+            nb_iterations, converged = self.h_transport_problem.solve_once()
 
         # Post processing
         self.run_post_processing()
@@ -465,12 +470,42 @@ class Simulation:
 
     def iterate(self):
         """Advance the model by one iteration"""
-        # Update current time
-        self.t += float(self.dt.value)
-        # update temperature
-        self.T.update(self.t)
-        # update H problem
-        self.h_transport_problem.update(self.t, self.dt)
+        t_n = self.t
+        if self.dt.error_control is not None:
+            # the step may be rejected and redone from t_n
+            temperatures = [
+                getattr(self.T, name)
+                for name in ["T", "T_n", "T_nm1"]
+                if getattr(self.T, name, None) is not None
+            ]
+            backups = [
+                Constant(float(T)) if isinstance(T, Constant) else T.copy(deepcopy=True)
+                for T in temperatures
+            ]
+            # the skipped solves of the heat transfer problem
+            heat_transfer_state = {
+                name: getattr(self.T, name)
+                for name in [
+                    "thermal_steady_state",
+                    "nb_skipped_solves",
+                    "_expressions_values",
+                ]
+                if hasattr(self.T, name)
+            }
+        accepted = False
+        while not accepted:
+            # Update current time
+            self.t = t_n + float(self.dt.value)
+            # update temperature
+            self.T.update(self.t)
+            # update H problem
+            accepted = self.h_transport_problem.update(self.t, self.dt)
+            if not accepted:
+                for T, backup in zip(temperatures, backups):
+                    T.assign(backup)
+                for name, value in heat_transfer_state.items():
+                    setattr(self.T, name, value)
+        self.dt.previous_value.assign(self.t - t_n)
 
         # Display time
         self.display_time()
@@ -519,7 +554,7 @@ class Simulation:
             "solute": self.mobile.post_processing_solution,
             "0": self.mobile.post_processing_solution,
             0: self.mobile.post_processing_solution,
-            "T": self.T.T,
+            "T": self.T.post_processing_solution,
             "retention": sum(
                 [self.mobile.post_processing_solution]
                 + [trap.post_processing_solution for trap in self.traps]
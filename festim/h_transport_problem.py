@@ -1,5 +1,7 @@
 from fenics import *
+from ufl import replace
 import festim
+import numpy as np
 
 
 class HTransportProblem:
@@ -16,13 +18,38 @@ class HTransportProblem:
 
     Attributes:
         expressions (list): contains time-dependent fenics.Expressions
+        expressions_registry (festim.ExpressionsRegistry): the unique time
+            dependent expressions updated at each step, built from
+            expressions at the first update
         J (ufl.Form): the jacobian of the variational problem
         V (fenics.FunctionSpace): the vector-function space for concentrations
+        V_traps (fenics.FunctionSpace): the function space of the traps
+            when they are eliminated or split (see festim.Settings)
         u (fenics.Function): the vector holding the concentrations (c_m, ct1,
-            ct2, ...)
+            ct2, ...) and the temperature as last component if
+            settings.coupled_heat_transfer is True
         v (fenics.TestFunction): the test function
         u_n (fenics.Function): the "previous" function
-        newton_solver (fenics.NewtonSolver): Newton solver for solving the nonlinear problem
+        u_nm1 (fenics.Function): the function before the "previous" one
+            (used by BDF2)
+        newton_solver (fenics.NewtonSolver or fenics.PETScSNESSolver): Newton
+            solver for solving the nonlinear problem
+        solver_statistics (list): for each time step, a dict with the time
+            "t", the number of "iterations" of the accepted solve, the
+            number of "rejected_solves", the numbers of
+            "residual_evaluations" and "jacobian_evaluations" and
+            "predicted" (True if the initial guess was extrapolated), the
+            normalised local truncation "error" (with error control) and
+            the number of "updated_expressions"
+        history (list): the last accepted solutions as (t, values) tuples,
+            used by the predictor (see festim.Settings)
+        problem (festim.Problem): the nonlinear problem (compiled forms and
+            assembler). Built once and reused for every solve.
+        pseudo_problem (festim.Problem): the steady problem with a pseudo
+            time derivative (see settings.pseudo_transient)
+        pseudo_dt (fenics.Constant): the pseudo time step (s)
+        jacobian_free_preconditioner (festim.BlockDiagonalPreconditioner):
+            the preconditioner of the Jacobian-free Newton-Krylov solver
         bcs (list): list of fenics.DirichletBC for H transport
     """
 
@@ -37,13 +64,26 @@ class HTransportProblem:
         self.u = None
         self.v = None
         self.u_n = None
+        self.u_nm1 = None
         self.newton_solver = None
+        self.problem = None
+        self.pseudo_problem = None
+        self.pseudo_dt = None
+        self.jacobian_free_preconditioner = None
 
         self.boundary_conditions = []
         self.bcs = None
         self.V = None
         self.V_CG1 = None
+        self.V_traps = None
         self.expressions = []
+        self.expressions_registry = None
+        self.solver_statistics = []
+        self.history = []
+        self._nb_rejected_steps = 0
+        self._jacobian_dt = None
+        self._mobile_assigners = None
+        self._temperature_assigner = None
 
     @property
     def newton_solver(self):
@@ -53,12 +93,14 @@ class HTransportProblem:
     def newton_solver(self, value):
         if value is None:
             self._newton_solver = value
-        elif isinstance(value, NewtonSolver):
+        elif isinstance(value, (NewtonSolver, PETScSNESSolver)):
             if self._newton_solver:
                 print("Settings for the Newton solver will be overwritten")
             self._newton_solver = value
         else:
-            raise TypeError("accepted type for newton_solver is fenics.NewtonSolver")
+            raise TypeError(
+                "accepted type for newton_solver is fenics.NewtonSolver or fenics.PETScSNESSolver"
+            )
 
     @property
     def _all_surf_kinetics(self):
@@ -68,6 +110,28 @@ class HTransportProblem:
             if isinstance(bc, festim.SurfaceKinetics)
         ]
 
+    @property
+    def _traps_out_of_space(self):
+        """True if the traps are not part of the function space (eliminated
+        or split traps)"""
+        return self.settings.eliminate_traps or self.settings.splitting is not None
+
+    @property
+    def _traps_in_space(self):
+        """The traps solved in the H transport system (eliminated and split
+        traps are not part of the function space)"""
+        if self._traps_out_of_space:
+            return []
+        return list(self.traps)
+
+    @property
+    def _temperature_index(self):
+        """The index of the temperature in the function space (None if the
+        heat transfer is not coupled)"""
+        if not self.settings.coupled_heat_transfer:
+            return None
+        return self.V.num_sub_spaces() - 1
+
     def initialise(self, mesh, materials, dt=None):
         """Assigns BCs, create suitable function space, initialise
         concentration fields, define variational problem
@@ -78,6 +142,28 @@ class HTransportProblem:
             dt (festim.Stepsize, optional): the stepsize, only needed if
                 self.settings.transient is True. Defaults to None.
         """
+        if (
+            self.settings.chemical_pot
+            and dt is not None
+            and dt.time_scheme != "backward_euler"
+        ):
+            raise NotImplementedError(
+                "Only backward Euler is implemented with chemical potential"
+            )
+        if self.settings.splitting is not None:
+            self.check_splitting(dt)
+        if self.settings.coupled_heat_transfer:
+            self.check_coupled_heat_transfer()
+        if self.settings.jacobian_free and (
+            self.settings.chemical_pot or self.settings.nonlinear_solver == "snes"
+        ):
+            raise NotImplementedError(
+                "jacobian_free is not implemented with chemical potential or SNES"
+            )
+        if self.settings.pseudo_transient and self.settings.transient:
+            raise ValueError(
+                "pseudo_transient is only available for steady state simulations"
+            )
         if self.settings.chemical_pot:
             self.mobile.S = materials.S
             self.mobile.materials = materials
@@ -99,15 +185,66 @@ class HTransportProblem:
             self.mobile.create_form_post_processing(self.V_DG1, materials, mesh.dx)
 
         self.define_variational_problem(materials, mesh, dt)
+        if self.settings.jacobian_free:
+            self.define_jacobian_free_preconditioner(materials, mesh, dt)
         self.define_newton_solver()
 
         # Boundary conditions
         print("Defining boundary conditions")
         self.create_dirichlet_bcs(materials, mesh)
+        self.define_problem()
+        if self.settings.pseudo_transient:
+            self.define_pseudo_transient_problem(mesh)
         if self.settings.transient:
             self.traps.define_variational_problem_extrinsic_traps(mesh.dx, dt, self.T)
             self.traps.define_newton_solver_extrinsic_traps()
 
+    def check_splitting(self, dt):
+        """Checks that the operator splitting of the trapping kinetics is
+        compatible with the other settings
+
+        Args:
+            dt (festim.Stepsize): the stepsize
+        """
+        if not self.settings.transient:
+            raise ValueError("splitting is only available for transient simulations")
+        if self.settings.eliminate_traps:
+            raise ValueError("splitting and eliminate_traps cannot be used together")
+        if self.settings.traps_element_type != "CG":
+            raise ValueError("splitting requires traps_element_type='CG'")
+        if self.settings.chemical_pot:
+            raise NotImplementedError(
+                "splitting is not implemented with chemical potential"
+            )
+        if dt.time_scheme != "backward_euler":
+            raise NotImplementedError(
+                "Only backward Euler is implemented with splitting"
+            )
+
+    def check_coupled_heat_transfer(self):
+        """Checks that the temperature can be solved with the H transport
+        problem"""
+        if not (
+            self.settings.transient
+            and isinstance(self.T, festim.HeatTransferProblem)
+            and self.T.transient
+        ):
+            raise ValueError(
+                "coupled_heat_transfer requires a transient simulation and a "
+                "transient festim.HeatTransferProblem"
+            )
+        if (
+            self.settings.chemical_pot
+            or self.settings.jacobian_free
+            or self.settings.arrhenius_cache
+            or self.settings.preconditioner == "fieldsplit"
+        ):
+            raise NotImplementedError(
+                "coupled_heat_transfer is not implemented with chemical "
+                "potential, jacobian_free, arrhenius_cache or the fieldsplit "
+                "preconditioner"
+            )
+
     def define_function_space(self, mesh):
         """Creates a suitable function space for H transport problem
 
@@ -118,12 +255,14 @@ class HTransportProblem:
         element_solute, order_solute = "CG", 1
 
         # function space for H concentrations
-        nb_traps = len(self.traps)
+        nb_traps = len(self._traps_in_space)
 
         # the number of surfaces where SurfaceKinetics is used
         nb_adsorbed = sum([len(bc.surfaces) for bc in self._all_surf_kinetics])
 
-        if nb_traps == 0 and nb_adsorbed == 0:
+        coupled = self.settings.coupled_heat_transfer
+
+        if nb_traps == 0 and nb_adsorbed == 0 and not coupled:
             V = FunctionSpace(mesh.mesh, element_solute, order_solute)
         else:
             solute = FiniteElement(element_solute, mesh.mesh.ufl_cell(), order_solute)
@@ -132,9 +271,16 @@ class HTransportProblem:
             )
             adsorbed = FiniteElement("R", mesh.mesh.ufl_cell(), 0)
             element = [solute] + [traps] * nb_traps + [adsorbed] * nb_adsorbed
+            if coupled:
+                # same element as festim.HeatTransferProblem
+                element.append(FiniteElement("CG", mesh.mesh.ufl_cell(), 1))
             V = FunctionSpace(mesh.mesh, MixedElement(element))
 
         self.V = V
+        if self._traps_out_of_space:
+            self.V_traps = FunctionSpace(
+                mesh.mesh, self.settings.traps_element_type, order_trap
+            )
         self.V_CG1 = FunctionSpace(mesh.mesh, "CG", 1)
         self.V_DG1 = FunctionSpace(mesh.mesh, "DG", 1)
 
@@ -150,15 +296,25 @@ class HTransportProblem:
         self.u = Function(self.V, name="c")  # Function for concentrations
         self.v = TestFunction(self.V)  # TestFunction for concentrations
         self.u_n = Function(self.V, name="c_n")
+        self.u_nm1 = Function(self.V, name="c_nm1")
+
+        if self._traps_out_of_space:
+            for trap in self.traps:
+                trap.eliminated = self.settings.eliminate_traps
+                trap.solution = Function(self.V_traps)
+                trap.previous_solution = Function(self.V_traps)
+                trap.second_previous_solution = Function(self.V_traps)
+                trap.test_function = TestFunction(self.V_traps)
 
         if self.V.num_sub_spaces() == 0:
             self.mobile.solution = self.u
             self.mobile.previous_solution = self.u_n
+            self.mobile.second_previous_solution = self.u_nm1
             self.mobile.test_function = self.v
         else:
             conc_list = [self.mobile]
-            if self.traps:
-                conc_list += [*self.traps]
+            if self._traps_in_space:
+                conc_list += self._traps_in_space
             if len(self._all_surf_kinetics) > 0:
                 conc_list += self._all_surf_kinetics
 
@@ -191,7 +347,9 @@ class HTransportProblem:
             value = ini.value
             component = field_to_component[ini.field]
 
-            if self.V.num_sub_spaces() == 0:
+            if component != 0 and self._traps_out_of_space:
+                functionspace = self.V_traps
+            elif self.V.num_sub_spaces() == 0:
                 functionspace = self.V
             else:
                 functionspace = self.V.sub(component).collapse()
@@ -208,7 +366,7 @@ class HTransportProblem:
 
         # assign initial condition for SurfaceKinetics BC
         # iterate through each surface of each SurfaceKinetics
-        index = len(self.traps) + 1
+        index = len(self._traps_in_space) + 1
         for bc in self._all_surf_kinetics:
             for i in range(len(bc.previous_solutions)):
                 functionspace = self.V.sub(index).collapse()
@@ -216,6 +374,15 @@ class HTransportProblem:
                 assign(bc.previous_solutions[i], comp)
                 index += 1
 
+        # the temperature starts from the initial condition of the heat
+        # transfer problem
+        if self.settings.coupled_heat_transfer:
+            self.T.T.assign(self.T.T_n)
+            index = self._temperature_index
+            assigner = FunctionAssigner(self.V.sub(index), self.T.T.function_space())
+            assigner.assign(self.u_n.sub(index), self.T.T_n)
+            assigner.assign(self.u.sub(index), self.T.T_n)
+
         # initial guess needs to be non zero if chemical pot
         if self.settings.chemical_pot:
             if self.V.num_sub_spaces() == 0:
@@ -237,10 +404,16 @@ class HTransportProblem:
                         concentration.previous_solutions[i] = list(split(self.u_n))[
                             index
                         ]
+                        concentration.second_previous_solutions[i] = list(
+                            split(self.u_nm1)
+                        )[index]
                         index += 1
                 else:
                     concentration.solution = list(split(self.u))[index]
                     concentration.previous_solution = list(split(self.u_n))[index]
+                    concentration.second_previous_solution = list(
+                        split(self.u_nm1)
+                    )[index]
                     index += 1
 
     def define_variational_problem(self, materials, mesh, dt=None):
@@ -258,23 +431,141 @@ class HTransportProblem:
         F = 0
 
         # diffusion + transient terms
-
+        # with splitting the trapping is integrated separately
+        split_trapping = self.settings.splitting is not None
         self.mobile.create_form(
-            materials, mesh, self.T, dt, traps=self.traps, soret=self.settings.soret
+            materials,
+            mesh,
+            self.T,
+            dt,
+            traps=None if split_trapping else self.traps,
+            soret=self.settings.soret,
+            lumped_mass=self.settings.lumped_mass,
+            quadrature_degrees=self.settings.quadrature_degrees,
         )
         F += self.mobile.F
         expressions += self.mobile.sub_expressions
 
         # Add traps
-        self.traps.create_forms(self.mobile, materials, self.T, mesh.dx, dt)
-        F += self.traps.F
+        if split_trapping:
+            self.traps.create_nodal_forms(self.T, mesh.dx)
+        else:
+            self.traps.create_forms(
+                self.mobile,
+                materials,
+                self.T,
+                mesh.dx,
+                dt,
+                lumped_mass=self.settings.lumped_mass,
+                quadrature_degrees=self.settings.quadrature_degrees,
+            )
+            F += self.traps.F
         expressions += self.traps.sub_expressions
+
+        if self.settings.coupled_heat_transfer:
+            # the temperature is the last component of u
+            T = list(split(self.u))[-1]
+            v_T = list(split(self.v))[-1]
+            F += replace(self.T.F, {self.T.v_T: v_T})
+            F = replace(F, {self.T.T: T})
         self.F = F
         self.expressions = expressions
+        self.expressions_registry = None
+
+    def define_jacobian_free_preconditioner(self, materials, mesh, dt=None):
+        """Creates the block diagonal preconditioner of the Jacobian-free
+        Newton-Krylov solver: the diffusion (and mass) block of the mobile
+        concentration and the lumped diagonals of the traps blocks
+        (1/dt + k c_m + p). The other blocks are the identity.
+
+        Args:
+            materials (festim.Materials): the materials
+            mesh (festim.Mesh): the mesh
+            dt (festim.Stepsize, optional): the stepsize, only needed if
+                self.settings.transient is True. Defaults to None.
+        """
+        preconditioner = festim.BlockDiagonalPreconditioner(
+            self.V, prefix="festim_h_transport_"
+        )
+        dx_lumped = festim.lumped_measure(mesh.dx)
+
+        V_mobile = preconditioner.spaces[0]
+        c, v = TrialFunction(V_mobile), TestFunction(V_mobile)
+        a = 0
+        for material in materials:
+            subdomains = material.id
+            if not isinstance(subdomains, list):
+                subdomains = [subdomains]
+            D = material.D_0 * self.T.arrhenius(material.E_D)
+            for subdomain in subdomains:
+                a += D * dot(grad(c), grad(v)) * mesh.dx(subdomain)
+        if dt is not None:
+            a += c * v / dt.value * dx_lumped
+        for trap in self._traps_in_space:
+            for i, mat in enumerate(trap.materials):
+                k_0, E_k, p_0, E_p, density = trap.get_properties(i)
+                k = k_0 * self.T.arrhenius(E_k)
+                a += k * (density - trap.solution) * c * v * dx_lumped(mat.id)
+        preconditioner.forms[0] = a
+
+        for index, trap in enumerate(self._traps_in_space, 1):
+            v = TestFunction(preconditioner.spaces[index])
+            L = 0
+            for i, mat in enumerate(trap.materials):
+                k_0, E_k, p_0, E_p, density = trap.get_properties(i)
+                k = k_0 * self.T.arrhenius(E_k)
+                p = p_0 * self.T.arrhenius(E_p)
+                L += (k * self.mobile.solution + p) * v * dx_lumped(mat.id)
+            if dt is not None:
+                L += v / dt.value * dx_lumped
+            preconditioner.forms[index] = L
+        self.jacobian_free_preconditioner = preconditioner
 
     def define_newton_solver(self):
         """Creates the Newton solver and sets its parameters"""
-        self.newton_solver = NewtonSolver(MPI.comm_world)
+        if self.settings.nonlinear_solver == "snes":
+            self.newton_solver = festim.snes_solver(
+                absolute_tolerance=self.settings.absolute_tolerance,
+                relative_tolerance=self.settings.relative_tolerance,
+                maximum_iterations=self.settings.maximum_iterations,
+                linear_solver=self.settings.linear_solver,
+                preconditioner=self.settings.preconditioner,
+                snes_type=self.settings.snes_type,
+                line_search=self.settings.line_search,
+                inexact_newton=self.settings.inexact_newton,
+                prefix="festim_h_transport_",
+            )
+            return
+        if self.settings.jacobian_free:
+            self.newton_solver = festim.JacobianFreeNewtonSolver(
+                MPI.comm_world,
+                preconditioner=self.jacobian_free_preconditioner,
+                ksp_type=self.settings.linear_solver or "gmres",
+                prefix="festim_h_transport_",
+            )
+        elif self.settings.reuse_factorization:
+            method = self.settings.linear_solver
+            if method in [None, "default"]:
+                method = "mumps"
+            linear_solver = festim.direct_solver(
+                method,
+                reuse_factorization=not self.settings.update_jacobian,
+                prefix="festim_h_transport_",
+            )
+            self.newton_solver = festim.NewtonSolver(MPI.comm_world, linear_solver)
+        elif self.settings.preconditioner == "fieldsplit":
+            linear_solver, setup = festim.fieldsplit_solver(
+                self.V,
+                nb_traps=len(self._traps_in_space),
+                nb_adsorbed=sum([len(bc.surfaces) for bc in self._all_surf_kinetics]),
+                ksp_type=self.settings.linear_solver or "gmres",
+                prefix="festim_h_transport_",
+            )
+            self.newton_solver = festim.NewtonSolver(
+                MPI.comm_world, linear_solver, linear_solver_setup=setup
+            )
+        else:
+            self.newton_solver = festim.NewtonSolver(MPI.comm_world)
         self.newton_solver.parameters["error_on_nonconvergence"] = False
         self.newton_solver.parameters["absolute_tolerance"] = (
             self.settings.absolute_tolerance
@@ -301,6 +592,7 @@ class HTransportProblem:
         problem and add them to self.bcs
         """
         self.bcs = []
+        self.expressions_registry = None
         for bc in self.boundary_conditions:
             if bc.field != "T" and isinstance(bc, festim.DirichletBC):
                 bc.create_dirichletbc(
@@ -315,9 +607,113 @@ class HTransportProblem:
                 self.expressions += bc.sub_expressions
                 self.expressions.append(bc.expression)
 
+        if self.settings.coupled_heat_transfer:
+            # the expressions are updated by the heat transfer problem
+            V_T = self.V.sub(self._temperature_index)
+            for bc in self.T.boundary_conditions:
+                if isinstance(bc, festim.DirichletBC) and bc.field == "T":
+                    for surf in bc.surfaces:
+                        self.bcs.append(
+                            DirichletBC(V_T, bc.expression, mesh.surface_markers, surf)
+                        )
+
     def compute_jacobian(self):
         du = TrialFunction(self.u.function_space())
         self.J = derivative(self.F, self.u, du)
+        # the problem needs to be rebuilt with the new jacobian
+        self.problem = None
+
+    def define_problem(self):
+        """Creates the festim.Problem solved by the Newton solver.
+        The forms are compiled and the assembler is created only once, the
+        problem is then reused for every time step and every retry.
+        """
+        if self.J is None:
+            self.compute_jacobian()
+        self.problem = festim.Problem(
+            self.J, self.F, self.bcs, reuse_sparsity=self.settings.reuse_sparsity
+        )
+        if self.settings.reuse_factorization:
+            # modified Newton: the factorized matrix is kept for all steps
+            self.problem.update_jacobian = self.settings.update_jacobian
+        if self.settings.coupled_heat_transfer:
+            # the Dirichlet BCs depending on T (eg. Sievert's law) are
+            # evaluated with the temperature of the current Newton iterate
+            self.problem.before_assembly = self.assign_coupled_temperature
+
+    def define_pseudo_transient_problem(self, mesh):
+        """Creates the steady problem with a lumped pseudo time derivative
+        (u - u_n)/pseudo_dt for all the components
+
+        Args:
+            mesh (festim.Mesh): the mesh
+        """
+        self.pseudo_dt = Constant(
+            self.settings.pseudo_transient_initial_step, name="pseudo_dt"
+        )
+        F = self.F + inner(self.u - self.u_n, self.v) / self.pseudo_dt * (
+            festim.lumped_measure(mesh.dx)
+        )
+        J = derivative(F, self.u, TrialFunction(self.u.function_space()))
+        self.pseudo_problem = festim.Problem(J, F, self.bcs)
+
+    def residual_norm(self):
+        """Returns the l2 norm of the residual of the steady problem at the
+        current solution
+
+        Returns:
+            float: the norm of the residual
+        """
+        b = PETScVector()
+        self.problem.F(b, self.u.vector())
+        return b.norm("l2")
+
+    def solve_pseudo_transient(self, maximum_steps=100):
+        """Solves the steady state problem by pseudo-transient continuation.
+        The pseudo time step is grown as the steady residual falls (switched
+        evolution relaxation): pseudo_dt_k+1 = pseudo_dt_k * R_k-1 / R_k.
+        If the Newton solver diverges, the pseudo step is redone with a ten
+        times smaller pseudo time step.
+
+        Args:
+            maximum_steps (int, optional): the maximum number of pseudo time
+                steps. Defaults to 100.
+
+        Returns:
+            int, bool: total number of Newton iterations, True if the steady
+                residual reached the tolerances of the settings else False
+        """
+        if self.problem is None:
+            self.define_problem()
+        tau = self.settings.pseudo_transient_initial_step
+        residual_0 = residual = self.residual_norm()
+        nb_iterations = 0
+        for step in range(maximum_steps):
+            if (
+                residual <= self.settings.absolute_tolerance
+                or residual <= self.settings.relative_tolerance * residual_0
+            ):
+                return nb_iterations, True
+            self.u_n.assign(self.u)
+            self.pseudo_dt.assign(tau)
+            nb_it, converged = self.solve_once(self.pseudo_problem)
+            nb_iterations += nb_it
+            if not converged:
+                self.u.assign(self.u_n)
+                tau /= 10
+                continue
+            previous_residual, residual = residual, self.residual_norm()
+            info(
+                "Pseudo time step {}: pseudo_dt = {:.2e} s, residual = {:.2e}".format(
+                    step, tau, residual
+                )
+            )
+            tau *= previous_residual / max(residual, DOLFIN_EPS)
+        converged = (
+            residual <= self.settings.absolute_tolerance
+            or residual <= self.settings.relative_tolerance * residual_0
+        )
+        return nb_iterations, converged
 
     def update(self, t, dt):
         """Updates the H transport problem.
@@ -325,46 +721,269 @@ class HTransportProblem:
         Args:
             t (float): the current time (s)
             dt (festim.Stepsize): the stepsize
+
+        Returns:
+            bool: False if the step was rejected by the error control of dt
+                (the solution is then reset and dt reduced, the step must be
+                redone from the previous time), else True
         """
-        festim.update_expressions(self.expressions, t)
+        if self.expressions_registry is None:
+            self.expressions_registry = festim.ExpressionsRegistry(self.expressions)
+        self.expressions_registry.update(t)
+
+        if self.problem is None:
+            self.define_problem()
+        nb_residual_evaluations = self.problem.nb_residual_evaluations
+        nb_jacobian_evaluations = self.problem.nb_jacobian_evaluations
+
+        keep_history = (
+            self.settings.predictor is not None or dt.error_control is not None
+        )
+        if keep_history and not self.history:
+            # the initial state
+            self.history.append(
+                (t - float(dt.value), self.u_n.vector().get_local())
+            )
 
         converged = False
+        nb_solves = 0
+        predicted = False
         u_ = Function(self.u.function_space())
         u_.assign(self.u)
         while converged is False:
-            self.u.assign(u_)
+            if self.settings.splitting is not None:
+                # every attempt starts from the state at the previous time
+                self.reset_split_step(u_)
+                if self.settings.splitting == "strang":
+                    self.integrate_trapping(self.u_n, float(dt.value) / 2)
+            if self.settings.predictor is not None and nb_solves == 0:
+                predicted = self.predict(t)
+            else:
+                # retries start from the previous solution
+                self.u.assign(u_)
+            if not self.problem.update_jacobian:
+                # the reused Jacobian is outdated once the stepsize has
+                # changed (adaptive stepsize, rejected steps) or a solve failed
+                if nb_solves > 0 or float(dt.value) != self._jacobian_dt:
+                    self.problem.refresh_jacobian()
+                self._jacobian_dt = float(dt.value)
             nb_it, converged = self.solve_once()
+            nb_solves += 1
+            if dt.error_control is not None:
+                break
             if dt.adaptive_stepsize is not None or dt.milestones is not None:
                 dt.adapt(t, nb_it, converged)
 
+        error = None
+        if dt.error_control is not None:
+            error = self.estimate_error(t, dt) if converged else np.inf
+            if not dt.adapt_to_error(t, error):
+                if self.settings.splitting is not None:
+                    self.reset_split_step(u_)
+                self.u.assign(u_)
+                self._nb_rejected_steps += 1
+                return False
+
+        if self.settings.splitting == "lie":
+            self.integrate_trapping(self.u, float(dt.value))
+        elif self.settings.splitting == "strang":
+            self.integrate_trapping(self.u, float(dt.value) / 2)
+
+        self.solver_statistics.append(
+            {
+                "t": t,
+                "iterations": nb_it,
+                "rejected_solves": nb_solves - 1 + self._nb_rejected_steps,
+                "residual_evaluations": self.problem.nb_residual_evaluations
+                - nb_residual_evaluations,
+                "jacobian_evaluations": self.problem.nb_jacobian_evaluations
+                - nb_jacobian_evaluations,
+                "predicted": predicted,
+                "error": error,
+                "updated_expressions": self.expressions_registry.nb_updated,
+            }
+        )
+        self._nb_rejected_steps = 0
+        if keep_history:
+            self.history.append((t, self.u.vector().get_local()))
+            self.history = self.history[-3:]
+        info(
+            "H transport: {iterations} iteration(s), {rejected_solves} rejected "
+            "solve(s), {residual_evaluations} residual and "
+            "{jacobian_evaluations} jacobian evaluation(s)".format(
+                **self.solver_statistics[-1]
+            )
+        )
+
         # Update previous solutions
         self.update_previous_solutions()
+        if self.settings.coupled_heat_transfer:
+            self.update_coupled_temperature()
 
         # Solve extrinsic traps formulation
         self.traps.solve_extrinsic_traps()
+        return True
+
+    def assign_coupled_temperature(self):
+        """Copies the temperature component of u to the temperature of the
+        heat transfer problem"""
+        if self._temperature_assigner is None:
+            self._temperature_assigner = FunctionAssigner(
+                self.T.T.function_space(), self.V.sub(self._temperature_index)
+            )
+        self._temperature_assigner.assign(
+            self.T.T, self.u.sub(self._temperature_index)
+        )
+
+    def update_coupled_temperature(self):
+        """Copies the temperature component of u to the heat transfer
+        problem (used by the exports and the next time step)"""
+        self.assign_coupled_temperature()
+        self.T.T_nm1.assign(self.T.T_n)
+        self.T.T_n.assign(self.T.T)
+
+    def reset_split_step(self, u_):
+        """Resets the previous mobile concentration and the traps to the
+        state at the previous time (undoing a first half trapping step)
+
+        Args:
+            u_ (fenics.Function): the solution at the previous time
+        """
+        self.u_n.assign(u_)
+        for trap in self.traps:
+            trap.solution.assign(trap.previous_solution)
+
+    def integrate_trapping(self, u, h):
+        """Integrates the trapping kinetics over h at every node (see
+        festim.Traps.integrate_trapping). The mobile concentration of u and
+        the traps solutions are updated.
+
+        Args:
+            u (fenics.Function): the function holding the mobile
+                concentration (self.u or self.u_n)
+            h (float): the time step (s)
+        """
+        if self.V.num_sub_spaces() == 0:
+            c_m = u.vector().get_local()
+            u.vector().set_local(self.traps.integrate_trapping(c_m, h))
+            u.vector().apply("insert")
+            return
 
-    def solve_once(self):
+        if self._mobile_assigners is None:
+            self._mobile_values = Function(self.V_traps)
+            self._mobile_assigners = (
+                FunctionAssigner(self.V_traps, self.V.sub(0)),
+                FunctionAssigner(self.V.sub(0), self.V_traps),
+            )
+        to_nodes, from_nodes = self._mobile_assigners
+        to_nodes.assign(self._mobile_values, u.sub(0))
+        c_m = self._mobile_values.vector().get_local()
+        self._mobile_values.vector().set_local(self.traps.integrate_trapping(c_m, h))
+        self._mobile_values.vector().apply("insert")
+        from_nodes.assign(u.sub(0), self._mobile_values)
+
+    def estimate_error(self, t, dt):
+        """Estimates the local truncation error of the step from its
+        difference with the extrapolation of the last accepted solutions
+        (Milne's device). With u - u(t) = C_c u^(p+1) the local error of the
+        scheme and u_pred - u(t) = C_p u^(p+1) the error of the
+        extrapolation, e = C_c / (C_c - C_p) * (u - u_pred).
+        For backward Euler the extrapolation is linear, C_c = dt**2/2 and
+        C_p = -dt*(dt + dt_n)/2 so e = dt / (2*dt + dt_n) * (u - u_pred).
+        For BDF2 it is quadratic, with omega = dt/dt_n,
+        C_c = (1 + omega)/(1 + 2*omega) * dt**2 * (dt + dt_n)/6 and
+        C_p = -(t - t_n)(t - t_nm1)(t - t_nm2)/6.
+
+        Args:
+            t (float): the current time (s)
+            dt (festim.Stepsize): the stepsize
+
+        Returns:
+            float: the error normalised by the tolerances of dt (RMS norm),
+                None if there are not enough accepted solutions
+        """
+        points = self.history[-(dt.order + 1) :]
+        if len(points) < 2:
+            return None
+        u = self.u.vector().get_local()
+        u_pred = extrapolate(points, t)
+        if len(points) == 2:
+            (t_0, _), (t_1, _) = points
+            c_c = (t - t_1) ** 2 / 2
+            c_p = -(t - t_1) * (t - t_0) / 2
+        else:
+            (t_0, _), (t_1, _), (t_2, _) = points
+            h, h_n = t - t_2, t_2 - t_1
+            omega = h / h_n
+            c_c = (1 + omega) / (1 + 2 * omega) * h**2 * (h + h_n) / 6
+            c_p = -(t - t_2) * (t - t_1) * (t - t_0) / 6
+        ratio = c_c / (c_c - c_p)
+        e = ratio * (u - u_pred)
+
+        rtol = dt.error_control["tolerance"]
+        atol = dt.error_control["absolute_tolerance"]
+        if atol is None:
+            atol = rtol * MPI.max(MPI.comm_world, np.max(np.abs(u), initial=0))
+        scale = np.maximum(rtol * np.abs(u) + atol, np.finfo(float).tiny)
+        sum_squares = MPI.sum(MPI.comm_world, np.sum((e / scale) ** 2))
+        size = self.u.vector().size()
+        return float(np.sqrt(sum_squares / size))
+
+    def predict(self, t):
+        """Sets the initial guess of the Newton solver by extrapolating the
+        last accepted solutions (Lagrange polynomial of degree 1 or 2
+        depending on settings.predictor) to the time t
+
+        Args:
+            t (float): the current time (s)
+
+        Returns:
+            bool: True if the initial guess was extrapolated, False if there
+                are not enough accepted solutions
+        """
+        degree = {"linear": 1, "quadratic": 2}[self.settings.predictor]
+        points = self.history[-(degree + 1) :]
+        if len(points) < 2:
+            return False
+
+        self.u.vector().set_local(extrapolate(points, t))
+        self.u.vector().apply("insert")
+        return True
+
+    def solve_once(self, problem=None):
         """Solves non linear problem
 
+        Args:
+            problem (festim.Problem, optional): the problem to solve. If
+                None, self.problem is solved. Defaults to None.
+
         Returns:
             int, bool: number of iterations for reaching convergence, True if
                 converged else False
         """
-        if self.J is None:  # Define the Jacobian
-            du = TrialFunction(self.u.function_space())
-            J = derivative(self.F, self.u, du)
-        else:
-            J = self.J
-        problem = festim.Problem(J, self.F, self.bcs)
+        if self.problem is None:
+            self.define_problem()
+        if problem is None:
+            problem = self.problem
 
         begin("Solving nonlinear variational problem.")  # Add message to fenics logs
         nb_it, converged = self.newton_solver.solve(problem, self.u.vector())
         end()
 
+        if self.settings.eliminate_traps:
+            for trap in self.traps:
+                trap.recover()
+
         return nb_it, converged
 
     def update_previous_solutions(self):
+        if self.u_nm1 is not None:
+            self.u_nm1.assign(self.u_n)
         self.u_n.assign(self.u)
+        if self._traps_out_of_space:
+            for trap in self.traps:
+                trap.second_previous_solution.assign(trap.previous_solution)
+                trap.previous_solution.assign(trap.solution)
         self.traps.update_extrinsic_traps_density()
 
     def update_post_processing_solutions(self, exports):
@@ -373,10 +992,13 @@ class HTransportProblem:
         else:
             res = list(self.u.split())
 
-        for i, trap in enumerate(self.traps, 1):
+        for i, trap in enumerate(self._traps_in_space, 1):
             trap.post_processing_solution = res[i]
+        if self._traps_out_of_space:
+            for trap in self.traps:
+                trap.post_processing_solution = trap.solution
 
-        index = len(self.traps) + 1
+        index = len(self._traps_in_space) + 1
         for bc in self._all_surf_kinetics:
             for i in range(len(bc.post_processing_solutions)):
                 bc.post_processing_solutions[i] = res[index]
@@ -386,3 +1008,24 @@ class HTransportProblem:
             self.mobile.post_processing_solution_to_concentration()
         else:
             self.mobile.post_processing_solution = res[0]
+
+
+def extrapolate(points, t):
+    """Evaluates at t the Lagrange polynomial through the given points
+
+    Args:
+        points (list): the (t_i, values_i) tuples, values_i being
+            numpy.ndarray
+        t (float): the time
+
+    Returns:
+        numpy.ndarray: the extrapolated values
+    """
+    times = [t_i for t_i, _ in points]
+    result = np.zeros_like(points[0][1])
+    for i, (t_i, values) in enumerate(points):
+        weight = np.prod(
+            [(t - t_j) / (t_i - t_j) for j, t_j in enumerate(times) if j != i]
+        )
+        result += weight * values
+    return result
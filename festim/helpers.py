@@ -1,6 +1,7 @@
 import festim
 import xml.etree.ElementTree as ET
 from fenics import Expression, UserExpression, Constant
+from ufl.algorithms import estimate_total_polynomial_degree
 import sympy as sp
 
 
@@ -23,8 +24,28 @@ def as_expression(expr):
         return expr
     # else assume it's a sympy expression
     else:
-        expr_ccode = sp.printing.ccode(expr)
-        return Expression(expr_ccode, degree=2, t=0)
+        return expression_from_sympy(expr, degree=2)
+
+
+def expression_from_sympy(value, degree=2, **kwargs):
+    """Creates a fenics.Expression from a sympy expression. The expression
+    is flagged as time dependent (_time_dependent attribute) if the sympy
+    expression depends on festim.t, and keeps the sympy expression
+    (_sympy_value attribute)
+
+    Args:
+        value (sp.Expr, float): the sympy expression
+        degree (int, optional): the degree of the expression. Defaults
+            to 2.
+        kwargs: other arguments of fenics.Expression (eg. name)
+
+    Returns:
+        fenics.Expression: the expression
+    """
+    expression = Expression(sp.printing.ccode(value), t=0, degree=degree, **kwargs)
+    expression._sympy_value = sp.sympify(value)
+    expression._time_dependent = festim.t in expression._sympy_value.free_symbols
+    return expression
 
 
 def as_constant(constant):
@@ -40,8 +61,73 @@ def as_constant_or_expression(val):
     elif isinstance(val, (int, float)):
         return Constant(val)
     else:
-        expr_ccode = sp.printing.ccode(val)
-        return Expression(expr_ccode, degree=2, t=0)
+        return expression_from_sympy(val, degree=2)
+
+
+def lumped_measure(dx):
+    """Returns the measure dx with a vertex quadrature scheme, which lumps
+    the mass matrix of P1 (and DG1) elements
+
+    Args:
+        dx (fenics.Measure): the measure
+
+    Returns:
+        fenics.Measure: the lumped measure
+    """
+    return dx(metadata={"quadrature_rule": "vertex", "quadrature_degree": 1})
+
+
+def quadrature_measure(measure, degree=None):
+    """Returns the measure with a given quadrature degree
+
+    Args:
+        measure (fenics.Measure): the measure
+        degree (int, optional): the quadrature degree. If None, the measure
+            is returned as is and the degree is estimated by UFL. Defaults
+            to None.
+
+    Returns:
+        fenics.Measure: the measure
+    """
+    if degree is None:
+        return measure
+    return measure(metadata={"quadrature_degree": degree})
+
+
+def quadrature_degrees(form, verbose=True):
+    """Returns the quadrature degree of each integral of a form: the
+    prescribed degree or else the degree estimated by UFL from the
+    integrand (eg. exp(-E/k_B/T) * c_m * (n - c_t) * v is estimated much
+    higher than needed)
+
+    Args:
+        form (ufl.Form): the form
+        verbose (bool, optional): if True, the degrees are printed.
+            Defaults to True.
+
+    Returns:
+        list: the (integral type, subdomain id, degree, prescribed) tuples
+            of the integrals
+    """
+    degrees = []
+    for integral in form.integrals():
+        degree = integral.metadata().get("quadrature_degree")
+        prescribed = degree is not None
+        if not prescribed:
+            degree = estimate_total_polynomial_degree(integral.integrand())
+        degrees.append(
+            (integral.integral_type(), integral.subdomain_id(), degree, prescribed)
+        )
+        if verbose:
+            print(
+                "{} {}: degree {} ({})".format(
+                    integral.integral_type(),
+                    integral.subdomain_id(),
+                    degree,
+                    "prescribed" if prescribed else "estimated",
+                )
+            )
+    return degrees
 
 
 def kJmol_to_eV(energy):
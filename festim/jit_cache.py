@@ -0,0 +1,119 @@
+import os
+import time
+from pathlib import Path
+from fenics import Timer
+
+
+def set_jit_cache(cache_dir):
+    """Sets the directory of the just-in-time compilation cache of the
+    forms and expressions (DIJITSO_CACHE_DIR). Only takes effect if called
+    before dijitso first reads DIJITSO_CACHE_DIR, ie. before the first form
+    or expression of the process is compiled (eg. before
+    Simulation.initialise and before any fenics.Expression is created).
+
+    Args:
+        cache_dir (str): the cache directory
+    """
+    os.environ["DIJITSO_CACHE_DIR"] = str(Path(cache_dir).resolve())
+
+
+def jit_cache_dir():
+    """Returns the directory of the just-in-time compilation cache
+
+    Returns:
+        str: the cache directory
+    """
+    default = Path.home() / ".cache" / "dijitso"
+    return os.environ.get("DIJITSO_CACHE_DIR", str(default))
+
+
+def cached_libraries(cache_dir=None):
+    """Returns the compiled libraries in the cache
+
+    Args:
+        cache_dir (str, optional): the cache directory. If None, the
+            current cache directory is used. Defaults to None.
+
+    Returns:
+        set: the paths of the libraries
+    """
+    cache_dir = Path(cache_dir or jit_cache_dir())
+    return {str(path.resolve()) for path in cache_dir.glob("**/*.so")}
+
+
+def loaded_libraries(cache_dir=None):
+    """Returns the libraries of the cache loaded in the current process
+    (Linux only)
+
+    Args:
+        cache_dir (str, optional): the cache directory. If None, the
+            current cache directory is used. Defaults to None.
+
+    Returns:
+        set: the paths of the libraries, None if the loaded libraries are
+            not available
+    """
+    cache_dir = str(Path(cache_dir or jit_cache_dir()).resolve())
+    try:
+        with open("/proc/self/maps") as maps:
+            lines = maps.readlines()
+    except OSError:
+        return None
+    paths = {line.split()[-1] for line in lines if len(line.split()) >= 6}
+    return {path for path in paths if path.startswith(cache_dir)}
+
+
+def precompile(simulation, cache_dir=None):
+    """Compiles all the forms and expressions of a simulation in the
+    just-in-time compilation cache, by initialising it and computing its
+    first time step (or the steady state) with its exports. The cache
+    directory can then be shipped to workers running the same setup, which
+    only have to call festim.set_jit_cache before initialising.
+
+    Note: the simulation is modified (and its exports written), a
+    dedicated instance should be used. The hits only count the libraries
+    loaded from the cache by this call: libraries already loaded in the
+    process (eg. by a previous call) are neither hits nor misses, so the
+    cache should be checked from a new process.
+
+    Args:
+        simulation (festim.Simulation): the simulation
+        cache_dir (str, optional): the cache directory, only taken into
+            account if nothing was compiled before in the process (see
+            set_jit_cache). If None, the current cache directory is used.
+            Defaults to None.
+
+    Returns:
+        dict: the "cache_dir", the number of libraries compiled ("misses")
+            and loaded from the cache ("hits", None if not available),
+            the number of "libraries" in the cache and the "elapsed_time"
+            (s)
+    """
+    if cache_dir is not None:
+        set_jit_cache(cache_dir)
+    cached_before = cached_libraries()
+    loaded_before = loaded_libraries()
+    start = time.perf_counter()
+
+    simulation.initialise()
+    if simulation.settings.transient:
+        simulation.timer = Timer()
+        simulation.iterate()
+    else:
+        simulation.run()
+
+    elapsed_time = time.perf_counter() - start
+    cached_after = cached_libraries()
+    loaded_after = loaded_libraries()
+    misses = len(cached_after - cached_before)
+    hits = None
+    if loaded_before is not None:
+        hits = len((loaded_after - loaded_before) & cached_before)
+
+    return {
+        "cache_dir": jit_cache_dir(),
+        "misses": misses,
+        "hits": hits,
+        "libraries": len(cached_after),
+        "elapsed_time": elapsed_time,
+    }
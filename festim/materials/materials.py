@@ -1,6 +1,7 @@
 from operator import itemgetter
 import warnings
 import numpy as np
+import sympy as sp
 from festim import k_B, Material, HeatTransferProblem
 import festim
 import fenics as f
@@ -28,6 +29,8 @@ class Materials(list):
         self.heat_capacity = None
         self.density = None
         self.Q = None
+        self._index_by_id = None
+        self._index_by_name = None
 
     @property
     def materials(self):
@@ -47,23 +50,73 @@ class Materials(list):
             if not all(isinstance(t, festim.Material) for t in value):
                 raise TypeError("materials must be a list of festim.Material")
             super().__init__(value)
+            self._invalidate_index()
         else:
             raise TypeError("materials must be a list")
 
     def __setitem__(self, index, item):
         super().__setitem__(index, self._validate_material(item))
+        self._invalidate_index()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._invalidate_index()
 
     def insert(self, index, item):
         super().insert(index, self._validate_material(item))
+        self._invalidate_index()
 
     def append(self, item):
         super().append(self._validate_material(item))
+        self._invalidate_index()
 
     def extend(self, other):
         if isinstance(other, type(self)):
             super().extend(other)
         else:
             super().extend(self._validate_material(item) for item in other)
+        self._invalidate_index()
+
+    def pop(self, index=-1):
+        material = super().pop(index)
+        self._invalidate_index()
+        return material
+
+    def remove(self, item):
+        super().remove(item)
+        self._invalidate_index()
+
+    def clear(self):
+        super().clear()
+        self._invalidate_index()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._invalidate_index()
+
+    def reverse(self):
+        super().reverse()
+        self._invalidate_index()
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def _invalidate_index(self):
+        self._index_by_id = None
+        self._index_by_name = None
+
+    def _build_index(self):
+        """Builds the id -> material and name -> material lookup tables"""
+        self._index_by_id = {}
+        self._index_by_name = {}
+        for material in self:
+            mat_ids = material.id
+            if type(mat_ids) is not list:
+                mat_ids = [mat_ids]
+            for mat_id in mat_ids:
+                self._index_by_id.setdefault(mat_id, material)
+            self._index_by_name.setdefault(material.name, material)
 
     def _validate_material(self, value):
         if isinstance(value, festim.Material):
@@ -219,13 +272,17 @@ class Materials(list):
         Returns:
             festim.Material: the material that has the id mat_id
         """
-        for material in self:
-            mat_ids = material.id
-            if type(mat_ids) is not list:
-                mat_ids = [mat_ids]
-            if mat_id in mat_ids:
-                return material
-        raise ValueError("Couldn't find ID " + str(mat_id) + " in materials list")
+        if self._index_by_id is None:
+            self._build_index()
+        material = self._index_by_id.get(mat_id)
+        # the ids of the materials may have been modified since the index
+        # was built
+        if material is None or not _has_id(material, mat_id):
+            self._build_index()
+            material = self._index_by_id.get(mat_id)
+        if material is None:
+            raise ValueError("Couldn't find ID " + str(mat_id) + " in materials list")
+        return material
 
     def find_material_from_name(self, name):
         """Returns the material with the correct name
@@ -239,9 +296,14 @@ class Materials(list):
         Returns:
             festim.Material: the material object
         """
-        for material in self:
-            if material.name == name:
-                return material
+        if self._index_by_name is None:
+            self._build_index()
+        material = self._index_by_name.get(name)
+        if material is None or material.name != name:
+            self._build_index()
+            material = self._index_by_name.get(name)
+        if material is not None:
+            return material
 
         msg = "No material with name {} was found".format(name)
         raise ValueError(msg)
@@ -294,22 +356,81 @@ class Materials(list):
         return 0
 
     def create_properties(self, vm, T):
-        """Creates the properties fields needed for post processing
+        """Creates the properties fields needed for post processing.
+        The properties are compiled expressions evaluated cell by cell from
+        the volume markers (see arrhenius_property and thermal_property).
 
         Arguments:
             vm {fenics.MeshFunction()} -- volume markers
             T {fenics.Function()} -- temperature
         """
-        self.D = ArheniusCoeff(self, vm, T, "D_0", "E_D", degree=2)
+        self.D = arrhenius_property(self, vm, T, "D_0", "E_D")
         # all materials have the same properties so only checking the first is enough
         if self[0].S_0 is not None:
-            self.S = ArheniusCoeff(self, vm, T, "S_0", "E_S", degree=2)
-        if self[0].thermal_cond is not None:
-            self.thermal_cond = ThermalProp(self, vm, T, "thermal_cond", degree=2)
-            self.heat_capacity = ThermalProp(self, vm, T, "heat_capacity", degree=2)
-            self.density = ThermalProp(self, vm, T, "rho", degree=2)
-        if self[0].Q is not None:
-            self.Q = ThermalProp(self, vm, T, "Q", degree=2)
+            self.S = arrhenius_property(self, vm, T, "S_0", "E_S")
+        # heat_capacity and rho are not needed (and may be None) for a
+        # steady state heat transfer problem
+        for attribute, key in [
+            ("thermal_cond", "thermal_cond"),
+            ("heat_capacity", "heat_capacity"),
+            ("density", "rho"),
+            ("Q", "Q"),
+        ]:
+            if getattr(self[0], key) is not None:
+                setattr(self, attribute, thermal_property(self, vm, T, key))
+
+    def cell_material_indices(self, vm):
+        """Returns the index in the list of the material of each cell
+
+        Args:
+            vm (fenics.MeshFunction): the volume markers
+
+        Returns:
+            numpy.ndarray: the indices of the materials ordered by cell
+                index, -1 for cells with an unknown subdomain id
+        """
+        positions = {}
+        for i, material in enumerate(self):
+            mat_ids = material.id
+            if type(mat_ids) is not list:
+                mat_ids = [mat_ids]
+            for mat_id in mat_ids:
+                positions.setdefault(mat_id, i)
+        return np.array([positions.get(mat_id, -1) for mat_id in vm.array()])
+
+    def check_subdomain_ids(self, vm):
+        """Checks that the subdomain id of each cell belongs to a material
+
+        Args:
+            vm (fenics.MeshFunction): the volume markers
+
+        Raises:
+            ValueError: if a subdomain id isn't found
+        """
+        mat_ids = self.values_by_id("id").keys()
+        for subdomain_id in np.unique(vm.array()):
+            if subdomain_id not in mat_ids:
+                raise ValueError(
+                    "Couldn't find ID " + str(subdomain_id) + " in materials list"
+                )
+
+    def values_by_id(self, key):
+        """Returns the value of a property for each subdomain id
+
+        Args:
+            key (str): the name of the property (eg. "D_0")
+
+        Returns:
+            dict: the values of the property with the subdomain ids as keys
+        """
+        values = {}
+        for material in self:
+            mat_ids = material.id
+            if type(mat_ids) is not list:
+                mat_ids = [mat_ids]
+            for mat_id in mat_ids:
+                values[mat_id] = getattr(material, key)
+        return values
 
     def solubility_as_function(self, mesh, T):
         """
@@ -367,6 +488,23 @@ class Materials(list):
         self.sievert_marker = sievert
 
 
+def _has_id(material, mat_id):
+    if type(material.id) is list:
+        return mat_id in material.id
+    return material.id == mat_id
+
+
+def _material_of_cell(expression, ufc_cell):
+    """Returns the material of a cell from the precomputed material
+    indices of an expression (_materials, _material_indices and _vm
+    attributes)"""
+    index = expression._material_indices[ufc_cell.index]
+    if index < 0:  # unknown subdomain id, raises an error
+        subdomain_id = expression._vm.array()[ufc_cell.index]
+        return expression._materials.find_material_from_id(subdomain_id)
+    return expression._materials[index]
+
+
 class ArheniusCoeff(f.UserExpression):
     def __init__(self, materials, vm, T, pre_exp, E, **kwargs):
         super().__init__(kwargs)
@@ -375,14 +513,17 @@ class ArheniusCoeff(f.UserExpression):
         self._materials = materials
         self._pre_exp = pre_exp
         self._E = E
+        self._material_indices = materials.cell_material_indices(vm)
 
     def eval_cell(self, value, x, ufc_cell):
-        cell = f.Cell(self._vm.mesh(), ufc_cell.index)
-        subdomain_id = self._vm[cell]
-        material = self._materials.find_material_from_id(subdomain_id)
+        material = _material_of_cell(self, ufc_cell)
         D_0 = getattr(material, self._pre_exp)
         E_D = getattr(material, self._E)
-        value[0] = D_0 * f.exp(-E_D / k_B / self._T(x))
+        if isinstance(self._T, f.Constant):
+            T = float(self._T)
+        else:
+            T = self._T(x)
+        value[0] = D_0 * f.exp(-E_D / k_B / T)
 
     def value_shape(self):
         return ()
@@ -395,16 +536,223 @@ class ThermalProp(f.UserExpression):
         self._vm = vm
         self._materials = materials
         self._key = key
+        self._material_indices = materials.cell_material_indices(vm)
 
     def eval_cell(self, value, x, ufc_cell):
-        cell = f.Cell(self._vm.mesh(), ufc_cell.index)
-        subdomain_id = self._vm[cell]
-        material = self._materials.find_material_from_id(subdomain_id)
+        material = _material_of_cell(self, ufc_cell)
         attribute = getattr(material, self._key)
         if callable(attribute):
-            value[0] = attribute(self._T(x))
+            if isinstance(self._T, f.Constant):
+                T = float(self._T)
+            else:
+                T = self._T(x)
+            value[0] = attribute(T)
         else:
             value[0] = attribute
 
     def value_shape(self):
         return ()
+
+
+PROPERTIES_CODE = """
+#include <pybind11/pybind11.h>
+#include <pybind11/eigen.h>
+#include <pybind11/stl.h>
+namespace py = pybind11;
+
+#include <cmath>
+#include <map>
+#include <dolfin/function/Expression.h>
+#include <dolfin/function/GenericFunction.h>
+#include <dolfin/mesh/MeshFunction.h>
+
+// pre_exp * exp(-E / (k_B T)) with the parameters of the subdomain
+class ArrheniusProperty : public dolfin::Expression
+{
+public:
+  ArrheniusProperty() : dolfin::Expression() {}
+
+  void eval(Eigen::Ref<Eigen::VectorXd> values,
+            Eigen::Ref<const Eigen::VectorXd> x,
+            const ufc::cell& cell) const override
+  {
+    const std::size_t subdomain = (*markers)[cell.index];
+    T->eval(values, x, cell);
+    values[0] = pre_exp.at(subdomain) * std::exp(-E.at(subdomain) / k_B / values[0]);
+  }
+
+  std::shared_ptr<dolfin::MeshFunction<std::size_t>> markers;
+  std::shared_ptr<dolfin::GenericFunction> T;
+  std::map<std::size_t, double> pre_exp;
+  std::map<std::size_t, double> E;
+  double k_B;
+};
+
+// constant value of the subdomain
+class PiecewiseProperty : public dolfin::Expression
+{
+public:
+  PiecewiseProperty() : dolfin::Expression() {}
+
+  void eval(Eigen::Ref<Eigen::VectorXd> values,
+            Eigen::Ref<const Eigen::VectorXd> x,
+            const ufc::cell& cell) const override
+  {
+    values[0] = value.at((*markers)[cell.index]);
+  }
+
+  std::shared_ptr<dolfin::MeshFunction<std::size_t>> markers;
+  std::map<std::size_t, double> value;
+};
+
+PYBIND11_MODULE(SIGNATURE, m)
+{
+  py::class_<ArrheniusProperty, std::shared_ptr<ArrheniusProperty>, dolfin::Expression>
+    (m, "ArrheniusProperty")
+    .def(py::init<>())
+    .def_readwrite("markers", &ArrheniusProperty::markers)
+    .def_readwrite("T", &ArrheniusProperty::T)
+    .def_readwrite("pre_exp", &ArrheniusProperty::pre_exp)
+    .def_readwrite("E", &ArrheniusProperty::E)
+    .def_readwrite("k_B", &ArrheniusProperty::k_B);
+  py::class_<PiecewiseProperty, std::shared_ptr<PiecewiseProperty>, dolfin::Expression>
+    (m, "PiecewiseProperty")
+    .def(py::init<>())
+    .def_readwrite("markers", &PiecewiseProperty::markers)
+    .def_readwrite("value", &PiecewiseProperty::value);
+}
+"""
+
+# temperature dependent property, the cases are generated from the materials
+THERMAL_PROPERTY_CODE = """
+#include <pybind11/pybind11.h>
+#include <pybind11/eigen.h>
+namespace py = pybind11;
+
+#include <cmath>
+#include <stdexcept>
+#include <dolfin/function/Expression.h>
+#include <dolfin/function/GenericFunction.h>
+#include <dolfin/mesh/MeshFunction.h>
+
+class ThermalProperty : public dolfin::Expression
+{
+public:
+  ThermalProperty() : dolfin::Expression() {}
+
+  void eval(Eigen::Ref<Eigen::VectorXd> values,
+            Eigen::Ref<const Eigen::VectorXd> x,
+            const ufc::cell& cell) const override
+  {
+    T->eval(values, x, cell);
+    const double temperature = values[0];
+    switch ((*markers)[cell.index])
+    {
+CASES
+    default:
+      throw std::runtime_error("Couldn't find subdomain ID in materials list");
+    }
+  }
+
+  std::shared_ptr<dolfin::MeshFunction<std::size_t>> markers;
+  std::shared_ptr<dolfin::GenericFunction> T;
+};
+
+PYBIND11_MODULE(SIGNATURE, m)
+{
+  py::class_<ThermalProperty, std::shared_ptr<ThermalProperty>, dolfin::Expression>
+    (m, "ThermalProperty")
+    .def(py::init<>())
+    .def_readwrite("markers", &ThermalProperty::markers)
+    .def_readwrite("T", &ThermalProperty::T);
+}
+"""
+
+_properties_module = None
+
+
+def properties_module():
+    """Returns the compiled module of the properties expressions (compiled
+    at the first call)"""
+    global _properties_module
+    if _properties_module is None:
+        _properties_module = f.compile_cpp_code(PROPERTIES_CODE)
+    return _properties_module
+
+
+def _as_cpp_function(T):
+    if isinstance(T, (int, float)):
+        T = f.Constant(T)
+    return T._cpp_object
+
+
+def arrhenius_property(materials, vm, T, pre_exp, E):
+    """Creates the compiled expression pre_exp * exp(-E/k_B/T) of a
+    property of the materials, with the parameters of the material of each
+    cell
+
+    Args:
+        materials (festim.Materials): the materials
+        vm (fenics.MeshFunction): the volume markers
+        T (fenics.Function, fenics.Constant or fenics.Expression): the
+            temperature
+        pre_exp (str): the name of the pre-exponential factor (eg. "D_0")
+        E (str): the name of the activation energy (eg. "E_D")
+
+    Returns:
+        fenics.CompiledExpression: the property
+    """
+    # the C++ maps would throw a bare std::out_of_range
+    materials.check_subdomain_ids(vm)
+    cpp_object = properties_module().ArrheniusProperty()
+    cpp_object.markers = vm
+    cpp_object.T = _as_cpp_function(T)
+    cpp_object.pre_exp = materials.values_by_id(pre_exp)
+    cpp_object.E = materials.values_by_id(E)
+    cpp_object.k_B = k_B
+    expression = f.CompiledExpression(cpp_object, degree=2)
+    expression._T = T  # keeps the temperature alive
+    return expression
+
+
+def thermal_property(materials, vm, T, key):
+    """Creates the compiled expression of a property of the materials
+    (constant or function of T) with the value of the material of each
+    cell. Functions of T are converted to C++ with sympy, if this fails
+    the property is a festim.ThermalProp (evaluated in Python).
+
+    Args:
+        materials (festim.Materials): the materials
+        vm (fenics.MeshFunction): the volume markers
+        T (fenics.Function, fenics.Constant or fenics.Expression): the
+            temperature
+        key (str): the name of the property (eg. "thermal_cond")
+
+    Returns:
+        fenics.CompiledExpression or festim.ThermalProp: the property
+    """
+    materials.check_subdomain_ids(vm)
+    values = materials.values_by_id(key)
+    if not any(callable(value) for value in values.values()):
+        cpp_object = properties_module().PiecewiseProperty()
+        cpp_object.markers = vm
+        cpp_object.value = values
+        return f.CompiledExpression(cpp_object, degree=2)
+
+    temperature = sp.Symbol("temperature")
+    cases = ""
+    for mat_id, value in values.items():
+        try:
+            if callable(value):
+                value = value(temperature)
+            code = sp.printing.ccode(sp.sympify(value))
+        except Exception:
+            return ThermalProp(materials, vm, T, key, degree=2)
+        cases += "    case {}: values[0] = {}; break;\n".format(mat_id, code)
+    module = f.compile_cpp_code(THERMAL_PROPERTY_CODE.replace("CASES", cases))
+    cpp_object = module.ThermalProperty()
+    cpp_object.markers = vm
+    cpp_object.T = _as_cpp_function(T)
+    expression = f.CompiledExpression(cpp_object, degree=2)
+    expression._T = T  # keeps the temperature alive
+    return expression
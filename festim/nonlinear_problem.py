@@ -1,4 +1,6 @@
+import weakref
 import fenics as f
+import numpy as np
 
 
 class Problem(f.NonlinearProblem):
@@ -11,21 +13,656 @@ class Problem(f.NonlinearProblem):
         J (ufl.Form): the Jacobian form of the variational problem
         F (ufl.Form): the form of the variational problem
         bcs (list): list of fenics.DirichletBC
+        reuse_sparsity (bool, optional): if True, the matrix (and its
+            sparsity pattern) is shared with the other living
+            festim.Problem built with this option for the same Jacobian
+            form on the same mesh and function space (eg. successive
+            simulations). Defaults to False.
+
+    Attributes:
+        A (fenics.PETScMatrix): the matrix owned by the problem. Its
+            sparsity pattern is built at the first assembly, the Jacobian
+            is then reassembled in place.
+        own_matrix (bool): if True, the Jacobian is assembled in self.A
+            instead of the matrix given by the solver. Set by
+            festim.NewtonSolver.
+        update_jacobian (bool): if False, self.A is assembled only once
+            and then reused (modified Newton) until refresh_jacobian() is
+            called. Defaults to True.
+        jacobian_refreshed (bool): True if self.A was assembled again by
+            refresh_jacobian() since the last setup of the linear solver
+        nb_residual_evaluations (int): number of assemblies of the residual
+        nb_jacobian_evaluations (int): number of assemblies of the Jacobian
+        before_assembly (callable): if not None, function (without
+            arguments) called before each assembly of the residual or the
+            Jacobian, eg. to update coefficients depending on the current
+            Newton iterate. Defaults to None.
     """
 
-    def __init__(self, J, F, bcs):
+    # matrices shared between problems, see reuse_sparsity. A matrix is
+    # released once no problem uses it anymore
+    _shared_matrices = weakref.WeakValueDictionary()
+
+    def __init__(self, J, F, bcs, reuse_sparsity=False):
         self.jacobian_form = J
         self.residual_form = F
         self.bcs = bcs
         self.assembler = f.SystemAssembler(
             self.jacobian_form, self.residual_form, self.bcs
         )
+        if reuse_sparsity:
+            key = self.sparsity_key()
+            self.A = Problem._shared_matrices.get(key)
+            if self.A is None:
+                self.A = f.PETScMatrix()
+                Problem._shared_matrices[key] = self.A
+        else:
+            self.A = f.PETScMatrix()
+        self.own_matrix = False
+        self.update_jacobian = True
+        self.jacobian_refreshed = False
+        self._jacobian_outdated = False
+        self.nb_residual_evaluations = 0
+        self.nb_jacobian_evaluations = 0
+        self.before_assembly = None
         f.NonlinearProblem.__init__(self)
 
+    def sparsity_key(self):
+        """Returns a key identifying the sparsity pattern of the Jacobian
+        (mesh and finite elements of the test and trial functions and
+        signature of the form, which accounts for its integral types and
+        measures)
+
+        Returns:
+            tuple: the key
+        """
+        key = []
+        for argument in self.jacobian_form.arguments():
+            V = argument.ufl_function_space()
+            key += [V.ufl_domain().ufl_id(), repr(V.ufl_element())]
+        key.append(self.jacobian_form.signature())
+        return tuple(key)
+
     def F(self, b, x):
         """Assembles the RHS in Ax=b and applies the boundary conditions"""
+        self.nb_residual_evaluations += 1
+        if self.before_assembly is not None:
+            self.before_assembly()
         self.assembler.assemble(b, x)
 
     def J(self, A, x):
-        """Assembles the LHS in Ax=b and applies the boundary conditions"""
+        """Assembles the LHS in Ax=b and applies the boundary conditions.
+        If self.own_matrix is True, the Jacobian is assembled in place in
+        self.A and A is left untouched.
+        """
+        if self.own_matrix:
+            A = self.A
+            if not self.update_jacobian and not A.empty():
+                if not self._jacobian_outdated:
+                    return
+                self.jacobian_refreshed = True
+        self._jacobian_outdated = False
+        self.nb_jacobian_evaluations += 1
+        if self.before_assembly is not None:
+            self.before_assembly()
+        # when A is not empty its sparsity pattern is kept and A is only
+        # zeroed before assembly
         self.assembler.assemble(A)
+
+    def refresh_jacobian(self):
+        """With update_jacobian=False, assembles the Jacobian again at the
+        next Newton iteration (eg. when the stepsize changed or after a
+        failed solve)"""
+        self._jacobian_outdated = True
+
+
+class NewtonSolver(f.NewtonSolver):
+    """
+    fenics.NewtonSolver using the matrix owned by festim.Problem, so that
+    the Jacobian is reassembled in place in persistent PETSc tensors.
+    Behaves like fenics.NewtonSolver for other problems.
+
+    Args:
+        comm (MPI.Intracomm, optional): the MPI communicator. Defaults to
+            fenics.MPI.comm_world.
+        linear_solver (fenics.PETScKrylovSolver, optional): the linear
+            solver. If None, it is created from the "linear_solver" and
+            "preconditioner" parameters. Defaults to None.
+        linear_solver_setup (callable, optional): function called once,
+            when the operator of the linear solver is set for the first
+            time. Defaults to None.
+    """
+
+    def __init__(self, comm=None, linear_solver=None, linear_solver_setup=None):
+        self.linear_solver_setup = linear_solver_setup
+        self._linear_solver = linear_solver
+        if comm is None:
+            comm = f.MPI.comm_world
+        if linear_solver is None:
+            f.NewtonSolver.__init__(self, comm)
+        else:
+            f.NewtonSolver.__init__(
+                self, comm, linear_solver, f.PETScFactory.instance()
+            )
+
+    def solve(self, problem, x):
+        """Solves the nonlinear problem
+
+        Args:
+            problem (fenics.NonlinearProblem): the nonlinear problem
+            x (fenics.GenericVector): the solution vector
+
+        Returns:
+            int, bool: number of iterations, True if converged else False
+        """
+        if not isinstance(problem, Problem):
+            return super().solve(problem, x)
+        problem.own_matrix = True
+        try:
+            return super().solve(problem, x)
+        finally:
+            problem.own_matrix = False
+
+    def solver_setup(self, A, P, problem, iteration):
+        """Sets the operators of the linear solver"""
+        if getattr(problem, "own_matrix", False):
+            A = problem.A
+        if P.empty():
+            self.linear_solver().set_operator(A)
+        else:
+            self.linear_solver().set_operators(A, P)
+        if self.linear_solver_setup is not None:
+            self.linear_solver_setup()
+            self.linear_solver_setup = None
+        if getattr(problem, "jacobian_refreshed", False):
+            problem.jacobian_refreshed = False
+            if isinstance(self._linear_solver, f.PETScKrylovSolver):
+                # a reused factorization is computed again for the new
+                # Jacobian and then kept
+                self._linear_solver.set_reuse_preconditioner(False)
+                self._linear_solver.ksp().setUp()
+                self._linear_solver.set_reuse_preconditioner(True)
+
+
+def _set_petsc_options(prefix, options):
+    """Sets the options of a solver in the global PETSc options database.
+    The options already defined (eg. by the user) are kept.
+
+    Args:
+        prefix (str): the options prefix of the solver
+        options (dict): the options (without prefix) and their values
+
+    Returns:
+        list: the names of the options set, to be removed with
+            _clear_petsc_options once the solver has read them
+    """
+    from petsc4py import PETSc
+
+    database = PETSc.Options()
+    names = []
+    for key, value in options.items():
+        if not database.hasName(prefix + key):
+            f.PETScOptions.set(prefix + key, value)
+            names.append(prefix + key)
+    return names
+
+
+def _clear_petsc_options(names):
+    """Removes options from the global PETSc options database so that they
+    don't apply to the solvers created afterwards with the same prefix (eg.
+    in a following simulation)
+
+    Args:
+        names (list): the names of the options
+    """
+    for name in names:
+        f.PETScOptions.clear(name)
+
+
+direct_methods = ["mumps", "superlu_dist", "superlu", "umfpack", "petsc"]
+
+
+def direct_solver(method="mumps", reuse_factorization=False, prefix="festim_"):
+    """Creates a PETSc direct solver (preonly + LU factorization).
+    As long as the operator is the same matrix with the same sparsity
+    pattern (see festim.Problem), PETSc keeps the symbolic factorization
+    and only redoes the numeric factorization.
+
+    Args:
+        method (str, optional): the factorization package ("mumps",
+            "superlu_dist", "superlu", "umfpack" or "petsc"). Defaults to
+            "mumps".
+        reuse_factorization (bool, optional): if True, the numeric
+            factorization is also kept and reused for all the following
+            solves. Defaults to False.
+        prefix (str, optional): the PETSc options prefix of the solver.
+            Defaults to "festim_".
+
+    Raises:
+        ValueError: if method is not a direct method
+
+    Returns:
+        fenics.PETScKrylovSolver: the linear solver
+    """
+    if method not in direct_methods:
+        raise ValueError(
+            "{} is not a direct method, accepted values are {}".format(
+                method, direct_methods
+            )
+        )
+    solver = f.PETScKrylovSolver()
+    solver.set_options_prefix(prefix)
+    options = _set_petsc_options(
+        prefix,
+        {
+            "ksp_type": "preonly",
+            "pc_type": "lu",
+            "pc_factor_mat_solver_type": method,
+            "pc_factor_reuse_ordering": True,
+        },
+    )
+    solver.set_from_options()
+    _clear_petsc_options(options)
+    solver.set_reuse_preconditioner(reuse_factorization)
+    return solver
+
+
+def snes_solver(
+    absolute_tolerance,
+    relative_tolerance,
+    maximum_iterations,
+    linear_solver=None,
+    preconditioner="default",
+    snes_type="newtonls",
+    line_search="bt",
+    inexact_newton=False,
+    prefix="festim_",
+):
+    """Creates a fenics.PETScSNESSolver
+
+    Args:
+        absolute_tolerance (float): the absolute tolerance
+        relative_tolerance (float): the relative tolerance
+        maximum_iterations (int): maximum iterations allowed for the
+            solver to converge
+        linear_solver (str, optional): linear solver method. If None, the
+            default PETSc linear solver is used. Defaults to None.
+        preconditioner (str, optional): preconditioning method. Defaults
+            to "default".
+        snes_type (str, optional): the SNES method, "newtonls" (Newton
+            with line search) or "newtontr" (trust region). Defaults to
+            "newtonls".
+        line_search (str, optional): the line search of the "newtonls"
+            method ("basic", "bt", "l2" or "cp"). Defaults to "bt".
+        inexact_newton (bool, optional): if True, the tolerance of the
+            Krylov linear solver is adapted at each iteration
+            (Eisenstat-Walker). Only useful with iterative linear solvers.
+            Defaults to False.
+        prefix (str, optional): the PETSc options prefix of the solver.
+            Defaults to "festim_".
+
+    Returns:
+        fenics.PETScSNESSolver: the nonlinear solver
+    """
+    solver = f.PETScSNESSolver(f.MPI.comm_world)
+    solver.parameters["method"] = snes_type
+    solver.parameters["line_search"] = line_search
+    solver.parameters["error_on_nonconvergence"] = False
+    solver.parameters["report"] = False
+    solver.parameters["absolute_tolerance"] = absolute_tolerance
+    solver.parameters["relative_tolerance"] = relative_tolerance
+    solver.parameters["maximum_iterations"] = maximum_iterations
+    if linear_solver is not None:
+        solver.parameters["linear_solver"] = linear_solver
+    if preconditioner is not None:
+        solver.parameters["preconditioner"] = preconditioner
+
+    solver.set_options_prefix(prefix)
+    options = {"snes_ksp_ew": True} if inexact_newton else {}
+    options = _set_petsc_options(prefix, options)
+    solver.set_from_options()
+    _clear_petsc_options(options)
+    return solver
+
+
+def fieldsplit_solver(V, nb_traps, nb_adsorbed=0, ksp_type="gmres", prefix="festim_"):
+    """Creates a PETSc Krylov solver with a block (fieldsplit) preconditioner
+    for the H transport mixed space (mobile, traps, adsorbed species):
+
+    - the diffusive mobile block is preconditioned with algebraic multigrid
+    - the traps blocks, with no spatial derivatives, with block Jacobi/ILU
+    - the adsorbed species (R space rows) are eliminated with a Schur
+      complement
+
+    Args:
+        V (fenics.FunctionSpace): the H transport function space
+        nb_traps (int): the number of traps
+        nb_adsorbed (int, optional): the number of adsorbed species
+            (surfaces with SurfaceKinetics). Defaults to 0.
+        ksp_type (str, optional): the Krylov method. Defaults to "gmres".
+        prefix (str, optional): the PETSc options prefix of the solver.
+            Defaults to "festim_".
+
+    Returns:
+        fenics.PETScKrylovSolver, callable: the linear solver and a function
+            to be called once its operator is set (None if not needed). The
+            options of the blocks are removed from the PETSc options
+            database by this function.
+    """
+    from petsc4py import PETSc
+
+    solver = f.PETScKrylovSolver()
+    solver.set_options_prefix(prefix)
+    options = {"ksp_type": ksp_type}
+
+    if V.num_sub_spaces() == 0:
+        # only the mobile concentration
+        options["pc_type"] = "gamg"
+        names = _set_petsc_options(prefix, options)
+        solver.set_from_options()
+        _clear_petsc_options(names)
+        return solver, None
+
+    def owned_dofs(components):
+        dofs = [V.sub(i).dofmap().dofs() for i in components]
+        return np.sort(np.concatenate(dofs)).astype(PETSc.IntType)
+
+    mobile = owned_dofs([0])
+    traps = owned_dofs(range(1, nb_traps + 1)) if nb_traps > 0 else None
+    adsorbed = owned_dofs(range(nb_traps + 1, nb_traps + nb_adsorbed + 1))
+    comm = V.mesh().mpi_comm()
+
+    bulk_options = {
+        "fieldsplit_mobile_ksp_type": "preonly",
+        "fieldsplit_mobile_pc_type": "gamg",
+        "fieldsplit_traps_ksp_type": "preonly",
+        "fieldsplit_traps_pc_type": "bjacobi",
+        "fieldsplit_traps_sub_pc_type": "ilu",
+    }
+    options["pc_type"] = "fieldsplit"
+    if nb_adsorbed == 0:
+        options["pc_fieldsplit_type"] = "multiplicative"
+        options.update(bulk_options)
+    else:
+        options["pc_fieldsplit_type"] = "schur"
+        options["pc_fieldsplit_schur_fact_type"] = "full"
+        options["pc_fieldsplit_schur_precondition"] = "selfp"
+        options["fieldsplit_bulk_ksp_type"] = "preonly"
+        options["fieldsplit_adsorbed_ksp_type"] = "preonly"
+        options["fieldsplit_adsorbed_pc_type"] = "lu"
+        if nb_traps == 0:
+            options["fieldsplit_bulk_pc_type"] = "gamg"
+        for key, value in bulk_options.items():
+            options["fieldsplit_bulk_" + key] = value
+    names = _set_petsc_options(prefix, options)
+    solver.set_from_options()
+
+    pc = solver.ksp().getPC()
+    if nb_adsorbed == 0:
+        pc.setFieldSplitIS(
+            ("mobile", PETSc.IS().createGeneral(mobile, comm=comm)),
+            ("traps", PETSc.IS().createGeneral(traps, comm=comm)),
+        )
+    else:
+        bulk = mobile if traps is None else np.sort(np.concatenate([mobile, traps]))
+        pc.setFieldSplitIS(
+            ("bulk", PETSc.IS().createGeneral(bulk, comm=comm)),
+            ("adsorbed", PETSc.IS().createGeneral(adsorbed, comm=comm)),
+        )
+
+    def setup():
+        """The options of the blocks are read when the fieldsplit
+        preconditioner is set up, they are then removed from the options
+        database. With traps and adsorbed species, the mobile/traps split
+        of the bulk block is defined in the numbering of the bulk submatrix,
+        only available once the outer preconditioner is set up"""
+        solver.ksp().setUp()
+        if nb_adsorbed > 0 and traps is not None:
+            bulk_ksp = pc.getFieldSplitSubKSP()[0]
+            bulk_pc = bulk_ksp.getPC()
+            offset = comm.exscan(len(bulk)) or 0
+
+            def sub_is(dofs):
+                indices = np.searchsorted(bulk, dofs) + offset
+                return PETSc.IS().createGeneral(
+                    indices.astype(PETSc.IntType), comm=comm
+                )
+
+            bulk_pc.setType("fieldsplit")
+            bulk_pc.setFieldSplitType(PETSc.PC.CompositeType.MULTIPLICATIVE)
+            bulk_pc.setFieldSplitIS(
+                ("mobile", sub_is(mobile)), ("traps", sub_is(traps))
+            )
+            bulk_pc.setFromOptions()
+            bulk_ksp.setUp()
+        _clear_petsc_options(names)
+
+    return solver, setup
+
+
+class JacobianFreeNewtonSolver(NewtonSolver):
+    """Jacobian-free Newton-Krylov solver for festim.Problem. The Jacobian
+    matrix is never assembled: its action on a vector is assembled from the
+    UFL action form of the Jacobian form, and the Krylov method is
+    preconditioned with a cheap preconditioner (eg.
+    festim.BlockDiagonalPreconditioner). The tolerances, maximum number of
+    iterations and relaxation parameter are read from self.parameters.
+    Behaves like festim.NewtonSolver for other problems.
+
+    Args:
+        comm (MPI.Intracomm, optional): the MPI communicator. Defaults to
+            fenics.MPI.comm_world.
+        preconditioner (object, optional): the preconditioner, with the
+            methods setup(), called at each Newton iteration, and apply(pc,
+            x, y) computing y = P^-1 x (petsc4py.PETSc.Vec). If None, the
+            Krylov method is not preconditioned. Defaults to None.
+        ksp_type (str, optional): the Krylov method. Defaults to "gmres".
+        prefix (str, optional): the PETSc options prefix of the Krylov
+            solver. Defaults to "festim_".
+
+    Attributes:
+        nb_krylov_iterations (int): the total number of Krylov iterations
+    """
+
+    def __init__(
+        self, comm=None, preconditioner=None, ksp_type="gmres", prefix="festim_"
+    ):
+        NewtonSolver.__init__(self, comm)
+        self.preconditioner = preconditioner
+        self.ksp_type = ksp_type
+        self.prefix = prefix
+        self.nb_krylov_iterations = 0
+        self._actions = {}
+
+    def solve(self, problem, x):
+        """Solves the nonlinear problem
+
+        Args:
+            problem (fenics.NonlinearProblem): the nonlinear problem
+            x (fenics.GenericVector): the solution vector
+
+        Returns:
+            int, bool: number of iterations, True if converged else False
+        """
+        if not isinstance(problem, Problem):
+            return super().solve(problem, x)
+        if problem not in self._actions:
+            self._actions[problem] = _JacobianAction(
+                problem, self.preconditioner, self.ksp_type, self.prefix
+            )
+        ksp = self._actions[problem].ksp
+
+        absolute_tolerance = self.parameters["absolute_tolerance"]
+        relative_tolerance = self.parameters["relative_tolerance"]
+        maximum_iterations = self.parameters["maximum_iterations"]
+        relaxation = self.parameters["relaxation_parameter"] or 1.0
+
+        b = f.PETScVector()
+        dx = x.copy()
+        for iteration in range(maximum_iterations + 1):
+            problem.F(b, x)
+            residual = b.norm("l2")
+            if iteration == 0:
+                residual_0 = residual
+            if residual <= absolute_tolerance or residual <= (
+                relative_tolerance * residual_0
+            ):
+                return iteration, True
+            if iteration == maximum_iterations:
+                break
+            if self.preconditioner is not None:
+                self.preconditioner.setup()
+            ksp.solve(f.as_backend_type(b).vec(), f.as_backend_type(dx).vec())
+            self.nb_krylov_iterations += ksp.getIterationNumber()
+            x.axpy(-relaxation, dx)
+            x.apply("insert")
+        return maximum_iterations, False
+
+
+class _JacobianAction:
+    """petsc4py shell matrix (and preconditioner) context applying the
+    Jacobian of a festim.Problem by assembling the action form of its
+    Jacobian form. Rows of Dirichlet dofs are the identity.
+
+    Args:
+        problem (festim.Problem): the problem
+        preconditioner (object): the preconditioner (see
+            festim.JacobianFreeNewtonSolver)
+        ksp_type (str): the Krylov method
+        prefix (str): the PETSc options prefix of the Krylov solver
+    """
+
+    def __init__(self, problem, preconditioner, ksp_type, prefix):
+        from petsc4py import PETSc
+
+        V = problem.jacobian_form.arguments()[1].function_space()
+        self.w = f.Function(V)
+        self.form = f.Form(f.action(problem.jacobian_form, self.w))
+        self.y = f.PETScVector()
+        self.preconditioner = preconditioner
+
+        local_size = self.w.vector().local_size()
+        dofs = [dof for bc in problem.bcs for dof in bc.get_boundary_values()]
+        dofs = np.array(dofs, dtype=np.int64)
+        self.bc_dofs = dofs[dofs < local_size]
+
+        comm = V.mesh().mpi_comm()
+        sizes = (local_size, self.w.vector().size())
+        self.matrix = PETSc.Mat().createPython((sizes, sizes), self, comm=comm)
+        self.matrix.setUp()
+
+        self.ksp = PETSc.KSP().create(comm)
+        self.ksp.setOptionsPrefix(prefix)
+        self.ksp.setOperators(self.matrix)
+        self.ksp.setType(ksp_type)
+        self.ksp.setTolerances(rtol=1e-6)
+        pc = self.ksp.getPC()
+        if preconditioner is None:
+            pc.setType("none")
+        else:
+            pc.setType("python")
+            pc.setPythonContext(self)
+        self.ksp.setFromOptions()
+
+    def mult(self, mat, x, y):
+        """y = J x"""
+        x.copy(f.as_backend_type(self.w.vector()).vec())
+        self.w.vector().apply("insert")
+        f.assemble(self.form, tensor=self.y)
+        values = self.y.get_local()
+        values[self.bc_dofs] = x.getArray(readonly=True)[self.bc_dofs]
+        y.setArray(values)
+
+    def apply(self, pc, x, y):
+        """y = P^-1 x"""
+        self.preconditioner.apply(pc, x, y)
+        values = y.getArray()
+        values[self.bc_dofs] = x.getArray(readonly=True)[self.bc_dofs]
+
+
+class BlockDiagonalPreconditioner:
+    """Block diagonal preconditioner of a problem on a mixed function space
+    (see festim.JacobianFreeNewtonSolver). Only the blocks are assembled,
+    on the collapsed sub spaces self.spaces:
+
+    - the blocks given by a bilinear form are approximately inverted with
+      one algebraic multigrid cycle
+    - the blocks given by a linear form are diagonal (lumped), the nodal
+      values being the assembled vector
+    - the other blocks are the identity
+
+    Args:
+        V (fenics.FunctionSpace): the (mixed) function space
+        prefix (str, optional): the PETSc options prefix of the blocks
+            solvers (followed by "block_<i>_"). Defaults to "festim_".
+
+    Attributes:
+        spaces (list): the collapsed sub spaces of V
+        forms (dict): the forms of the blocks {component: form}, to be
+            defined with the arguments on self.spaces
+    """
+
+    def __init__(self, V, prefix="festim_"):
+        self.prefix = prefix
+        self.spaces = []
+        self._indices = []
+        self.forms = {}
+        self._tensors = {}
+        self._solvers = {}
+        if V.num_sub_spaces() == 0:
+            self.spaces.append(V)
+            local_size = f.Function(V).vector().local_size()
+            indices = np.arange(local_size)
+            self._indices.append((indices, indices))
+            return
+        for i in range(V.num_sub_spaces()):
+            V_i, collapsed_dofs = V.sub(i).collapse(collapsed_dofs=True)
+            local_size = f.Function(V_i).vector().local_size()
+            collapsed = np.array(list(collapsed_dofs.keys()), dtype=np.int64)
+            mixed = np.array(list(collapsed_dofs.values()), dtype=np.int64)
+            owned = collapsed < local_size
+            self.spaces.append(V_i)
+            self._indices.append((collapsed[owned], mixed[owned]))
+
+    def setup(self):
+        """Assembles the blocks"""
+        from petsc4py import PETSc
+
+        for i, form in self.forms.items():
+            if i not in self._tensors:
+                form = f.Form(form)
+                self.forms[i] = form
+                self._tensors[i] = (
+                    f.PETScMatrix() if form.rank() == 2 else f.PETScVector()
+                )
+            tensor = f.assemble(form, tensor=self._tensors[i])
+            if form.rank() == 1:
+                continue
+            if i not in self._solvers:
+                ksp = PETSc.KSP().create(self.spaces[i].mesh().mpi_comm())
+                ksp.setOptionsPrefix("{}block_{}_".format(self.prefix, i))
+                ksp.setType("preonly")
+                ksp.getPC().setType("gamg")
+                self._solvers[i] = (ksp, *tensor.mat().createVecs())
+            ksp = self._solvers[i][0]
+            ksp.setOperators(tensor.mat())
+            ksp.setFromOptions()
+
+    def apply(self, pc, x, y):
+        """y = P^-1 x"""
+        values = x.getArray(readonly=True).copy()
+        for i, form in self.forms.items():
+            collapsed, mixed = self._indices[i]
+            tensor = self._tensors[i]
+            if form.rank() == 1:
+                diagonal = tensor.get_local()[collapsed]
+                diagonal[diagonal == 0] = 1
+                values[mixed] = values[mixed] / diagonal
+                continue
+            ksp, b, z = self._solvers[i]
+            b_values = np.zeros(b.getLocalSize())
+            b_values[collapsed] = values[mixed]
+            b.setArray(b_values)
+            ksp.solve(b, z)
+            values[mixed] = z.getArray(readonly=True)[collapsed]
+        y.setArray(values)
@@ -1,3 +1,6 @@
+QUADRATURE_TERMS = ["diffusion", "trapping", "fluxes", "sources"]
+
+
 class Settings:
     """
     Args:
@@ -27,7 +30,79 @@ class Settings:
             Defaults to None, for the newton solver this is: "umfpack".
         preconditioner (str, optional): preconditioning method for the newton solver,
             options can be viewed by print(list_krylov_solver_preconditioners()).
-            Defaults to "default".
+            If "fieldsplit", the H transport problem uses a PETSc block
+            preconditioner (multigrid for mobile, ILU for traps, Schur
+            complement for adsorbed species). Defaults to "default".
+        reuse_sparsity (bool, optional): If True, the matrix of the H
+            transport problem (and its sparsity pattern) is shared with the
+            living simulations with the same mesh, function space and
+            Jacobian form.
+            Defaults to False.
+        reuse_factorization (bool, optional): If True, the H transport
+            problem is solved with a PETSc direct solver (linear_solver
+            must be "mumps", "superlu_dist", "superlu", "umfpack", "petsc"
+            or None for "mumps") that keeps the symbolic factorization and
+            only redoes the numeric factorization. If update_jacobian is
+            also False, the numeric factorization is computed once and
+            reused for all time steps (modified Newton). Defaults to False.
+        nonlinear_solver (str, optional): the nonlinear solver of the H
+            transport problem, "newton" (fenics.NewtonSolver) or "snes"
+            (fenics.PETScSNESSolver). Defaults to "newton".
+        snes_type (str, optional): the SNES method, "newtonls" (Newton with
+            line search) or "newtontr" (trust region). Only used if
+            nonlinear_solver is "snes". Defaults to "newtonls".
+        line_search (str, optional): the line search of the "newtonls" SNES
+            method ("basic", "bt", "l2" or "cp"). Defaults to "bt".
+        inexact_newton (bool, optional): If True, the tolerance of the
+            Krylov linear solver is adapted at each SNES iteration
+            (Eisenstat-Walker). Defaults to False.
+        eliminate_traps (bool, optional): If True, the traps are eliminated
+            from the H transport system (static condensation): the trapped
+            concentrations are expressed node by node as a function of the
+            mobile concentration and recovered after each solve. Traps with
+            sources are not supported. Defaults to False.
+        lumped_mass (bool, optional): If True, the time derivative and
+            trapping terms of the H transport problem are integrated with a
+            vertex quadrature (lumped mass). The traps blocks become diagonal.
+            Defaults to False.
+        predictor (str, optional): the initial guess of the Newton solver
+            of the H transport problem. If None, the previous solution is
+            used. If "linear" or "quadratic", the guess is extrapolated from
+            the last two or three accepted solutions. Defaults to None.
+        splitting (str, optional): If "lie" or "strang", the trapping
+            kinetics are split from the mobile transport: FEniCS only solves
+            the mobile concentration and the trapping is integrated node by
+            node (backward Euler, vectorised). Requires CG traps. Defaults
+            to None.
+        pseudo_transient (bool, optional): If True, steady state problems
+            are solved by pseudo-transient continuation (switched evolution
+            relaxation). Defaults to False.
+        pseudo_transient_initial_step (float, optional): the initial pseudo
+            time step (s) of the pseudo-transient continuation. Defaults to
+            1.
+        jacobian_free (bool, optional): If True, the H transport problem is
+            solved with a Jacobian-free Newton-Krylov method: the Jacobian
+            is applied with its action form and only a block diagonal
+            preconditioner (diffusion block of the mobile concentration,
+            lumped diagonal of the traps) is assembled. Defaults to False.
+        arrhenius_cache (bool, optional): If True, the Arrhenius factors
+            exp(-E/(k_B T)) with a constant activation energy are
+            interpolated on the temperature space, shared by all the forms
+            and only re-evaluated when the temperature changes. Defaults to
+            False.
+        quadrature_degree (int or dict, optional): the quadrature degree of
+            the integrals of the H transport and heat transfer problems. If
+            a dict, the degree is given per term type, with the keys
+            "diffusion" (transient and diffusion terms), "trapping",
+            "fluxes" and "sources". Terms without a degree (or if None) are
+            integrated with the degree estimated by UFL. Lumped terms are
+            not affected. Defaults to None.
+        coupled_heat_transfer (bool, optional): If True, the temperature of
+            a transient festim.HeatTransferProblem is an extra component of
+            the H transport problem and both are solved in one Newton
+            solve (monolithic coupling) instead of solving the heat
+            transfer first at each time step (staggered). Defaults to
+            False.
 
     Attributes:
         transient (bool): transient or steady state sim
@@ -44,6 +119,29 @@ class Settings:
         update_jacobian (bool):
         linear_solver (str): linear solver method for the newton solver
         precondtitioner (str): preconditioning method for the newton solver
+        reuse_sparsity (bool): reuse the matrix of the H transport problem
+            between simulations
+        reuse_factorization (bool): reuse the factorization of the direct
+            solver
+        nonlinear_solver (str): the nonlinear solver ("newton" or "snes")
+        snes_type (str): the SNES method
+        line_search (str): the line search of the SNES solver
+        inexact_newton (bool): Eisenstat-Walker inexact Newton
+        eliminate_traps (bool): static condensation of the traps
+        lumped_mass (bool): lumped time derivative and trapping terms
+        predictor (str): the initial guess extrapolation
+        splitting (str): the operator splitting of the trapping kinetics
+        pseudo_transient (bool): pseudo-transient continuation for steady
+            state problems
+        pseudo_transient_initial_step (float): the initial pseudo time step
+        jacobian_free (bool): Jacobian-free Newton-Krylov solver
+        arrhenius_cache (bool): cached Arrhenius factors
+        quadrature_degree (int or dict): the quadrature degree (per term
+            type)
+        quadrature_degrees (dict): the quadrature degree of each term type
+            (None if estimated by UFL)
+        coupled_heat_transfer (bool): monolithic heat transfer and H
+            transport solve
     """
 
     def __init__(
@@ -59,6 +157,22 @@ class Settings:
         update_jacobian=True,
         linear_solver=None,
         preconditioner="default",
+        reuse_sparsity=False,
+        reuse_factorization=False,
+        nonlinear_solver="newton",
+        snes_type="newtonls",
+        line_search="bt",
+        inexact_newton=False,
+        eliminate_traps=False,
+        lumped_mass=False,
+        predictor=None,
+        splitting=None,
+        pseudo_transient=False,
+        pseudo_transient_initial_step=1,
+        jacobian_free=False,
+        arrhenius_cache=False,
+        quadrature_degree=None,
+        coupled_heat_transfer=False,
     ):
         # TODO maybe transient and final_time are redundant
         self.transient = transient
@@ -74,3 +188,80 @@ class Settings:
         self.update_jacobian = update_jacobian
         self.linear_solver = linear_solver
         self.preconditioner = preconditioner
+        self.reuse_sparsity = reuse_sparsity
+        self.reuse_factorization = reuse_factorization
+        self.nonlinear_solver = nonlinear_solver
+        self.snes_type = snes_type
+        self.line_search = line_search
+        self.inexact_newton = inexact_newton
+        self.eliminate_traps = eliminate_traps
+        self.lumped_mass = lumped_mass
+        self.predictor = predictor
+        self.splitting = splitting
+        self.pseudo_transient = pseudo_transient
+        self.pseudo_transient_initial_step = pseudo_transient_initial_step
+        self.jacobian_free = jacobian_free
+        self.arrhenius_cache = arrhenius_cache
+        self.quadrature_degree = quadrature_degree
+        self.coupled_heat_transfer = coupled_heat_transfer
+
+    @property
+    def nonlinear_solver(self):
+        return self._nonlinear_solver
+
+    @nonlinear_solver.setter
+    def nonlinear_solver(self, value):
+        if value not in ["newton", "snes"]:
+            raise ValueError(
+                "Acceptable values for nonlinear_solver are 'newton' and 'snes'"
+            )
+        self._nonlinear_solver = value
+
+    @property
+    def predictor(self):
+        return self._predictor
+
+    @predictor.setter
+    def predictor(self, value):
+        if value not in [None, "linear", "quadratic"]:
+            raise ValueError(
+                "Acceptable values for predictor are None, 'linear' and 'quadratic'"
+            )
+        self._predictor = value
+
+    @property
+    def splitting(self):
+        return self._splitting
+
+    @splitting.setter
+    def splitting(self, value):
+        if value not in [None, "lie", "strang"]:
+            raise ValueError(
+                "Acceptable values for splitting are None, 'lie' and 'strang'"
+            )
+        self._splitting = value
+
+    @property
+    def quadrature_degree(self):
+        return self._quadrature_degree
+
+    @quadrature_degree.setter
+    def quadrature_degree(self, value):
+        if isinstance(value, dict):
+            for key in value:
+                if key not in QUADRATURE_TERMS:
+                    raise ValueError(
+                        "Acceptable keys for quadrature_degree are "
+                        "'diffusion', 'trapping', 'fluxes' and 'sources'"
+                    )
+        elif value is not None and not isinstance(value, int):
+            raise TypeError("quadrature_degree must be None, an int or a dict")
+        self._quadrature_degree = value
+
+    @property
+    def quadrature_degrees(self):
+        if isinstance(self.quadrature_degree, dict):
+            return {
+                term: self.quadrature_degree.get(term) for term in QUADRATURE_TERMS
+            }
+        return {term: self.quadrature_degree for term in QUADRATURE_TERMS}
@@ -1,3 +1,4 @@
+from festim import expression_from_sympy
 from fenics import Constant, Expression, Function, UserExpression
 import sympy as sp
 
@@ -28,6 +29,6 @@ class Source:
         if isinstance(value, (float, int)):
             self.value = Constant(value)
         elif isinstance(value, sp.Expr):
-            self.value = Expression(sp.printing.ccode(value), t=0, degree=2)
+            self.value = expression_from_sympy(value, degree=2)
         elif isinstance(value, (Expression, UserExpression, Function)):
             self.value = value
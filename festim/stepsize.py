@@ -21,10 +21,28 @@ class Stepsize:
             raised. Defaults to None.
         milestones (list, optional): list of times by which the simulation must
             pass. Defaults to None.
+        error_tolerance (float, optional): If not None, the stepsize is
+            controlled by the estimated local truncation error of the
+            H transport problem (PI controller) instead of the number of
+            Newton iterations. Relative tolerance of the error. Cannot be
+            used with stepsize_change_ratio. Defaults to None.
+        error_absolute_tolerance (float, optional): absolute tolerance of
+            the local truncation error. If None, the relative tolerance times
+            the maximum of the solution is used. Defaults to None.
+        time_scheme (str, optional): the time integration scheme,
+            "backward_euler" (first order) or "BDF2" (second order, variable
+            step). Defaults to "backward_euler".
 
     Attributes:
         adaptive_stepsize (dict): contains the parameters for adaptive stepsize
+        error_control (dict): contains the parameters for the error
+            controlled stepsize
+        previous_error (float): the normalised error of the last accepted
+            step with error control
         value (fenics.Constant): value of dt
+        previous_value (fenics.Constant): value of the previous stepsize
+            (0 before the first step)
+        time_scheme (str): the time integration scheme
         milestones (list): list of times by which the simulation must
             pass.
 
@@ -36,6 +54,12 @@ class Stepsize:
             max_stepsize=lambda t: None if t < 1 else 2,
             dt_min=1e-05
         )
+
+        my_stepsize = Stepsize(
+            initial_value=0.5,
+            error_tolerance=1e-3,
+            dt_min=1e-05
+        )
     """
 
     def __init__(
@@ -47,8 +71,24 @@ class Stepsize:
         max_stepsize=None,
         dt_min=None,
         milestones=None,
+        error_tolerance=None,
+        error_absolute_tolerance=None,
+        time_scheme="backward_euler",
     ) -> None:
         self.adaptive_stepsize = None
+        self.error_control = None
+        self.previous_error = None
+        if error_tolerance is not None:
+            if stepsize_change_ratio is not None:
+                raise ValueError(
+                    "error_tolerance and stepsize_change_ratio cannot be used together"
+                )
+            self.error_control = {
+                "tolerance": error_tolerance,
+                "absolute_tolerance": error_absolute_tolerance,
+                "max_stepsize": max_stepsize,
+                "dt_min": dt_min,
+            }
         if stepsize_change_ratio is not None:
             if t_stop or stepsize_stop_max:
                 warnings.warn(
@@ -63,9 +103,23 @@ class Stepsize:
             }
         self.initial_value = initial_value
         self.value = None
+        self.previous_value = None
         self.milestones = milestones
+        self.time_scheme = time_scheme
         self.initialise_value()
 
+    @property
+    def time_scheme(self):
+        return self._time_scheme
+
+    @time_scheme.setter
+    def time_scheme(self, value):
+        if value not in ["backward_euler", "BDF2"]:
+            raise ValueError(
+                "Acceptable values for time_scheme are 'backward_euler' and 'BDF2'"
+            )
+        self._time_scheme = value
+
     @property
     def milestones(self):
         return self._milestones
@@ -81,6 +135,46 @@ class Stepsize:
         """Creates a fenics.Constant object initialised with self.initial_value
         and stores it in self.value"""
         self.value = f.Constant(self.initial_value, name="dt")
+        self.previous_value = f.Constant(0.0, name="dt_n")
+
+    @property
+    def order(self):
+        """The order of the time integration scheme"""
+        return {"backward_euler": 1, "BDF2": 2}[self.time_scheme]
+
+    def bdf_coefficients(self):
+        """Returns the coefficients of the backward differentiation formula
+        du/dt = (a_0 u - a_1 u_n + a_2 u_nm1) / dt.
+        For BDF2 the variable step coefficients depend on
+        omega = dt / dt_n, backward Euler is used for the first step.
+
+        Returns:
+            tuple: a_0, a_1, a_2
+        """
+        if self.time_scheme == "backward_euler":
+            return 1, 1, 0
+        omega = f.conditional(
+            f.gt(self.previous_value, 0), self.value / self.previous_value, 0
+        )
+        return (1 + 2 * omega) / (1 + omega), 1 + omega, omega**2 / (1 + omega)
+
+    def backward_difference(self, u, u_n, u_nm1=None):
+        """Returns the backward difference of u so that
+        du/dt = backward_difference(u, u_n, u_nm1) / dt.value
+
+        Args:
+            u (ufl.Expr): the current value
+            u_n (ufl.Expr): the previous value
+            u_nm1 (ufl.Expr, optional): the value before u_n, only needed
+                with BDF2. Defaults to None.
+
+        Returns:
+            ufl.Expr: the backward difference
+        """
+        if self.time_scheme == "backward_euler":
+            return u - u_n
+        a_0, a_1, a_2 = self.bdf_coefficients()
+        return a_0 * u - a_1 * u_n + a_2 * u_nm1
 
     def adapt(self, t, nb_it, converged):
         """Changes the stepsize based on convergence.
@@ -110,7 +204,65 @@ class Stepsize:
                 if float(self.value) > max_stepsize:
                     self.value.assign(max_stepsize)
 
-        # adapt for next milestone
+        self.adapt_to_milestone(t)
+
+    def adapt_to_error(self, t, error):
+        """Changes the stepsize with a PI controller based on the normalised
+        local truncation error of the step (error <= 1 means the error is
+        within tolerance). The step is rejected if error > 1.
+
+        Args:
+            t (float): time reached by the step.
+            error (float): the normalised error of the step, None if it
+                couldn't be estimated, numpy.inf if the solver didn't
+                converge.
+
+        Raises:
+            ValueError: if the stepsize goes below dt_min
+
+        Returns:
+            bool: True if the step is accepted, else False
+        """
+        dt_min = self.error_control["dt_min"]
+        max_stepsize = self.error_control["max_stepsize"]
+
+        accepted = error is None or error <= 1
+        if error is None:
+            factor = 1
+        elif not accepted:
+            factor = max(0.9 * error ** (-1 / (self.order + 1)), 0.2)
+        else:
+            # PI controller, exponents 0.7/k and 0.4/k with k = order + 1
+            k = self.order + 1
+            error = max(error, 1e-10)
+            factor = 0.9 * error ** (-0.7 / k)
+            if self.previous_error is not None:
+                factor *= self.previous_error ** (0.4 / k)
+            factor = min(max(factor, 0.2), 5)
+            self.previous_error = error
+
+        if not accepted:
+            # the step is redone from the previous time
+            t -= float(self.value)
+        self.value.assign(float(self.value) * factor)
+        if dt_min is not None and float(self.value) < dt_min:
+            raise ValueError("stepsize reached minimal value")
+
+        if callable(max_stepsize):
+            max_stepsize = max_stepsize(t)
+        if max_stepsize is not None:
+            if float(self.value) > max_stepsize:
+                self.value.assign(max_stepsize)
+
+        self.adapt_to_milestone(t)
+        return accepted
+
+    def adapt_to_milestone(self, t):
+        """Reduces the stepsize so that the next milestone is not missed
+
+        Args:
+            t (float): current time.
+        """
         next_milestone = self.next_milestone(t)
         if next_milestone is not None:
             if t + float(self.value) > next_milestone and not np.isclose(
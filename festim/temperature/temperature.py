@@ -1,5 +1,8 @@
+from festim import k_B
+import festim
 import sympy as sp
 import fenics as f
+import numpy as np
 
 
 class Temperature:
@@ -11,11 +14,19 @@ class Temperature:
             Defaults to None.
 
     Attributes:
-        T (fenics.Function): the function attributed with temperature
-        T_n (fenics.Function): the previous function
+        T (fenics.Function or fenics.Constant): the function attributed with
+            temperature. A fenics.Constant if the value is spatially uniform
+            (no x, y, z dependence).
+        T_n (fenics.Function or fenics.Constant): the previous function
         value (sp.Add, int, float): the expression of temperature
         expression (fenics.Expression): the expression of temperature as a
             fenics object
+        arrhenius_cache (bool): if True, the Arrhenius factors are cached
+            (see Temperature.arrhenius)
+        arrhenius_functions (dict): the cached Arrhenius factors
+            {activation energy: fenics.Function or fenics.Constant}
+        post_processing_solution (fenics.Function): the temperature as a
+            fenics.Function (for exports)
 
     Usage:
         >>> import festim as F
@@ -28,14 +39,37 @@ class Temperature:
         self.T_n = None
         self.value = value
         self.expression = None
+        self.arrhenius_cache = False
+        self.arrhenius_functions = {}
+        self._arrhenius_T = None
+        self._function = None
+
+    @property
+    def post_processing_solution(self):
+        if isinstance(self.T, f.Constant):
+            self._function.vector()[:] = float(self.T)
+            return self._function
+        return self.T
+
+    def is_uniform(self):
+        """Returns True if the value of the temperature doesn't depend on
+        x, y or z"""
+        return "x[" not in sp.printing.ccode(self.value)
 
     def create_functions(self, mesh):
-        """Creates functions self.T, self.T_n
+        """Creates functions self.T, self.T_n. If the value is spatially
+        uniform, they are fenics.Constant updated by a scalar assignment.
 
         Args:
             mesh (festim.Mesh): the mesh
         """
         V = f.FunctionSpace(mesh.mesh, "CG", 1)
+        if self.is_uniform():
+            self._value = sp.lambdify(festim.t, self.value)
+            self._function = f.Function(V, name="T")
+            self.T = f.Constant(float(self._value(0)), name="T")
+            self.T_n = f.Constant(float(self.T), name="T_n")
+            return
         self.T = f.Function(V, name="T")
         self.T_n = f.Function(V, name="T_n")
         self.expression = f.Expression(sp.printing.ccode(self.value), t=0, degree=2)
@@ -49,8 +83,65 @@ class Temperature:
             t (float): the time
         """
         self.T_n.assign(self.T)
-        self.expression.t = t
-        self.T.assign(f.interpolate(self.expression, self.T.function_space()))
+        if isinstance(self.T, f.Constant):
+            self.T.assign(float(self._value(t)))
+        else:
+            self.expression.t = t
+            self.T.assign(f.interpolate(self.expression, self.T.function_space()))
+        self.update_arrhenius()
+
+    def arrhenius(self, activation_energy):
+        """Returns the Arrhenius factor exp(-E/(k_B T)). If
+        self.arrhenius_cache is True and E is a number, the factor is a
+        fenics.Function interpolated on the space of T (a fenics.Constant if
+        T is uniform), shared by all the terms with the same activation
+        energy and only re-evaluated when T changes (see
+        Temperature.update_arrhenius).
+
+        Args:
+            activation_energy (float, ufl.Expr): the activation energy (eV)
+
+        Returns:
+            ufl.Expr: the Arrhenius factor
+        """
+        cachable = (
+            self.arrhenius_cache
+            and isinstance(activation_energy, (int, float))
+            and isinstance(self.T, (f.Function, f.Constant))
+        )
+        if not cachable:
+            return f.exp(-activation_energy / k_B / self.T)
+        if activation_energy not in self.arrhenius_functions:
+            if isinstance(self.T, f.Constant):
+                factor = f.Constant(0.0)
+            else:
+                factor = f.Function(self.T.function_space())
+            self.arrhenius_functions[activation_energy] = factor
+            self._arrhenius_T = None
+            self.update_arrhenius()
+        return self.arrhenius_functions[activation_energy]
+
+    def update_arrhenius(self):
+        """Evaluates the cached Arrhenius factors at the nodes of T if T
+        has changed since their last evaluation"""
+        if not self.arrhenius_functions:
+            return
+        if isinstance(self.T, f.Constant):
+            values = self.T.values()
+        else:
+            values = self.T.vector().get_local()
+        unchanged = self._arrhenius_T is not None and np.array_equal(
+            values, self._arrhenius_T
+        )
+        if f.MPI.min(f.MPI.comm_world, float(unchanged)) == 1:
+            return
+        for activation_energy, factor in self.arrhenius_functions.items():
+            if isinstance(factor, f.Constant):
+                factor.assign(float(np.exp(-activation_energy / k_B / values[0])))
+                continue
+            factor.vector().set_local(np.exp(-activation_energy / k_B / values))
+            factor.vector().apply("insert")
+        self._arrhenius_T = values
 
     def is_steady_state(self):
         return "t" not in sp.printing.ccode(self.value)
@@ -1,6 +1,9 @@
 import festim
 import fenics as f
 import sympy as sp
+import numpy as np
+from ufl import replace
+from ufl.algorithms import expand_derivatives
 import warnings
 
 
@@ -25,14 +28,54 @@ class HeatTransferProblem(festim.Temperature):
         preconditioner (str, optional): preconditioning method for the newton solver,
             options can be veiwed by print(list_krylov_solver_preconditioners()).
             Defaults to "default".
+        nonlinear_solver (str, optional): the nonlinear solver, "newton"
+            (fenics.NewtonSolver) or "snes" (fenics.PETScSNESSolver).
+            Defaults to "newton".
+        snes_type (str, optional): the SNES method, "newtonls" or "newtontr".
+            Defaults to "newtonls".
+        line_search (str, optional): the line search of the "newtonls" SNES
+            method ("basic", "bt", "l2" or "cp"). Defaults to "bt".
+        inexact_newton (bool, optional): If True, Eisenstat-Walker inexact
+            Newton is used by the SNES solver. Defaults to False.
+        steady_state_tolerance (float, optional): if not None, the
+            transient solves are skipped once the relative rate of change of
+            T, ||T - T_n|| / (dt ||T||), is below this tolerance (in s-1),
+            until a boundary condition or a source changes again. Defaults
+            to None.
 
     Attributes:
+        quadrature_degrees (dict): the quadrature degree of the "diffusion"
+            (transient and conduction), "fluxes" and "sources" terms
+            (estimated by UFL if None). Set by the simulation settings.
+        linear (bool): True if the transient problem is linear in T (eg.
+            constant thermal properties). It is then solved with a LU solver
+            instead of the Newton solver.
+        problem (festim.Problem): the nonlinear problem, built once and
+            reused for every time step
+        linear_matrix (fenics.PETScMatrix): the matrix of the linear problem,
+            only assembled and factorized again when it changes (eg. when
+            the stepsize changes)
+        nb_matrix_assemblies (int): the number of assemblies (and
+            factorizations) of the matrix of the linear problem
+        thermal_steady_state (bool): True if the relative rate of change of
+            T over the last solved time step was below
+            steady_state_tolerance
+        nb_skipped_solves (int): the number of time steps where the solve
+            was skipped at thermal steady state
+        coupled (bool): if True, T is solved with the H transport problem
+            (see festim.Settings.coupled_heat_transfer) and update only
+            updates the time dependent expressions.
         F (fenics.Form): the variational form of the heat transfer problem
         v_T (fenics.TestFunction): the test function
-        newton_solver (fenics.NewtonSolver): Newton solver for solving the nonlinear problem
+        T_nm1 (fenics.Function): the temperature before the previous time
+            step (used by BDF2)
+        newton_solver (fenics.NewtonSolver or fenics.PETScSNESSolver): Newton
+            solver for solving the nonlinear problem
         initial_condition (festim.InitialCondition): the initial condition
         sub_expressions (list): contains time dependent fenics.Expression to
             be updated
+        expressions_registry (festim.ExpressionsRegistry): the unique time
+            dependent expressions of sub_expressions, updated at each step
         sources (list): contains festim.Source objects for volumetric heat
             sources
         boundary_conditions (list): contains festim.BoundaryConditions
@@ -47,6 +90,11 @@ class HeatTransferProblem(festim.Temperature):
         maximum_iterations=30,
         linear_solver=None,
         preconditioner="default",
+        nonlinear_solver="newton",
+        snes_type="newtonls",
+        line_search="bt",
+        inexact_newton=False,
+        steady_state_tolerance=None,
     ) -> None:
         super().__init__()
         self.transient = transient
@@ -56,13 +104,34 @@ class HeatTransferProblem(festim.Temperature):
         self.maximum_iterations = maximum_iterations
         self.linear_solver = linear_solver
         self.preconditioner = preconditioner
+        self.nonlinear_solver = nonlinear_solver
+        self.snes_type = snes_type
+        self.line_search = line_search
+        self.inexact_newton = inexact_newton
+        self.steady_state_tolerance = steady_state_tolerance
 
         self.F = 0
         self.v_T = None
         self.sources = []
         self.boundary_conditions = []
         self.sub_expressions = []
+        self.expressions_registry = None
         self.newton_solver = None
+        self.quadrature_degrees = None
+        self.coupled = False
+        self.linear = False
+        self.problem = None
+        self.linear_matrix = None
+        self.nb_matrix_assemblies = 0
+        self.thermal_steady_state = False
+        self.nb_skipped_solves = 0
+        self._expressions_values = None
+        self._linear_assembler = None
+        self._linear_vector = None
+        self._lu_solver = None
+        self._matrix_constants = None
+        self._dt = None
+        self._matrix_key = None
 
     @property
     def newton_solver(self):
@@ -72,12 +141,14 @@ class HeatTransferProblem(festim.Temperature):
     def newton_solver(self, value):
         if value is None:
             self._newton_solver = value
-        elif isinstance(value, f.NewtonSolver):
+        elif isinstance(value, (f.NewtonSolver, f.PETScSNESSolver)):
             if self._newton_solver:
                 print("Settings for the Newton solver will be overwritten")
             self._newton_solver = value
         else:
-            raise TypeError("accepted type for newton_solver is fenics.NewtonSolver")
+            raise TypeError(
+                "accepted type for newton_solver is fenics.NewtonSolver or fenics.PETScSNESSolver"
+            )
 
     @property
     def initial_condition(self):
@@ -106,6 +177,7 @@ class HeatTransferProblem(festim.Temperature):
         V = f.FunctionSpace(mesh.mesh, "CG", 1)
         self.T = f.Function(V, name="T")
         self.T_n = f.Function(V, name="T_n")
+        self.T_nm1 = f.Function(V, name="T_nm1")
         self.v_T = f.TestFunction(V)
         if self.transient and self.initial_condition is None:
             raise AttributeError(
@@ -131,6 +203,11 @@ class HeatTransferProblem(festim.Temperature):
         if not self.newton_solver:
             self.define_newton_solver()
 
+        if self.transient and not self.coupled:
+            self.linear = self.is_linear()
+            if self.linear:
+                self.define_linear_problem()
+
         if not self.transient:
             print("Solving stationary heat equation")
             dT = f.TrialFunction(self.T.function_space())
@@ -156,8 +233,13 @@ class HeatTransferProblem(festim.Temperature):
         """
 
         print("Defining variational problem heat transfers")
+        self._dt = dt
         T, T_n = self.T, self.T_n
         v_T = self.v_T
+        degrees = self.quadrature_degrees or {}
+        dx = festim.quadrature_measure(mesh.dx, degrees.get("diffusion"))
+        dx_source = festim.quadrature_measure(mesh.dx, degrees.get("sources"))
+        ds = festim.quadrature_measure(mesh.ds, degrees.get("fluxes"))
 
         self.F = 0
         for mat in materials:
@@ -177,19 +259,24 @@ class HeatTransferProblem(festim.Temperature):
                     rho = rho(T)
                 # Transien term
                 for vol in subdomains:
-                    self.F += rho * cp * (T - T_n) / dt.value * v_T * mesh.dx(vol)
+                    self.F += (
+                        rho
+                        * cp
+                        * dt.backward_difference(T, T_n, self.T_nm1)
+                        / dt.value
+                        * v_T
+                        * dx(vol)
+                    )
             # Diffusion term
             for vol in subdomains:
                 if mesh.type == "cartesian":
-                    self.F += f.dot(thermal_cond * f.grad(T), f.grad(v_T)) * mesh.dx(
-                        vol
-                    )
+                    self.F += f.dot(thermal_cond * f.grad(T), f.grad(v_T)) * dx(vol)
                 elif mesh.type == "cylindrical":
                     r = f.SpatialCoordinate(mesh.mesh)[0]
                     self.F += (
                         r
                         * f.dot(thermal_cond * f.grad(T), f.grad(v_T / r))
-                        * mesh.dx(vol)
+                        * dx(vol)
                     )
                 elif mesh.type == "spherical":
                     r = f.SpatialCoordinate(mesh.mesh)[0]
@@ -198,7 +285,7 @@ class HeatTransferProblem(festim.Temperature):
                         * r
                         * r
                         * f.dot(f.grad(T), f.grad(v_T / r / r))
-                        * mesh.dx(vol)
+                        * dx(vol)
                     )
         # source term
         for source in self.sources:
@@ -208,7 +295,7 @@ class HeatTransferProblem(festim.Temperature):
             else:
                 volumes = [source.volume]
             for volume in volumes:
-                self.F += -source.value * v_T * mesh.dx(volume)
+                self.F += -source.value * v_T * dx_source(volume)
 
         # Boundary conditions
         for bc in self.boundary_conditions:
@@ -219,10 +306,71 @@ class HeatTransferProblem(festim.Temperature):
                 self.sub_expressions += bc.sub_expressions
 
                 for surf in bc.surfaces:
-                    self.F += -bc.form * self.v_T * mesh.ds(surf)
+                    self.F += -bc.form * self.v_T * ds(surf)
+
+    def is_linear(self):
+        """Checks if the form is linear in T, ie. its Jacobian does not
+        depend on T (eg. constant thermal properties)
+
+        Returns:
+            bool: True if the form is linear in T
+        """
+        V = self.T.function_space()
+        JT = f.derivative(self.F, self.T, f.TrialFunction(V))
+        return expand_derivatives(f.derivative(JT, self.T, f.Function(V))).empty()
+
+    def define_linear_problem(self):
+        """Splits the linear form in a bilinear and a linear form and
+        creates their assembler"""
+        dT = f.TrialFunction(self.T.function_space())
+        a, L = f.system(replace(self.F, {self.T: dT}))
+        self._linear_assembler = f.SystemAssembler(a, L, self.dirichlet_bcs)
+        self.linear_matrix = f.PETScMatrix()
+        self._linear_vector = f.PETScVector()
+        self._lu_solver = None
+        self._matrix_key = None
+        # the matrix only changes with its constants (eg. the stepsize),
+        # unless it contains expressions
+        if all(isinstance(c, f.Constant) for c in a.coefficients()):
+            self._matrix_constants = a.coefficients()
+        else:
+            self._matrix_constants = None
+
+    def solve_linear(self):
+        """Solves the linear problem. The matrix is only assembled and
+        factorized again when it changes, otherwise a step costs one
+        assembly of the right hand side and one back substitution."""
+        key = None
+        if self._matrix_constants is not None:
+            key = tuple(tuple(c.values()) for c in self._matrix_constants)
+        if key is None or key != self._matrix_key:
+            self._linear_assembler.assemble(self.linear_matrix)
+            self._matrix_key = key
+            self.nb_matrix_assemblies += 1
+            if self._lu_solver is None:
+                method = "default"
+                if self.linear_solver in f.lu_solver_methods():
+                    method = self.linear_solver
+                # the factorization is redone by PETSc when the matrix changes
+                self._lu_solver = f.LUSolver(self.linear_matrix, method)
+        self._linear_assembler.assemble(self._linear_vector)
+        self._lu_solver.solve(self.T.vector(), self._linear_vector)
 
     def define_newton_solver(self):
         """Creates the Newton solver and sets its parameters"""
+        if self.nonlinear_solver == "snes":
+            self.newton_solver = festim.snes_solver(
+                absolute_tolerance=self.absolute_tolerance,
+                relative_tolerance=self.relative_tolerance,
+                maximum_iterations=self.maximum_iterations,
+                linear_solver=self.linear_solver,
+                preconditioner=self.preconditioner,
+                snes_type=self.snes_type,
+                line_search=self.line_search,
+                inexact_newton=self.inexact_newton,
+                prefix="festim_heat_transfer_",
+            )
+            return
         self.newton_solver = f.NewtonSolver(f.MPI.comm_world)
         self.newton_solver.parameters["error_on_nonconvergence"] = False
         self.newton_solver.parameters["absolute_tolerance"] = self.absolute_tolerance
@@ -241,6 +389,7 @@ class HeatTransferProblem(festim.Temperature):
         """
         V = self.T.function_space()
         self.dirichlet_bcs = []
+        self.expressions_registry = None
         for bc in self.boundary_conditions:
             if isinstance(bc, festim.DirichletBC) and bc.field == "T":
                 bc.create_expression(self.T)
@@ -258,19 +407,80 @@ class HeatTransferProblem(festim.Temperature):
             t (float): the time
         """
         if self.transient:
-            festim.update_expressions(self.sub_expressions, t)
+            if self.expressions_registry is None:
+                self.expressions_registry = festim.ExpressionsRegistry(
+                    self.sub_expressions
+                )
+            self.expressions_registry.update(t)
+            if self.coupled:
+                # T is solved with the H transport problem
+                return
+            if self.steady_state_tolerance is not None:
+                # the expressions are only checked at steady state
+                if self.thermal_steady_state and not self.expressions_changed(t):
+                    # T is unchanged, keep the history of BDF2 consistent
+                    self.T_nm1.assign(self.T_n)
+                    self.nb_skipped_solves += 1
+                    f.info(
+                        "Heat transfer: thermal steady state, solve skipped "
+                        "({} skipped)".format(self.nb_skipped_solves)
+                    )
+                    return
             # Solve heat transfers
-            dT = f.TrialFunction(self.T.function_space())
-            JT = f.derivative(self.F, self.T, dT)  # Define the Jacobian
-            problem = festim.Problem(JT, self.F, self.dirichlet_bcs)
+            if self.linear:
+                self.solve_linear()
+            else:
+                if self.problem is None:
+                    dT = f.TrialFunction(self.T.function_space())
+                    JT = f.derivative(self.F, self.T, dT)  # Define the Jacobian
+                    self.problem = festim.Problem(JT, self.F, self.dirichlet_bcs)
+
+                f.begin(
+                    "Solving nonlinear variational problem."
+                )  # Add message to fenics logs
+                self.newton_solver.solve(self.problem, self.T.vector())
+                f.end()
+
+            if self.steady_state_tolerance is not None:
+                # rate criterion: the change over a step scales with dt
+                change = (self.T.vector() - self.T_n.vector()).norm("l2")
+                rate = change / float(self._dt.value)
+                self.thermal_steady_state = (
+                    rate <= self.steady_state_tolerance * self.T.vector().norm("l2")
+                )
+
+            self.T_nm1.assign(self.T_n)
+            self.T_n.assign(self.T)
+            self.update_arrhenius()
 
-            f.begin(
-                "Solving nonlinear variational problem."
-            )  # Add message to fenics logs
-            self.newton_solver.solve(problem, self.T.vector())
-            f.end()
+    def expressions_changed(self, t):
+        """Checks if the time dependent expressions (boundary conditions,
+        sources) have changed since the last call. The expressions created
+        from sympy are compared through their sympy value at t, the other
+        ones are interpolated on the function space of T. Only called at
+        thermal steady state.
 
-            self.T_n.assign(self.T)
+        Args:
+            t (float): the time
+
+        Returns:
+            bool: True if an expression has changed (or at the first call)
+        """
+        V = self.T.function_space()
+        values = []
+        for expression in self.expressions_registry.time_dependent:
+            if hasattr(expression, "_sympy_value"):
+                values.append(expression._sympy_value.subs(festim.t, t))
+            elif isinstance(expression, (f.Expression, f.UserExpression)):
+                values.append(f.interpolate(expression, V).vector().get_local())
+        changed = self._expressions_values is None or any(
+            not np.array_equal(value, previous_value)
+            if isinstance(value, np.ndarray)
+            else value != previous_value
+            for value, previous_value in zip(values, self._expressions_values)
+        )
+        self._expressions_values = values
+        return bool(f.MPI.max(f.MPI.comm_world, float(changed)))
 
     def is_steady_state(self):
         return not self.transient
@@ -1,6 +1,7 @@
 import festim
 import fenics as f
 import pytest
+import numpy as np
 
 
 def test_default_dt_min_value():
@@ -188,3 +189,410 @@ class Test_solve_once_with_custom_solver:
         problem_2.solve_once()
 
         assert (problem_1.u.vector() == problem_2.u.vector()).all()
+
+
+def test_problem_is_reused_between_solves():
+    """Checks that the festim.Problem is built once and reused by
+    successive calls to solve_once()"""
+    # build
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, maximum_iterations=50
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.F = (
+        (my_problem.u - my_problem.u_n) * my_problem.v * f.dx
+        + 1 * my_problem.v * f.dx
+        + f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+    )
+
+    # run
+    my_problem.solve_once()
+    problem = my_problem.problem
+    my_problem.u_n.assign(my_problem.u)
+    my_problem.solve_once()
+
+    # test
+    assert my_problem.problem is problem
+
+
+@pytest.mark.parametrize("update_jacobian", [True, False])
+def test_solve_once_reuse_factorization(update_jacobian):
+    """Checks that solve_once() converges when the factorization of the
+    direct solver is reused, with and without modified Newton"""
+    # build
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        maximum_iterations=50,
+        linear_solver="petsc",
+        reuse_factorization=True,
+        update_jacobian=update_jacobian,
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.F = (
+        (my_problem.u - my_problem.u_n) * my_problem.v * f.dx
+        + my_problem.u**2 * my_problem.v * f.dx
+        - 1 * my_problem.v * f.dx
+        + f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+    )
+
+    # run
+    for i in range(2):
+        nb_it, converged = my_problem.solve_once()
+        my_problem.u_n.assign(my_problem.u)
+
+        # test
+        assert converged
+
+
+def test_reused_jacobian_assembled_again_when_stepsize_changes():
+    """Checks that with update_jacobian=False the Jacobian (and its
+    factorization) is only assembled again when the stepsize changes"""
+    # build
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+    dt = festim.Stepsize(0.1)
+    dt.initialise_value()
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        maximum_iterations=50,
+        final_time=1,
+        linear_solver="petsc",
+        reuse_factorization=True,
+        update_jacobian=False,
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.bcs = []
+    my_problem.F = (
+        (my_problem.u - my_problem.u_n) / dt.value * my_problem.v * f.dx
+        + my_problem.u**2 * my_problem.v * f.dx
+        - 1 * my_problem.v * f.dx
+        + f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+    )
+
+    # run
+    norms = []
+    for t, stepsize in [(0.1, 0.1), (0.2, 0.1), (0.25, 0.05)]:
+        dt.value.assign(stepsize)
+        my_problem.update(t, dt)
+        norms.append(my_problem.problem.A.norm("frobenius"))
+
+    # test
+    assert norms[1] == norms[0]
+    assert norms[2] != pytest.approx(norms[1])
+
+
+def test_direct_solver_options_cleared():
+    """Checks that the options of the direct solver are applied and then
+    removed from the PETSc options database, so that they don't apply to
+    the solvers created afterwards with the same prefix"""
+    from petsc4py import PETSc
+
+    solver = festim.direct_solver("petsc", prefix="festim_test_direct_")
+
+    assert solver.ksp().getType() == "preonly"
+    assert solver.ksp().getPC().getType() == "lu"
+    assert not PETSc.Options().hasName("festim_test_direct_pc_type")
+
+
+def test_direct_solver_wrong_method():
+    """Checks that an error is raised when creating a direct solver with
+    an iterative method"""
+    with pytest.raises(ValueError, match="gmres is not a direct method"):
+        festim.direct_solver("gmres")
+
+
+@pytest.mark.parametrize(
+    "snes_type,line_search", [("newtonls", "bt"), ("newtonls", "l2"), ("newtontr", "bt")]
+)
+def test_solve_once_snes(snes_type, line_search):
+    """Checks that solve_once() converges with the SNES solver and that the
+    residual and jacobian evaluations are counted"""
+    # build
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        maximum_iterations=50,
+        nonlinear_solver="snes",
+        snes_type=snes_type,
+        line_search=line_search,
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.F = (
+        (my_problem.u - my_problem.u_n) * my_problem.v * f.dx
+        + my_problem.u**2 * my_problem.v * f.dx
+        - 1 * my_problem.v * f.dx
+        + f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+    )
+
+    # run
+    nb_it, converged = my_problem.solve_once()
+
+    # test
+    assert isinstance(my_problem.newton_solver, f.PETScSNESSolver)
+    assert converged
+    assert my_problem.problem.nb_residual_evaluations > 0
+    assert my_problem.problem.nb_jacobian_evaluations > 0
+
+
+def test_snes_solver_options_cleared():
+    """Checks that the Eisenstat-Walker option of the SNES solver is applied
+    and then removed from the PETSc options database"""
+    from petsc4py import PETSc
+
+    solver = festim.snes_solver(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        maximum_iterations=30,
+        inexact_newton=True,
+        prefix="festim_test_snes_",
+    )
+
+    assert solver.snes().getUseEW()
+    assert not PETSc.Options().hasName("festim_test_snes_snes_ksp_ew")
+
+
+def test_solve_once_fieldsplit():
+    """Checks that solve_once() converges with the fieldsplit block
+    preconditioner on a mobile/trap mixed space"""
+    from petsc4py import PETSc
+
+    # build
+    mesh = f.UnitSquareMesh(8, 8)
+    element = f.FiniteElement("CG", mesh.ufl_cell(), 1)
+    V = f.FunctionSpace(mesh, f.MixedElement([element, element]))
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        maximum_iterations=50,
+        linear_solver="gmres",
+        preconditioner="fieldsplit",
+    )
+    my_trap = festim.Trap(1, 0, 1, 0, 1, 1)
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(),
+        festim.Traps([my_trap]),
+        festim.Temperature(200),
+        my_settings,
+        [],
+    )
+    my_problem.V = V
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    c_m, c_t = f.split(my_problem.u)
+    c_m_n, c_t_n = f.split(my_problem.u_n)
+    v_m, v_t = f.split(my_problem.v)
+    my_problem.F = (
+        (c_m - c_m_n) * v_m * f.dx
+        + f.dot(f.grad(c_m), f.grad(v_m)) * f.dx
+        - 1 * v_m * f.dx
+        + (c_t - c_t_n) * v_t * f.dx
+        - (c_m * (1 - c_t) - c_t) * v_t * f.dx
+    )
+
+    # run
+    nb_it, converged = my_problem.solve_once()
+
+    # test
+    assert converged
+    # the options of the blocks are applied and removed from the database
+    pc = my_problem.newton_solver._linear_solver.ksp().getPC()
+    assert pc.getType() == "fieldsplit"
+    assert pc.getFieldSplitSubKSP()[0].getPC().getType() == "gamg"
+    assert not PETSc.Options().hasName("festim_h_transport_pc_fieldsplit_type")
+
+
+def test_solver_statistics_are_stored():
+    """Checks that update() stores the solver statistics of the time step"""
+    # build
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        maximum_iterations=50,
+        final_time=10,
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.F = (
+        (my_problem.u - my_problem.u_n) * my_problem.v * f.dx
+        + 1 * my_problem.v * f.dx
+        + f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+    )
+
+    # run
+    my_problem.update(1, festim.Stepsize(1))
+
+    # test
+    assert len(my_problem.solver_statistics) == 1
+    statistics = my_problem.solver_statistics[0]
+    assert statistics["t"] == 1
+    assert statistics["rejected_solves"] == 0
+    assert statistics["iterations"] >= 1
+    assert statistics["residual_evaluations"] >= statistics["iterations"]
+
+
+@pytest.mark.parametrize("predictor", ["linear", "quadratic"])
+def test_predictor_extrapolates_initial_guess(predictor):
+    """Checks that update() extrapolates the initial guess from the history
+    of accepted solutions when a predictor is set"""
+    # build
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        maximum_iterations=50,
+        final_time=10,
+        predictor=predictor,
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.F = (
+        (my_problem.u - my_problem.u_n) * my_problem.v * f.dx
+        + my_problem.u**2 * my_problem.v * f.dx
+        - 1 * my_problem.v * f.dx
+        + f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+    )
+
+    # run
+    for t in [1, 2, 3]:
+        my_problem.update(t, festim.Stepsize(1))
+
+    # test
+    assert len(my_problem.history) == 3
+    assert not my_problem.solver_statistics[0]["predicted"]
+    assert my_problem.solver_statistics[1]["predicted"]
+    assert my_problem.solver_statistics[2]["predicted"]
+
+
+def test_wrong_predictor():
+    """Checks that an error is raised for a wrong predictor"""
+    with pytest.raises(ValueError, match="Acceptable values for predictor are"):
+        festim.Settings(1e-10, 1e-10, predictor="cubic")
+
+
+def test_wrong_splitting():
+    """Checks that an error is raised for a wrong splitting"""
+    with pytest.raises(ValueError, match="Acceptable values for splitting are"):
+        festim.Settings(1e-10, 1e-10, splitting="godunov")
+
+
+def test_wrong_nonlinear_solver():
+    """Checks that an error is raised for a wrong nonlinear_solver"""
+    with pytest.raises(
+        ValueError, match="Acceptable values for nonlinear_solver are"
+    ):
+        festim.Settings(1e-10, 1e-10, nonlinear_solver="coucou")
+
+
+def test_wrong_quadrature_degree_term():
+    """Checks that an error is raised for a wrong term of quadrature_degree"""
+    with pytest.raises(ValueError, match="Acceptable keys for quadrature_degree"):
+        festim.Settings(1e-10, 1e-10, quadrature_degree={"mass": 2})
+
+
+@pytest.mark.parametrize("time_scheme", ["backward_euler", "BDF2"])
+def test_estimate_error_same_as_local_error(time_scheme):
+    """Checks that the error estimated by estimate_error matches the local
+    truncation error of a step of u' = -u (exact solution exp(-t)) starting
+    from the exact solution, on non uniform steps"""
+    # build
+    mesh = f.UnitIntervalMesh(2)
+    V = f.FunctionSpace(mesh, "CG", 1)
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-14,
+        relative_tolerance=1e-14,
+        maximum_iterations=10,
+        final_time=10,
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.bcs = []
+    dt = festim.Stepsize(
+        0.01,
+        error_tolerance=1e-30,
+        error_absolute_tolerance=1,
+        time_scheme=time_scheme,
+    )
+
+    times = [1.0, 1.015, 1.03][-(dt.order + 1) :]
+    t = times[-1] + 0.01
+    h, h_n = t - times[-1], times[-1] - times[-2]
+    omega = h / h_n
+    u_n = f.Constant(np.exp(-times[-1]))
+    u_nm1 = f.Constant(np.exp(-times[-2]))
+    u, v = my_problem.u, my_problem.v
+    if time_scheme == "backward_euler":
+        dudt = (u - u_n) / h
+    else:
+        dudt = (
+            (1 + 2 * omega) / (1 + omega) * u
+            - (1 + omega) * u_n
+            + omega**2 / (1 + omega) * u_nm1
+        ) / h
+    my_problem.F = dudt * v * f.dx + u * v * f.dx
+    my_problem.history = [(t_i, np.exp(-t_i) * np.ones(V.dim())) for t_i in times]
+
+    # run
+    my_problem.solve_once()
+    estimated = my_problem.estimate_error(t, dt)
+
+    # test
+    local_error = abs(my_problem.u.vector().get_local()[0] - np.exp(-t))
+    assert estimated == pytest.approx(local_error, rel=0.05)
@@ -1,6 +1,7 @@
 import festim
 import pytest
 import fenics as f
+import sympy as sp
 
 
 @pytest.mark.parametrize("preconditioner", ["default", "icc"])
@@ -85,3 +86,141 @@ class Test_solve_once_with_custom_solver:
         problem_2.create_functions(materials=materials, mesh=mesh)
 
         assert (problem_1.T.vector() == problem_2.T.vector()).all()
+
+
+def test_create_functions_snes():
+    """
+    Checks that the steady state heat transfer problem can be solved with the
+    SNES solver
+    """
+    mesh = festim.MeshFromRefinements(10, size=0.1)
+
+    materials = festim.Materials([festim.Material(id=1, D_0=1, E_D=0, thermal_cond=1)])
+    mesh.define_measures(materials)
+
+    my_problem = festim.HeatTransferProblem(
+        transient=False, nonlinear_solver="snes", line_search="l2"
+    )
+    my_problem.boundary_conditions = [
+        festim.DirichletBC(surfaces=[1, 2], value=1, field="T"),
+    ]
+
+    # run
+    my_problem.create_functions(materials=materials, mesh=mesh)
+
+    assert isinstance(my_problem.newton_solver, f.PETScSNESSolver)
+    assert my_problem.T(0.05) == pytest.approx(1)
+
+
+def transient_problem(
+    thermal_cond, T_left=300 + 100 * festim.t, steady_state_tolerance=None
+):
+    """Creates a transient heat transfer problem on [0, 1]"""
+    mesh = festim.MeshFromVertices([i / 20 for i in range(21)])
+    materials = festim.Materials(
+        [
+            festim.Material(
+                id=1, D_0=1, E_D=0, thermal_cond=thermal_cond, heat_capacity=1, rho=1
+            )
+        ]
+    )
+    mesh.define_measures(materials)
+    dt = festim.Stepsize(0.1)
+    dt.initialise_value()
+
+    my_problem = festim.HeatTransferProblem(
+        transient=True,
+        initial_condition=300,
+        steady_state_tolerance=steady_state_tolerance,
+    )
+    my_problem.boundary_conditions = [
+        festim.DirichletBC(surfaces=[1], value=T_left, field="T"),
+        festim.DirichletBC(surfaces=[2], value=300, field="T"),
+    ]
+    my_problem.create_functions(materials=materials, mesh=mesh, dt=dt)
+    return my_problem, dt
+
+
+def test_linear_problem_detected():
+    """Checks that the problem is detected as linear only with constant
+    thermal properties"""
+    linear_problem, _ = transient_problem(thermal_cond=2)
+    nonlinear_problem, _ = transient_problem(thermal_cond=lambda T: 1 + 1e-3 * T)
+
+    assert linear_problem.linear
+    assert not nonlinear_problem.linear
+
+
+def test_linear_problem_factorized_once():
+    """Checks that the matrix of a linear problem is assembled once for a
+    constant stepsize, again when the stepsize changes, and that the
+    solution is the same as with the Newton solver"""
+    linear_problem, dt = transient_problem(thermal_cond=2)
+    newton_problem, newton_dt = transient_problem(thermal_cond=2)
+    newton_problem.linear = False
+
+    t = 0
+    for i in range(5):
+        t += float(dt.value)
+        linear_problem.update(t)
+        newton_problem.update(t)
+    assert linear_problem.nb_matrix_assemblies == 1
+    assert linear_problem.T.vector().get_local() == pytest.approx(
+        newton_problem.T.vector().get_local()
+    )
+
+    dt.value.assign(0.2)
+    linear_problem.update(t + 0.2)
+    assert linear_problem.nb_matrix_assemblies == 2
+
+
+def test_solves_skipped_at_thermal_steady_state():
+    """Checks that the solves are skipped once the thermal steady state is
+    reached and resume when a boundary condition changes"""
+    T_left = sp.Piecewise((400, festim.t < 50), (500, True))
+    my_problem, dt = transient_problem(
+        thermal_cond=2, T_left=T_left, steady_state_tolerance=1e-8
+    )
+    dt.value.assign(1)
+
+    for t in range(1, 50):
+        my_problem.update(t)
+    assert my_problem.nb_skipped_solves > 0
+    assert my_problem.T(0.5) == pytest.approx(350)
+    # the history of BDF2 is kept consistent
+    assert my_problem.T_nm1.vector().get_local() == pytest.approx(
+        my_problem.T_n.vector().get_local()
+    )
+
+    nb_skipped_solves = my_problem.nb_skipped_solves
+    my_problem.update(50)
+    assert my_problem.nb_skipped_solves == nb_skipped_solves
+    assert my_problem.T(0) == pytest.approx(500)
+
+
+def test_small_steps_not_mistaken_for_thermal_steady_state():
+    """Checks that the steady state criterion is a rate: with small time
+    steps the change of T over a step is small but T is still evolving"""
+    my_problem, dt = transient_problem(
+        thermal_cond=2, T_left=400, steady_state_tolerance=1e-2
+    )
+    dt.value.assign(1e-4)
+
+    for i in range(1, 6):
+        my_problem.update(i * 1e-4)
+    assert not my_problem.thermal_steady_state
+    assert my_problem.nb_skipped_solves == 0
+
+
+def test_expressions_changed_compares_sympy_values():
+    """Checks that the expressions created from sympy are compared through
+    their value at t"""
+    T_left = sp.Piecewise((400, festim.t < 50), (500, True))
+    my_problem, _ = transient_problem(thermal_cond=2, T_left=T_left)
+    my_problem.expressions_registry = festim.ExpressionsRegistry(
+        my_problem.sub_expressions
+    )
+
+    assert my_problem.expressions_changed(1)
+    assert not my_problem.expressions_changed(2)
+    assert my_problem.expressions_changed(50)
@@ -1,3 +1,4 @@
+import gc
 import festim as F
 import fenics as f
 import numpy as np
@@ -495,6 +496,75 @@ class TestFestimProblem:
 
         assert (A1.array() == A2.array()).all()
 
+    def test_J_own_matrix(self):
+        """
+        Checks that festim.Problem.J assembles in its own matrix when
+        own_matrix is True and leaves the given matrix untouched
+        """
+        problem = F.Problem(self.J, self.s, [])
+        problem.own_matrix = True
+        A1 = f.PETScMatrix()
+        A2 = f.PETScMatrix()
+
+        problem.J(A1, self.x)
+        self.assembler.assemble(A2)
+
+        assert A1.empty()
+        assert (problem.A.array() == A2.array()).all()
+
+    def test_reuse_sparsity_shares_matrix(self):
+        """Checks that problems built on the same function space with
+        reuse_sparsity share their matrix"""
+        problem_1 = F.Problem(self.J, self.s, [], reuse_sparsity=True)
+        problem_2 = F.Problem(self.J, self.s, [], reuse_sparsity=True)
+        problem_3 = F.Problem(self.J, self.s, [])
+
+        assert problem_1.A is problem_2.A
+        assert problem_1.A is not problem_3.A
+
+    def test_reuse_sparsity_different_forms(self):
+        """Checks that problems with different Jacobian forms on the same
+        function space don't share their matrix"""
+        v = self.J.arguments()[0]
+        u = self.J.arguments()[1]
+        J_boundary = self.J + u * v * f.ds
+        problem_1 = F.Problem(self.J, self.s, [], reuse_sparsity=True)
+        problem_2 = F.Problem(J_boundary, self.s, [], reuse_sparsity=True)
+
+        assert problem_1.A is not problem_2.A
+
+    def test_reuse_sparsity_matrix_released(self):
+        """Checks that the shared matrix is released when the problems
+        using it are deleted"""
+        problem = F.Problem(self.J, self.s, [], reuse_sparsity=True)
+        key = problem.sparsity_key()
+        assert key in F.Problem._shared_matrices
+
+        del problem
+        gc.collect()
+
+        assert key not in F.Problem._shared_matrices
+
+
+def test_festim_newton_solver_same_as_fenics():
+    """Checks that festim.NewtonSolver gives the same solution as
+    fenics.NewtonSolver"""
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+    bcs = [f.DirichletBC(V, f.Constant(1), "on_boundary")]
+    solutions = []
+    for solver in [f.NewtonSolver(), F.NewtonSolver()]:
+        u = f.Function(V)
+        v = f.TestFunction(V)
+        form = f.dot((1 + u**2) * f.grad(u), f.grad(v)) * f.dx - v * f.dx
+        problem = F.Problem(f.derivative(form, u), form, bcs)
+        # solve twice to reuse the assembled matrix
+        solver.solve(problem, u.vector())
+        solver.solve(problem, u.vector())
+        solutions.append(u.vector().get_local())
+
+    assert np.allclose(solutions[0], solutions[1])
+
 
 class TestWarningsCustomSolver:
     """
@@ -850,3 +920,415 @@ def test_soret_surface_flux_mass_balance(coordinates, surface_flux_class):
 
     assert not np.isclose(flux_left.data[0], 0)
     assert np.isclose(np.abs(flux_left.data[0]), np.abs(flux_right.data[0]), rtol=1e-2)
+
+
+def two_traps_model(transient=True, final_time=20, stepsize=0.5, **settings):
+    """Creates a 1D model with two traps, used to compare the solver
+    settings. The model can be modified before being initialised.
+
+    Args:
+        transient (bool, optional): If True, the model is transient.
+            Defaults to True.
+        final_time (float, optional): the final time of a transient model.
+            Defaults to 20.
+        stepsize (float, optional): the stepsize of a transient model.
+            Defaults to 0.5.
+        **settings: the other arguments of festim.Settings (the tolerances
+            default to 1e-10)
+
+    Returns:
+        festim.Simulation: the model
+    """
+    my_model = F.Simulation(log_level=40)
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 50))
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.traps = [
+        F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=2),
+        F.Trap(k_0=2, E_k=0, p_0=0.5, E_p=0, materials=1, density=1),
+    ]
+    my_model.T = F.Temperature(500)
+    my_model.boundary_conditions = [
+        F.DirichletBC(surfaces=[1, 2], value=1, field=0),
+    ]
+    settings = {"absolute_tolerance": 1e-10, "relative_tolerance": 1e-10, **settings}
+    my_model.settings = F.Settings(
+        transient=transient, final_time=final_time if transient else None, **settings
+    )
+    if transient:
+        my_model.dt = F.Stepsize(stepsize)
+    return my_model
+
+
+@pytest.mark.parametrize("transient", [True, False])
+def test_eliminated_traps_same_as_traps_in_system(transient):
+    """Checks that eliminating the traps from the H transport system gives
+    the same trapped concentration with a system three times smaller"""
+    model_in_system = two_traps_model(transient, eliminate_traps=False)
+    model_eliminated = two_traps_model(transient, eliminate_traps=True)
+    for my_model in [model_in_system, model_eliminated]:
+        my_model.initialise()
+        my_model.run()
+
+    # only the mobile concentration is left in the system
+    assert model_eliminated.h_transport_problem.V.dim() * 3 == (
+        model_in_system.h_transport_problem.V.dim()
+    )
+    for trap_in_system, eliminated_trap in zip(
+        model_in_system.traps, model_eliminated.traps
+    ):
+        eliminated_trap = eliminated_trap.post_processing_solution
+        assert np.allclose(
+            f.project(
+                trap_in_system.post_processing_solution,
+                eliminated_trap.function_space(),
+            )
+            .vector()
+            .get_local(),
+            eliminated_trap.vector().get_local(),
+            rtol=1e-2,
+        )
+
+
+@pytest.mark.parametrize("splitting", ["lie", "strang"])
+def test_split_trapping_same_as_traps_in_system(splitting):
+    """Checks that splitting the trapping kinetics from the mobile transport
+    gives the same trapped concentration as solving the traps in the
+    system, with only the mobile concentration in the Newton system"""
+    model_in_system = two_traps_model(stepsize=0.05, splitting=None)
+    model_split = two_traps_model(stepsize=0.05, splitting=splitting)
+    for my_model in [model_in_system, model_split]:
+        my_model.initialise()
+        my_model.run()
+
+    assert model_split.h_transport_problem.V.num_sub_spaces() == 0
+    for trap_in_system, split_trap in zip(model_in_system.traps, model_split.traps):
+        split_trap = split_trap.post_processing_solution
+        assert np.allclose(
+            f.project(
+                trap_in_system.post_processing_solution, split_trap.function_space()
+            )
+            .vector()
+            .get_local(),
+            split_trap.vector().get_local(),
+            rtol=1e-2,
+        )
+
+
+def test_pseudo_transient_same_as_steady_newton():
+    """Checks that the pseudo-transient continuation converges to the same
+    steady state as the Newton solver, and that the pseudo time step grows
+    as the residual falls"""
+
+    def run(pseudo_transient):
+        my_model = two_traps_model(transient=False, pseudo_transient=pseudo_transient)
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0.1)
+        my_model.traps = [
+            F.Trap(k_0=1, E_k=0.1, p_0=1e3, E_p=0.5, materials=1, density=2),
+            F.Trap(k_0=2, E_k=0.1, p_0=1e3, E_p=0.8, materials=1, density=1),
+        ]
+        my_model.T = F.Temperature(500 + 100 * F.x)
+        my_model.boundary_conditions = [
+            F.DirichletBC(surfaces=[1], value=1, field=0),
+        ]
+        my_model.sources = [F.Source(value=1, volume=1, field=0)]
+        my_model.initialise()
+        my_model.run()
+        return my_model
+
+    newton_model = run(False)
+    pseudo_transient_model = run(True)
+
+    assert np.allclose(
+        newton_model.h_transport_problem.u.vector().get_local(),
+        pseudo_transient_model.h_transport_problem.u.vector().get_local(),
+        rtol=1e-6,
+    )
+    problem = pseudo_transient_model.h_transport_problem
+    assert problem.pseudo_problem.nb_residual_evaluations > 0
+    assert float(problem.pseudo_dt) > (
+        pseudo_transient_model.settings.pseudo_transient_initial_step
+    )
+
+
+def test_pseudo_transient_transient_raises_error():
+    """Checks that an error is raised when pseudo_transient is used in a
+    transient simulation"""
+    my_model = F.Simulation(log_level=40)
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 10))
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.T = F.Temperature(500)
+    my_model.settings = F.Settings(1e-10, 1e-10, final_time=1, pseudo_transient=True)
+    my_model.dt = F.Stepsize(0.1)
+    with pytest.raises(ValueError, match="pseudo_transient is only available"):
+        my_model.initialise()
+
+
+@pytest.mark.parametrize("transient", [True, False])
+def test_jacobian_free_same_as_assembled_jacobian(transient):
+    """Checks that the Jacobian-free Newton-Krylov solver gives the same
+    solution as the Newton solver with the assembled Jacobian, without
+    assembling the Jacobian matrix"""
+
+    def run(jacobian_free):
+        my_model = two_traps_model(transient, final_time=5, jacobian_free=jacobian_free)
+        my_model.sources = [F.Source(value=1, volume=1, field=0)]
+        my_model.initialise()
+        my_model.run()
+        return my_model.h_transport_problem
+
+    assembled = run(False)
+    jacobian_free = run(True)
+
+    assert np.allclose(
+        assembled.u.vector().get_local(),
+        jacobian_free.u.vector().get_local(),
+        rtol=1e-6,
+    )
+    assert jacobian_free.problem.nb_jacobian_evaluations == 0
+    assert jacobian_free.problem.A.empty()
+    assert jacobian_free.newton_solver.nb_krylov_iterations > 0
+
+
+def test_error_controlled_stepsize_reaches_final_time():
+    """Checks that a simulation with an error controlled stepsize reaches the
+    final time with all accepted steps within tolerance, and that the
+    stepsize grows (fewer steps than with the initial stepsize)"""
+    my_model = two_traps_model(final_time=10)
+    my_model.dt = F.Stepsize(0.01, error_tolerance=1e-2)
+    my_model.initialise()
+    my_model.run()
+
+    statistics = my_model.h_transport_problem.solver_statistics
+    assert np.isclose(my_model.t, my_model.settings.final_time, atol=0)
+    assert all(s["error"] is None or s["error"] <= 1 for s in statistics)
+    assert len(statistics) < 10 / 0.01
+
+
+def test_bdf2_more_accurate_than_backward_euler():
+    """Checks that, for the same stepsize, BDF2 is closer than backward Euler
+    to a reference solution computed with small steps"""
+
+    def run(stepsize, time_scheme):
+        my_model = two_traps_model(final_time=1)
+        my_model.dt = F.Stepsize(stepsize, time_scheme=time_scheme)
+        my_model.initialise()
+        my_model.run()
+        return my_model.h_transport_problem.u.vector().get_local()
+
+    reference = run(1e-3, "BDF2")
+    error_backward_euler = np.linalg.norm(run(0.1, "backward_euler") - reference)
+    error_bdf2 = np.linalg.norm(run(0.1, "BDF2") - reference)
+    assert error_bdf2 < error_backward_euler
+
+
+def test_prescribed_quadrature_degree_same_as_estimated():
+    """Checks that prescribing the quadrature degrees of the terms gives the
+    same solution as the degrees estimated by UFL, with lower degrees"""
+
+    def run(quadrature_degree):
+        my_model = two_traps_model(transient=False, quadrature_degree=quadrature_degree)
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0.1)
+        my_model.traps = F.Trap(
+            k_0=1, E_k=0.2, p_0=1e3, E_p=0.5, materials=1, density=2
+        )
+        my_model.T = F.Temperature(500 + 100 * F.x)
+        my_model.sources = [F.Source(value=1 + F.x, volume=1, field=0)]
+        my_model.boundary_conditions = [
+            F.DirichletBC(surfaces=[1], value=1, field=0),
+            F.RecombinationFlux(Kr_0=1, E_Kr=0.1, order=2, surfaces=[2]),
+        ]
+        my_model.initialise()
+        my_model.run()
+        return my_model.h_transport_problem
+
+    estimated = run(quadrature_degree=None)
+    prescribed = run(
+        quadrature_degree={"diffusion": 4, "trapping": 4, "fluxes": 4, "sources": 2}
+    )
+
+    assert np.allclose(
+        estimated.u.vector().get_local(),
+        prescribed.u.vector().get_local(),
+        rtol=1e-3,
+    )
+    estimated_degrees = F.quadrature_degrees(estimated.F, verbose=False)
+    prescribed_degrees = F.quadrature_degrees(prescribed.F, verbose=False)
+    assert all(is_prescribed for _, _, _, is_prescribed in prescribed_degrees)
+    assert max(degree for _, _, degree, _ in prescribed_degrees) == 4
+    assert max(degree for _, _, degree, _ in estimated_degrees) > 4
+
+
+@pytest.mark.parametrize("soret", [False, True])
+def test_coupled_heat_transfer_same_as_staggered(soret):
+    """Checks that solving the heat transfer in the H transport problem gives
+    the same temperature and concentration as the staggered scheme, without
+    solving the heat transfer problem. The Sieverts' law BC checks that the
+    Dirichlet BCs use the temperature of the current step."""
+
+    def run(coupled):
+        # the residual of the temperature rows is large (~1e4), the relative
+        # tolerance is kept above round-off
+        my_model = two_traps_model(
+            final_time=1,
+            stepsize=0.01,
+            relative_tolerance=1e-9,
+            soret=soret,
+            coupled_heat_transfer=coupled,
+        )
+        my_model.materials = F.Material(
+            id=1,
+            D_0=1,
+            E_D=0.1,
+            Q=0.1,
+            thermal_cond=lambda T: 1 + 1e-3 * T,
+            heat_capacity=1,
+            rho=1,
+        )
+        my_model.traps = F.Trap(
+            k_0=1, E_k=0.1, p_0=1e2, E_p=0.3, materials=1, density=2
+        )
+        my_model.T = F.HeatTransferProblem(transient=True, initial_condition=500)
+        my_model.boundary_conditions = [
+            F.DirichletBC(surfaces=[1], value=500 + 200 * F.t, field="T"),
+            F.DirichletBC(surfaces=[2], value=500, field="T"),
+            F.SievertsBC(surfaces=[1], S_0=1, E_S=0.5, pressure=1e10),
+        ]
+        my_model.initialise()
+        my_model.run()
+        return my_model
+
+    def values(my_model):
+        points = np.linspace(0, 1, 11)
+        c = my_model.mobile.post_processing_solution
+        return (
+            np.array([my_model.T.T(x) for x in points]),
+            np.array([c(x) for x in points]),
+        )
+
+    staggered = run(coupled=False)
+    coupled = run(coupled=True)
+
+    T_staggered, c_staggered = values(staggered)
+    T_coupled, c_coupled = values(coupled)
+    assert np.allclose(T_staggered, T_coupled, rtol=1e-2)
+    assert np.allclose(c_staggered, c_coupled, rtol=1e-2, atol=1e-4)
+    # T is a component of the H transport problem
+    assert coupled.h_transport_problem.V.num_sub_spaces() == 3
+    assert coupled.T.problem is None
+
+
+def test_coupled_heat_transfer_fieldsplit_raises_error():
+    """Checks that coupled_heat_transfer raises an error with the fieldsplit
+    preconditioner (it has no block for the temperature)"""
+    my_model = two_traps_model(
+        final_time=1, coupled_heat_transfer=True, preconditioner="fieldsplit"
+    )
+    my_model.materials = F.Material(
+        id=1, D_0=1, E_D=0, thermal_cond=1, heat_capacity=1, rho=1
+    )
+    my_model.T = F.HeatTransferProblem(transient=True, initial_condition=500)
+    my_model.boundary_conditions.append(
+        F.DirichletBC(surfaces=[1, 2], value=500, field="T")
+    )
+    with pytest.raises(NotImplementedError, match="fieldsplit"):
+        my_model.initialise()
+
+
+def test_coupled_heat_transfer_steady_temperature_raises_error():
+    """Checks that coupled_heat_transfer requires a transient heat transfer
+    problem"""
+    my_model = F.Simulation(log_level=40)
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 10))
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0, thermal_cond=1)
+    my_model.T = F.HeatTransferProblem(transient=False)
+    my_model.boundary_conditions = [
+        F.DirichletBC(surfaces=[1, 2], value=500, field="T"),
+    ]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        final_time=1,
+        coupled_heat_transfer=True,
+    )
+    my_model.dt = F.Stepsize(0.1)
+    with pytest.raises(ValueError, match="coupled_heat_transfer requires"):
+        my_model.initialise()
+
+
+def test_rejected_step_restores_heat_transfer_state():
+    """Checks that when the step of the H transport problem is rejected, the
+    skipped solves of the heat transfer problem are counted once"""
+    my_model = two_traps_model(final_time=100)
+    my_model.materials = F.Material(
+        id=1, D_0=1, E_D=0, thermal_cond=1, heat_capacity=1, rho=1
+    )
+    my_model.T = F.HeatTransferProblem(
+        transient=True, initial_condition=500, steady_state_tolerance=1e-8
+    )
+    my_model.boundary_conditions.append(
+        F.DirichletBC(surfaces=[1, 2], value=500, field="T")
+    )
+    my_model.dt = F.Stepsize(0.5, error_tolerance=1e10)
+    my_model.initialise()
+    for i in range(3):
+        my_model.iterate()
+    nb_skipped_solves = my_model.T.nb_skipped_solves
+    assert nb_skipped_solves > 0
+
+    update = my_model.h_transport_problem.update
+    attempts = []
+
+    def rejected_once(t, dt):
+        attempts.append(t)
+        if len(attempts) == 1:
+            return False
+        return update(t, dt)
+
+    my_model.h_transport_problem.update = rejected_once
+    my_model.iterate()
+
+    assert len(attempts) == 2
+    assert my_model.T.nb_skipped_solves == nb_skipped_solves + 1
+    assert my_model.T.thermal_steady_state
+
+
+def test_uniform_temperature_derived_quantities_and_exports(tmp_path):
+    """Checks that with a spatially uniform temperature (a fenics.Constant)
+    the derived quantities and the exports of T are the same as with T as a
+    fenics.Function"""
+
+    def run(uniform):
+        my_model = two_traps_model(final_time=2, soret=True)
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0, Q=0.1)
+        my_model.T = F.Temperature(500 + 100 * F.t)
+        my_model.T.is_uniform = lambda: uniform
+        folder = tmp_path / str(uniform)
+        derived_quantities = F.DerivedQuantities(
+            [
+                F.SurfaceFlux("solute", surface=1),
+                F.AverageVolume("T", volume=1),
+                F.MaximumVolume("T", volume=1),
+            ]
+        )
+        my_model.exports = [
+            derived_quantities,
+            F.XDMFExport("T", filename=str(folder / "T.xdmf")),
+            F.TXTExport("T", filename=str(folder / "T.txt")),
+        ]
+        my_model.initialise()
+        my_model.run()
+
+        assert isinstance(my_model.T.T, f.Constant if uniform else f.Function)
+        assert (folder / "T.xdmf").exists()
+        return (
+            np.array(derived_quantities.data[1:]),
+            np.genfromtxt(folder / "T.txt", delimiter=",", skip_header=1),
+        )
+
+    data_constant, txt_constant = run(uniform=True)
+    data_function, txt_function = run(uniform=False)
+
+    assert np.allclose(data_constant, data_function)
+    assert np.allclose(txt_constant, txt_function)
+    # the average temperature at the final time
+    assert data_constant[-1][2] == pytest.approx(700)
@@ -3,6 +3,11 @@ import fenics
 import pytest
 import sympy as sp
 import numpy as np
+import math
+import ufl
+from festim.boundary_conditions.dirichlets.dc_imp import dc_imp
+from festim.boundary_conditions.dirichlets.henrys_bc import henrys_law
+from festim.boundary_conditions.dirichlets.sieverts_bc import sieverts_law
 
 
 def test_define_dirichlet_bcs_theta():
@@ -694,3 +699,116 @@ def test_create_form_surf_kinetics():
     expected_form += (J_bs - J_sb) * solute_test_function * ds(1)
 
     assert my_bc.form.equals(expected_form)
+
+
+def test_compiled_boundary_expression_same_as_python():
+    """Checks that festim.compiled_boundary_expression gives the same values
+    as festim.BoundaryConditionExpression
+    """
+
+    def func(T, prm1, prm2, prm3):
+        return prm1 * sp.exp(-prm2 / T) + prm3**0.5
+
+    T = fenics.Expression("300 + 100*x[0] + t", degree=1, t=0)
+    prms = {
+        "prm1": fenics.Expression("2 + t", degree=1, t=0),
+        "prm2": fenics.Constant(500),
+        "prm3": 4.0,
+    }
+    compiled = festim.compiled_boundary_expression(T, func, **prms)
+    expected = festim.BoundaryConditionExpression(T, func, **prms)
+
+    assert isinstance(compiled, fenics.CompiledExpression)
+    for t in range(3):
+        T.t = t
+        prms["prm1"].t = t
+        for x in [0, 0.5, 1]:
+            assert compiled(x) == pytest.approx(float(expected(x)))
+
+
+def test_dc_custom_ufl_function_compiled():
+    """Checks that a CustomDirichlet with a function written with UFL
+    (fenics.exp) is compiled and gives the same values as in Python
+    """
+
+    def func(T, prm1):
+        return prm1 * fenics.exp(-1000 / T) + T**0.5
+
+    T = fenics.Expression("300 + 100*x[0]", degree=1)
+    prm1 = fenics.Expression("2 + x[0]", degree=1)
+    my_BC = festim.CustomDirichlet(surfaces=1, function=func, prm1=prm1)
+    my_BC.create_expression(T)
+    expected = festim.BoundaryConditionExpression(T, func, prm1=prm1)
+
+    assert isinstance(my_BC.expression, fenics.CompiledExpression)
+    for x in [0, 0.5, 1]:
+        assert my_BC.expression(x) == pytest.approx(float(expected(x)))
+
+
+def test_dc_custom_not_compiled_falls_back_to_python():
+    """Checks that a CustomDirichlet with a function that cannot be
+    converted to sympy is evaluated in Python
+    """
+
+    def func(T, prm1):
+        return math.exp(-1 / T) + prm1
+
+    T = fenics.Constant(300)
+    my_BC = festim.CustomDirichlet(surfaces=1, function=func, prm1=2)
+    my_BC.create_expression(T)
+
+    assert isinstance(my_BC.expression, festim.BoundaryConditionExpression)
+    assert my_BC.expression(0) == pytest.approx(np.exp(-1 / 300) + 2)
+
+
+@pytest.mark.parametrize(
+    "law,args",
+    [
+        (sieverts_law, (1, 0.5, 1e5)),
+        (henrys_law, (1, 0.5, 1e5)),
+        (dc_imp, (1e18, 1e-9, 1, 0.2)),
+    ],
+)
+def test_laws_return_ufl_expressions(law, args):
+    """Checks that the laws of the boundary conditions still return UFL
+    expressions of a fenics temperature"""
+    value = law(fenics.Constant(300), *args)
+    assert isinstance(value, ufl.core.expr.Expr)
+
+
+def test_boundary_condition_theta_same_as_python():
+    """Checks that festim.boundary_condition_theta gives the same values as
+    festim.BoundaryConditionTheta with Sievert's and Henry's materials
+    """
+    mesh = fenics.UnitSquareMesh(4, 4)
+    V = fenics.FunctionSpace(mesh, "P", 1)
+    vm = fenics.MeshFunction("size_t", mesh, 2, 1)
+    fenics.CompiledSubDomain("x[0] >= 0.5").mark(vm, 2)
+
+    mat1 = festim.Material(1, None, None, S_0=2, E_S=0.1)
+    mat2 = festim.Material(2, None, None, S_0=3, E_S=0.2, solubility_law="henry")
+    my_mats = festim.Materials([mat1, mat2])
+
+    T = fenics.Expression("300 + 100*x[0]", degree=1)
+    bci = fenics.Expression("200 + x[1] + t", t=0, degree=1)
+    compiled = festim.boundary_condition_theta(bci, my_mats, vm, T)
+    expected = festim.BoundaryConditionTheta(bci, my_mats, vm, T, degree=2)
+
+    for t in range(3):
+        bci.t = t
+        computed_values = fenics.interpolate(compiled, V).vector().get_local()
+        expected_values = fenics.interpolate(expected, V).vector().get_local()
+        assert np.allclose(computed_values, expected_values)
+
+
+def test_boundary_condition_theta_unknown_subdomain_id():
+    """Checks that festim.boundary_condition_theta raises a ValueError
+    naming the subdomain id that isn't in the materials"""
+    mesh = fenics.UnitSquareMesh(4, 4)
+    vm = fenics.MeshFunction("size_t", mesh, 2, 1)
+    fenics.CompiledSubDomain("x[0] >= 0.5").mark(vm, 3)
+    my_mats = festim.Materials([festim.Material(1, None, None, S_0=2, E_S=0.1)])
+    bci = fenics.Expression("200", degree=1)
+
+    with pytest.raises(ValueError, match="Couldn't find ID 3"):
+        festim.boundary_condition_theta(bci, my_mats, vm, 300)
@@ -0,0 +1,41 @@
+import festim
+import fenics as f
+import pytest
+
+
+@pytest.mark.parametrize(
+    "value,time_dependent",
+    [(1 + festim.t, True), (2 * festim.x, False), (3.0, False)],
+)
+def test_expression_from_sympy_time_dependence(value, time_dependent):
+    """Checks that expression_from_sympy flags the expressions depending on
+    festim.t"""
+    expression = festim.expression_from_sympy(value, degree=1)
+    assert festim.is_time_dependent(expression) == time_dependent
+
+
+def test_is_time_dependent():
+    """Checks the classification of the expressions that don't come from
+    sympy"""
+    assert not festim.is_time_dependent(f.Constant(1))
+    # expressions created by the user are assumed to be time dependent
+    assert festim.is_time_dependent(f.Expression("1 + t", t=0, degree=1))
+
+
+def test_registry_updates_only_unique_time_dependent_expressions():
+    """Checks that the registry ignores duplicates and only updates the time
+    dependent expressions"""
+    expr_t = festim.expression_from_sympy(1 + festim.t, degree=1)
+    expr_x = festim.expression_from_sympy(1 + festim.x, degree=1)
+    constant = f.Constant(2)
+
+    registry = festim.ExpressionsRegistry([expr_t, expr_x, expr_t, constant])
+    registry.add([expr_t, expr_x])
+
+    assert len(registry.expressions) == 3
+    assert registry.time_dependent == [expr_t]
+
+    assert registry.update(5) == 1
+    assert registry.nb_updated == 1
+    assert expr_t(0) == pytest.approx(6)
+    assert expr_x(0) == pytest.approx(1)
@@ -6,8 +6,11 @@ from festim import (
     as_expression,
     as_constant_or_expression,
     t,
+    quadrature_measure,
+    quadrature_degrees,
 )
 from fenics import Constant, Expression, UserExpression
+import fenics as f
 import pytest
 
 
@@ -61,3 +64,28 @@ def test_as_expression(expression, type):
 )
 def test_as_constant_or_expression(expression, type):
     assert isinstance(as_constant_or_expression(expression), type)
+
+
+def test_quadrature_measure():
+    """Checks that quadrature_measure sets the quadrature degree of the
+    measure and leaves it unchanged if the degree is None"""
+    mesh = f.UnitIntervalMesh(10)
+    dx = f.Measure("dx", domain=mesh)
+
+    assert quadrature_measure(dx) is dx
+    assert quadrature_measure(dx, 3)(1).metadata() == {"quadrature_degree": 3}
+
+
+def test_quadrature_degrees():
+    """Checks that quadrature_degrees returns the prescribed degree of an
+    integral and the degree estimated by UFL otherwise"""
+    mesh = f.UnitIntervalMesh(10)
+    V = f.FunctionSpace(mesh, "P", 1)
+    u = f.Function(V)
+    v = f.TestFunction(V)
+    dx = f.Measure("dx", domain=mesh)
+    form = u * v * dx(1) + u * v * dx(2, metadata={"quadrature_degree": 5})
+
+    degrees = quadrature_degrees(form, verbose=False)
+
+    assert degrees == [("cell", 1, 2, False), ("cell", 2, 5, True)]
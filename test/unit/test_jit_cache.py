@@ -0,0 +1,67 @@
+import festim
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+def test_set_jit_cache(tmpdir, monkeypatch):
+    """Checks that set_jit_cache sets the cache directory"""
+    monkeypatch.delenv("DIJITSO_CACHE_DIR", raising=False)
+    festim.set_jit_cache(str(tmpdir))
+    assert festim.jit_cache_dir() == str(Path(tmpdir).resolve())
+
+
+def test_cached_libraries(tmpdir):
+    """Checks that the compiled libraries of the cache are found"""
+    lib = Path(tmpdir) / "lib"
+    lib.mkdir()
+    (lib / "libdijitso-form_1.so").touch()
+    (lib / "libdijitso-form_2.so").touch()
+    (Path(tmpdir) / "log.txt").touch()
+
+    assert len(festim.cached_libraries(str(tmpdir))) == 2
+
+
+SIMULATION_SCRIPT = """
+import json
+import numpy as np
+import festim
+
+my_model = festim.Simulation(log_level=40)
+my_model.mesh = festim.MeshFromVertices(np.linspace(0, 1, 10))
+my_model.materials = festim.Material(id=1, D_0=1, E_D=0)
+my_model.traps = [festim.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1)]
+my_model.T = festim.Temperature(500)
+my_model.boundary_conditions = [festim.DirichletBC(surfaces=[1], value=1, field=0)]
+my_model.settings = festim.Settings(1e-10, 1e-10, final_time=1)
+my_model.dt = festim.Stepsize(0.1)
+report = festim.precompile(my_model, cache_dir={cache_dir!r})
+print(json.dumps(report))
+"""
+
+
+def precompile_in_subprocess(cache_dir, tmpdir):
+    """Precompiles a simulation in a new process and returns the report"""
+    result = subprocess.run(
+        [sys.executable, "-c", SIMULATION_SCRIPT.format(cache_dir=cache_dir)],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=str(tmpdir),
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_precompile_second_process_loads_from_cache(tmpdir):
+    """Checks that a second process precompiling the same simulation
+    compiles nothing and loads the libraries from the cache"""
+    cache_dir = str(Path(tmpdir) / "cache")
+
+    first_report = precompile_in_subprocess(cache_dir, tmpdir)
+    second_report = precompile_in_subprocess(cache_dir, tmpdir)
+
+    assert first_report["misses"] > 0
+    assert second_report["misses"] == 0
+    assert second_report["hits"] > 0
+    assert second_report["cache_dir"] == str(Path(cache_dir).resolve())
@@ -1,4 +1,10 @@
 import festim as F
+from festim.materials.materials import (
+    ArheniusCoeff,
+    ThermalProp,
+    arrhenius_property,
+    thermal_property,
+)
 from fenics import *
 import pytest
 import warnings
@@ -67,6 +73,65 @@ def test_find_material_from_name_unfound_name():
         my_Mats.find_material_from_name(name_test)
 
 
+def test_find_material_after_modifying_materials():
+    """Checks that the lookup index of find_material_from_id and
+    find_material_from_name is updated when the materials are modified"""
+    mat_1 = F.Material(id=1, D_0=None, E_D=None, name="mat1")
+    mat_2 = F.Material(id=2, D_0=None, E_D=None, name="mat2")
+    my_Mats = F.Materials([mat_1])
+    assert my_Mats.find_material_from_id(1) == mat_1
+
+    my_Mats.append(mat_2)
+    assert my_Mats.find_material_from_id(2) == mat_2
+    assert my_Mats.find_material_from_name("mat2") == mat_2
+
+    my_Mats[0] = F.Material(id=3, D_0=None, E_D=None)
+    with pytest.raises(ValueError, match="Couldn't find ID 1"):
+        my_Mats.find_material_from_id(1)
+
+    # modifying the id of a material
+    mat_2.id = 4
+    assert my_Mats.find_material_from_id(4) == mat_2
+    with pytest.raises(ValueError, match="Couldn't find ID 2"):
+        my_Mats.find_material_from_id(2)
+
+
+def test_find_material_after_clear_reverse_and_iadd():
+    """Checks that clear, reverse and += update the lookup index"""
+    mat_1 = F.Material(id=1, D_0=None, E_D=None, name="mat")
+    mat_2 = F.Material(id=[1, 2], D_0=None, E_D=None, name="mat")
+    my_Mats = F.Materials([mat_1, mat_2])
+    assert my_Mats.find_material_from_name("mat") == mat_1
+
+    # the first material with an id or a name is returned
+    my_Mats.reverse()
+    assert my_Mats.find_material_from_id(1) == mat_2
+    assert my_Mats.find_material_from_name("mat") == mat_2
+
+    my_Mats.clear()
+    with pytest.raises(ValueError, match="Couldn't find ID 1"):
+        my_Mats.find_material_from_id(1)
+
+    my_Mats += [mat_1]
+    assert isinstance(my_Mats, F.Materials)
+    assert my_Mats.find_material_from_id(1) == mat_1
+    with pytest.raises(TypeError):
+        my_Mats += [1]
+
+
+def test_cell_material_indices():
+    """Checks cell_material_indices returns the index of the material of
+    each cell and -1 for unknown subdomains"""
+    mesh = UnitIntervalMesh(4)
+    vm = MeshFunction("size_t", mesh, 1, 0)
+    vm.array()[:] = [1, 2, 3, 5]
+    mat_1 = F.Material(id=[1, 3], D_0=None, E_D=None)
+    mat_2 = F.Material(id=2, D_0=None, E_D=None)
+    my_Mats = F.Materials([mat_1, mat_2])
+
+    assert my_Mats.cell_material_indices(vm).tolist() == [0, 1, 0, -1]
+
+
 def test_unused_thermal_cond():
     """
     Checks warnings when some keys are unused
@@ -448,3 +513,79 @@ def test_instanciate_with_no_elements():
     """
     # define exports
     F.Materials()
+
+
+class TestCompiledProperties:
+    """Checks that the compiled properties have the same values as the
+    Python UserExpressions ArheniusCoeff and ThermalProp"""
+
+    mesh = UnitSquareMesh(8, 8)
+    vm = MeshFunction("size_t", mesh, 2, 0)
+    for cell in cells(mesh):
+        vm[cell] = 1 if cell.midpoint().x() < 0.5 else 2
+    V = FunctionSpace(mesh, "CG", 1)
+    T = interpolate(Expression("300 + 200*x[0]*x[1]", degree=2), V)
+    DG_1 = FunctionSpace(mesh, "DG", 1)
+
+    def materials(self, thermal_cond):
+        return F.Materials(
+            [
+                F.Material(1, D_0=1, E_D=0.1, S_0=2, E_S=0.2, thermal_cond=thermal_cond),
+                F.Material(2, D_0=3, E_D=0.3, S_0=4, E_S=0.4, thermal_cond=5),
+            ]
+        )
+
+    def test_arrhenius_property(self):
+        materials = self.materials(thermal_cond=1)
+        materials.create_properties(self.vm, self.T)
+
+        for key, pre_exp, E in [("D", "D_0", "E_D"), ("S", "S_0", "E_S")]:
+            expected = ArheniusCoeff(materials, self.vm, self.T, pre_exp, E, degree=2)
+            computed = getattr(materials, key)
+            assert interpolate(computed, self.DG_1).vector().get_local() == (
+                pytest.approx(interpolate(expected, self.DG_1).vector().get_local())
+            )
+
+    @pytest.mark.parametrize("thermal_cond", [2, lambda T: 1 + 1e-3 * T])
+    def test_thermal_property(self, thermal_cond):
+        materials = self.materials(thermal_cond=thermal_cond)
+        materials.create_properties(self.vm, self.T)
+
+        expected = ThermalProp(materials, self.vm, self.T, "thermal_cond", degree=2)
+        assert not isinstance(materials.thermal_cond, ThermalProp)
+        assert interpolate(materials.thermal_cond, self.DG_1).vector().get_local() == (
+            pytest.approx(interpolate(expected, self.DG_1).vector().get_local())
+        )
+
+    def test_thermal_property_not_convertible(self):
+        """Checks that a function of T that sympy can't convert falls back
+        to ThermalProp"""
+        materials = self.materials(thermal_cond=lambda T: 1 + exp(-1 / T))
+        materials.create_properties(self.vm, self.T)
+
+        assert isinstance(materials.thermal_cond, ThermalProp)
+
+    def test_undefined_thermal_properties_not_created(self):
+        """Checks that heat_capacity and rho are not created when they are
+        not defined (steady state heat transfer)"""
+        materials = self.materials(thermal_cond=2)
+        materials.create_properties(self.vm, self.T)
+
+        assert materials.thermal_cond is not None
+        assert materials.heat_capacity is None
+        assert materials.density is None
+
+    @pytest.mark.parametrize("key", ["D", "thermal_cond"])
+    def test_unknown_subdomain_id(self, key):
+        """Checks that a cell with a subdomain id that isn't in the materials
+        raises a ValueError naming the id"""
+        vm = MeshFunction("size_t", self.mesh, 2, 0)
+        vm.array()[:] = self.vm.array()
+        vm.array()[0] = 3
+        materials = self.materials(thermal_cond=2)
+
+        with pytest.raises(ValueError, match="Couldn't find ID 3"):
+            if key == "D":
+                arrhenius_property(materials, vm, self.T, "D_0", "E_D")
+            else:
+                thermal_property(materials, vm, self.T, key)
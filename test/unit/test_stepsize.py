@@ -1,4 +1,5 @@
 import festim
+import fenics as f
 import pytest
 import numpy as np
 
@@ -53,6 +54,78 @@ class TestAdapt:
         assert new_value == my_stepsize.adaptive_stepsize["max_stepsize"](6)
 
 
+class TestAdaptToError:
+    @pytest.fixture
+    def my_stepsize(self):
+        return festim.Stepsize(initial_value=1, error_tolerance=1e-3, dt_min=1e-5)
+
+    def test_small_error_increases_value(self, my_stepsize):
+        accepted = my_stepsize.adapt_to_error(t=1, error=0.01)
+        assert accepted
+        assert float(my_stepsize.value) > 1
+
+    def test_large_error_rejects_and_reduces_value(self, my_stepsize):
+        accepted = my_stepsize.adapt_to_error(t=1, error=10)
+        assert not accepted
+        assert float(my_stepsize.value) < 1
+        assert my_stepsize.previous_error is None
+
+    def test_no_error_estimate_keeps_value(self, my_stepsize):
+        accepted = my_stepsize.adapt_to_error(t=1, error=None)
+        assert accepted
+        assert float(my_stepsize.value) == 1
+
+    def test_not_converged_reaches_minimal_size(self, my_stepsize):
+        with pytest.raises(ValueError, match="stepsize reached minimal value"):
+            for i in range(20):
+                my_stepsize.adapt_to_error(t=1, error=np.inf)
+
+    def test_milestone_from_previous_time_when_rejected(self):
+        my_stepsize = festim.Stepsize(
+            initial_value=1, error_tolerance=1e-3, milestones=[1.1]
+        )
+        my_stepsize.adapt_to_error(t=1, error=1.5)
+        # the step is redone from t=0 and must not overshoot t=1.1
+        assert float(my_stepsize.value) <= 1.1
+
+    def test_error_with_stepsize_change_ratio(self):
+        with pytest.raises(ValueError, match="cannot be used together"):
+            festim.Stepsize(1, stepsize_change_ratio=1.1, error_tolerance=1e-3)
+
+
+class TestTimeScheme:
+    def test_wrong_time_scheme(self):
+        with pytest.raises(ValueError, match="Acceptable values for time_scheme"):
+            festim.Stepsize(1, time_scheme="RK4")
+
+    def test_backward_euler_difference(self):
+        mesh = f.UnitIntervalMesh(4)
+        V = f.FunctionSpace(mesh, "CG", 1)
+        u, u_n = f.Function(V), f.Function(V)
+        my_stepsize = festim.Stepsize(1)
+        assert my_stepsize.order == 1
+        assert my_stepsize.backward_difference(u, u_n).equals(u - u_n)
+
+    def evaluate_bdf_coefficients(self, my_stepsize):
+        mesh = f.UnitIntervalMesh(1)
+        return [
+            f.assemble(a * f.dx(domain=mesh))
+            for a in my_stepsize.bdf_coefficients()
+        ]
+
+    def test_bdf2_first_step_is_backward_euler(self):
+        my_stepsize = festim.Stepsize(1, time_scheme="BDF2")
+        assert my_stepsize.order == 2
+        coefficients = self.evaluate_bdf_coefficients(my_stepsize)
+        assert np.allclose(coefficients, [1, 1, 0])
+
+    def test_bdf2_constant_step_coefficients(self):
+        my_stepsize = festim.Stepsize(1, time_scheme="BDF2")
+        my_stepsize.previous_value.assign(1)
+        coefficients = self.evaluate_bdf_coefficients(my_stepsize)
+        assert np.allclose(coefficients, [3 / 2, 2, 1 / 2])
+
+
 def test_milestones_are_hit():
     """Test that the milestones are hit at the correct times"""
     # create a StepSize object
@@ -226,7 +226,7 @@ def test_temperature_from_xdmf_transient_case(tmpdir):
         relative_tolerance=1e-08,
     )
     my_model.initialise()
-    T = my_model.T.T
+    T = my_model.T.post_processing_solution
     T_file = tmpdir.join("T.xdmf")
     fenics.XDMFFile(str(Path(T_file))).write_checkpoint(
         T, "T", 0, fenics.XDMFFile.Encoding.HDF5, append=False
@@ -262,3 +262,77 @@ def test_temperature_from_xdmf(tmpdir):
     temperature = festim.TemperatureFromXDMF(T_file, "T")
 
     assert temperature.is_steady_state()
+
+
+class TestArrhenius:
+    @pytest.fixture
+    def temperature(self):
+        my_mesh = festim.Mesh(fenics.UnitIntervalMesh(10))
+        temperature = festim.Temperature(300 + 100 * festim.x + festim.t)
+        temperature.create_functions(my_mesh)
+        temperature.arrhenius_cache = True
+        return temperature
+
+    def test_factor_shared_per_activation_energy(self, temperature):
+        """Checks that the cached Arrhenius factors are shared by the terms
+        with the same activation energy"""
+        assert temperature.arrhenius(0.5) is temperature.arrhenius(0.5)
+        assert temperature.arrhenius(0.5) is not temperature.arrhenius(0.2)
+
+    def test_nodal_values(self, temperature):
+        """Checks the nodal values of a cached Arrhenius factor"""
+        expected = np.exp(-0.5 / festim.k_B / temperature.T.vector().get_local())
+        computed = temperature.arrhenius(0.5).vector().get_local()
+        assert np.allclose(computed, expected)
+
+    def test_updated_when_temperature_changes(self, temperature):
+        """Checks that the cached Arrhenius factors follow the temperature"""
+        factor = temperature.arrhenius(0.5)
+        temperature.update(t=50)
+        expected = np.exp(-0.5 / festim.k_B / temperature.T.vector().get_local())
+        assert np.allclose(factor.vector().get_local(), expected)
+
+    def test_not_cached_by_default(self):
+        """Checks that the Arrhenius factor is a UFL expression when the
+        cache is not activated"""
+        my_mesh = festim.Mesh(fenics.UnitIntervalMesh(10))
+        temperature = festim.Temperature(300)
+        temperature.create_functions(my_mesh)
+        expected = fenics.exp(-0.5 / festim.k_B / temperature.T)
+        assert temperature.arrhenius(0.5).equals(expected)
+
+
+class TestUniformTemperature:
+    @pytest.fixture
+    def temperature(self):
+        my_mesh = festim.Mesh(fenics.UnitIntervalMesh(10))
+        temperature = festim.Temperature(300 + 8 * festim.t)
+        temperature.create_functions(my_mesh)
+        return temperature
+
+    def test_constant(self, temperature):
+        """Checks that a spatially uniform temperature is a fenics.Constant"""
+        assert isinstance(temperature.T, fenics.Constant)
+        assert isinstance(temperature.T_n, fenics.Constant)
+        assert float(temperature.T) == pytest.approx(300)
+
+    def test_update(self, temperature):
+        """Checks that T and T_n are updated by scalar assignment"""
+        temperature.update(t=10)
+        assert float(temperature.T) == pytest.approx(380)
+        assert float(temperature.T_n) == pytest.approx(300)
+
+    def test_post_processing_solution(self, temperature):
+        """Checks that the post processing solution of a uniform temperature
+        is a fenics.Function with the value of T"""
+        temperature.update(t=10)
+        values = temperature.post_processing_solution.vector().get_local()
+        assert np.allclose(values, 380)
+
+    def test_not_uniform(self):
+        """Checks that a temperature depending on x is a fenics.Function"""
+        my_mesh = festim.Mesh(fenics.UnitIntervalMesh(10))
+        temperature = festim.Temperature(300 + festim.x)
+        temperature.create_functions(my_mesh)
+        assert isinstance(temperature.T, fenics.Function)
+        assert temperature.post_processing_solution is temperature.T
@@ -113,6 +113,57 @@ class TestCreateTrappingForm:
         assert my_trap.F.equals(expected_form)
         assert my_trap.F_trapping.equals(expected_form)
 
+    def test_transient_lumped_mass(self):
+        """
+        Test that create_trapping_form integrates the terms with a vertex
+        quadrature when lumped_mass is True
+        """
+        # build
+        my_trap = festim.Trap(
+            k_0=1, E_k=2, p_0=3, E_p=4, materials=self.mat1, density=1 + festim.x
+        )
+        my_trap.F = 0
+        my_trap.solution = f.Function(self.V, name="c_t")
+        my_trap.previous_solution = f.Function(self.V, name="c_t_n")
+        my_trap.test_function = f.TestFunction(self.V)
+
+        my_mats = festim.Materials([self.mat1])
+
+        # run
+        my_trap.create_trapping_form(
+            self.my_mobile,
+            my_mats,
+            self.my_temp,
+            self.dx,
+            dt=self.dt,
+            lumped_mass=True,
+        )
+
+        # test
+        v = my_trap.test_function
+        dx_lumped = festim.lumped_measure(self.dx)
+        expected_form = (
+            ((my_trap.solution - my_trap.previous_solution) / self.dt.value)
+            * my_trap.test_function
+            * dx_lumped
+        )
+        expected_form += (
+            -my_trap.k_0
+            * f.exp(-my_trap.E_k / festim.k_B / self.my_temp.T)
+            * self.my_mobile.solution
+            * (my_trap.density[0] - my_trap.solution)
+            * v
+            * dx_lumped(1)
+        )
+        expected_form += (
+            my_trap.p_0
+            * f.exp(-my_trap.E_p / festim.k_B / self.my_temp.T)
+            * my_trap.solution
+            * v
+            * dx_lumped(1)
+        )
+        assert my_trap.F_trapping.equals(expected_form)
+
     def test_transient(self):
         """
         Test that create_trapping_form creates the correct formulation in